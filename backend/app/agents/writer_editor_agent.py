@@ -1,34 +1,51 @@
 # backend/app/agents/writer_editor_agent.py
 # This file defines the Writer-Editor agent using LangGraph and LangChain.
 
-import os
-from typing import List, TypedDict
+import logging
+from functools import lru_cache
+from typing import Any, List, Optional, TypedDict
 
 # LangChain and LangGraph Imports
 from langchain.prompts import ChatPromptTemplate
-from langchain_anthropic import ChatAnthropic
-from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
-from langchain_openai import ChatOpenAI
+from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import END, StateGraph
 
-# Pydantic V1 Imports - This is crucial for compatibility
-from pydantic.v1 import BaseModel, Field
+# Pydantic V2 models: current LangChain output parsers no longer accept pydantic.v1 classes.
+from pydantic import BaseModel, Field, field_validator
+
+from .. import telemetry
+from ..config import DEV_ANTHROPIC_MODEL_EDITOR, DEV_OPENAI_MODEL_WRITER, PRESCREEN_AUTO_APPROVE_THRESHOLD
+from ..llm import cached_prefix, structured_chain, usage_config
+from ..llm_router import routed_chain
+from ..services import draft_screening_service
+from ..services.content_scoring_service import ContentScorer
 
 # --- Configuration ---
 MAX_REVISIONS = 2
-# We will define our models and prompts directly here for clarity.
+# We will define our prompts directly here for clarity.
 # Later, we can refactor them into config/prompt files if needed.
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+
+logger = logging.getLogger(__name__)
 
 
-# --- 1. Define the State and Pydantic Models (V1 for LangGraph) ---
+# --- 1. Define the State and Pydantic Models ---
 
 class EditorDecision(BaseModel):
     """The decision and feedback from the editor node."""
     decision: str = Field(description="The verdict on the content. Must be either 'APPROVED' or 'REVISE'.")
     feedback: str = Field(description="Constructive, actionable feedback for the writer if the decision is 'REVISE'.")
 
+    @field_validator("decision", mode="before")
+    @classmethod
+    def _normalize_decision(cls, decision: Any) -> str:
+        # "approved", "Approve." and similar all count as approval; anything else is a revision.
+        return "APPROVED" if str(decision or "").strip().upper().startswith("APPROV") else "REVISE"
+
+    @field_validator("feedback", mode="before")
+    @classmethod
+    def _default_feedback(cls, feedback: Any) -> str:
+        return "" if feedback is None else str(feedback).strip()
+
 class ArticleSection(BaseModel):
     """Represents a single written section of the article."""
     h2: str
@@ -38,6 +55,8 @@ class ArticleDraft(BaseModel):
     """Represents the full article draft being written."""
     h1: str
     sections: List[ArticleSection] = []
+    # Coverage of the competitor term vector (0-100), updated as sections are appended.
+    content_score: Optional[float] = None
 
 class GraphState(TypedDict):
     """Represents the state of our graph, the agent's memory."""
@@ -47,36 +66,45 @@ class GraphState(TypedDict):
     current_section_content: str
     editor_feedback: EditorDecision
     revision_attempts: int
+    # Set by the pre-screen: True when the draft still needs the editor LLM's review.
+    needs_editor_review: bool
+    # Optional: scores each approved section against the project's competitor terms.
+    content_scorer: Optional[ContentScorer]
 
 
 # --- 2. Define the Writer's Logic ---
 
-# We'll use a cost-effective but powerful model as our workhorse writer.
-writer_llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.7, api_key=OPENAI_API_KEY)
-
+# Prompts are split for provider prompt caching: the system message is a stable
+# prefix (instructions, H1 and the full outline) shared by every section and
+# revision of an article; only the user message changes between calls.
 writer_prompt_template = ChatPromptTemplate.from_messages(
     [
         (
             "system",
-            "You are an expert B2B content writer and subject matter expert. Your task is to write a comprehensive, engaging, and authoritative section for a larger article. The tone should be professional, clear, and credible, tailored for a B2B audience.",
+            """You are an expert B2B content writer and subject matter expert. Your task is to write a comprehensive, engaging, and authoritative section for a larger article. The tone should be professional, clear, and credible, tailored for a B2B audience.
+
+You will be asked for one section of the article outlined below at a time.
+
+**Instructions:**
+- Write a detailed and informative piece of content for the section.
+- Ensure you cover all the key topics listed for the section.
+- The writing must be original, engaging, and provide real value to the reader.
+- Do not write an introduction or conclusion for the entire article, only focus on the requested section.
+- Do not repeat the H2 or H3 titles in your writing.
+
+<article_outline>
+# {h1}
+{outline_markdown}
+</article_outline>""",
         ),
         (
             "user",
-            """Please write the content for the following section of the article titled "{h1}".
-
-**Section to Write:**
+            """**Section to Write:**
 ## {h2_title}
 
 **Key Topics to Cover in this section (H3s):**
 {h3_topics}
 
-**Instructions:**
-- Write a detailed and informative piece of content for the section.
-- Ensure you cover all the key topics listed above.
-- The writing must be original, engaging, and provide real value to the reader.
-- Do not write an introduction or conclusion for the entire article, only focus on this specific section.
-- Do not repeat the H2 or H3 titles in your writing.
-
 **Editor Feedback (for revisions):**
 {feedback}
 """,
@@ -84,22 +112,51 @@ writer_prompt_template = ChatPromptTemplate.from_messages(
     ]
 )
 
-# The writer chain simply combines the prompt, model, and a basic string output parser.
-writer_chain = writer_prompt_template | writer_llm | StrOutputParser()
+def build_writer_chain():
+    """
+    The writer chain combines the prompt, model, and a basic string output parser.
+    We use a cost-effective but powerful model as our workhorse writer; the router
+    hedges or fails over to its equivalent on the other provider.
+    """
+    return routed_chain(
+        "writer",
+        DEV_OPENAI_MODEL_WRITER,
+        lambda llm: cached_prefix(writer_prompt_template, llm) | llm | StrOutputParser(),
+        temperature=0.7,
+    )
+
+
+# Built on first use, so importing the agent doesn't construct any LLM clients.
+writer_chain = None
+
+
+def get_writer_chain():
+    global writer_chain
+    if writer_chain is None:
+        writer_chain = build_writer_chain()
+    return writer_chain
+
+
+def render_outline_markdown(outline: dict) -> str:
+    """Renders the outline's H2/H3 hierarchy as markdown for the shared prompt prefix."""
+    lines = []
+    for section in outline["sections"]:
+        lines.append(f"## {section['h2']}")
+        lines.extend(f"### {h3['h3']}" for h3 in section["h3s"])
+    return "\n".join(lines)
 
 
 def writer_node(state: GraphState):
     """
     The "Writer" node. Takes the current section and writes content for it.
     """
-    print("--- ✍️ WRITER NODE ---")
+    logger.info("Writer node started", extra={"section_index": state["current_section_index"]})
 
     # Get the current section to write from the agent's memory (the state)
     outline = state["original_outline"]
     section_index = state["current_section_index"]
     section_to_write = outline["sections"][section_index]
     
-    h1 = outline["h1"]
     h2_title = section_to_write["h2"]
     h3_topics = "\n".join([f"- {h3['h3']}" for h3 in section_to_write["h3s"]])
 
@@ -111,57 +168,77 @@ def writer_node(state: GraphState):
         else "No feedback yet. This is the first attempt."
     )
 
-    # Increment the revision counter
-    state["revision_attempts"] += 1
-    
     # Invoke the writer chain to generate the content
-    generated_content = writer_chain.invoke(
-        {"h1": h1, "h2_title": h2_title, "h3_topics": h3_topics, "feedback": feedback}
-    )
+    with telemetry.stage("writer", section_index=section_index) as span:
+        generated_content = get_writer_chain().invoke(
+            {
+                "h1": outline["h1"],
+                "outline_markdown": render_outline_markdown(outline),
+                "h2_title": h2_title,
+                "h3_topics": h3_topics,
+                "feedback": feedback,
+            },
+            config=usage_config("writer"),
+        )
+        span["payload_bytes"] = len(generated_content)
     
-    # Update the state with the new content and clear old feedback
+    # Update the state with the new content, count the attempt and clear old feedback
     return {
         "current_section_content": generated_content,
+        "revision_attempts": state["revision_attempts"] + 1,
         "editor_feedback": None # Reset feedback for the next editor review
     }
 
 
-# --- 3. Define the Editor's Logic ---
+# --- 3. Define the Local Pre-screen ---
 
-# We use a strategic model for the high-reasoning task of editing.
-# We'll use Haiku for cost-effectiveness, with a fallback to OpenAI.
-if ANTHROPIC_API_KEY:
-    editor_llm = ChatAnthropic(
-        model="claude-3-haiku-20240307", temperature=0, api_key=ANTHROPIC_API_KEY
-    )
-else:
-    editor_llm = ChatOpenAI(
-        model="gpt-3.5-turbo", temperature=0, api_key=OPENAI_API_KEY
-    )
+def prescreen_node(state: GraphState):
+    """
+    The "Pre-screen" node. Runs cheap deterministic checks on the draft so the
+    editor LLM only sees drafts that could plausibly be approved.
 
-# The parser ensures the editor's output is always a structured object we can trust.
-editor_parser = PydanticOutputParser(pydantic_object=EditorDecision)
+    Failing drafts get generated feedback and go straight back to the writer
+    (or are accepted as-is once revisions run out, as the editor would do).
+    Passing drafts above PRESCREEN_AUTO_APPROVE_THRESHOLD are approved without
+    an LLM call; the rest continue to the editor.
+    """
+    outline = state["original_outline"]
+    section_index = state["current_section_index"]
+    section = outline["sections"][section_index]
+
+    with telemetry.stage("prescreen", section_index=section_index) as span:
+        result = draft_screening_service.screen_section(
+            state["current_section_content"], section["h2"], [h3["h3"] for h3 in section["h3s"]]
+        )
+        span["passed"] = result.passed
+        span["confidence"] = result.confidence
+
+    if not result.passed:
+        logger.info("Pre-screen failed draft", extra={"section_index": section_index, "issues": result.issues})
+        decision = EditorDecision(decision="REVISE", feedback=result.feedback)
+    elif PRESCREEN_AUTO_APPROVE_THRESHOLD and result.confidence >= PRESCREEN_AUTO_APPROVE_THRESHOLD:
+        logger.info("Pre-screen auto-approved draft", extra={"section_index": section_index, "confidence": result.confidence})
+        decision = EditorDecision(decision="APPROVED", feedback="")
+    else:
+        return {"needs_editor_review": True}
+
+    return {**apply_editor_decision(state, decision), "needs_editor_review": False}
+
+
+# --- 4. Define the Editor's Logic ---
 
 editor_prompt_template = ChatPromptTemplate.from_messages(
     [
         (
             "system",
-            "You are a meticulous, world-class editor and SEO strategist. Your task is to review a piece of content written by an AI writer and decide if it meets our quality standards. Your response MUST be a JSON object adhering to the provided schema. Do not include any other text or explanations.",
-        ),
-        (
-            "user",
-            """**Article Topic:** "{h1}"
-**Section Being Reviewed:** "## {h2_title}"
+            """You are a meticulous, world-class editor and SEO strategist. Your task is to review a piece of content written by an AI writer and decide if it meets our quality standards.
 
-**Content to Review:**
-<content>
-{content_to_review}
-</content>
+You will review one section of the article outlined below at a time.
 
 **Evaluation Criteria:**
 1.  **Clarity & Readability:** Is the content clear, concise, and easy for a B2B audience to understand?
 2.  **Accuracy:** Is the information factually correct and credible?
-3.  **Completeness:** Does the content adequately cover all the required sub-topics ({h3_topics})?
+3.  **Completeness:** Does the content adequately cover all the required sub-topics of the section?
 4.  **Tone:** Is the tone authoritative, professional, and confident?
 
 **Your Task:**
@@ -169,109 +246,169 @@ Based on the criteria, make a decision.
 - If the content is excellent and meets all criteria, decide "APPROVED".
 - If the content has issues, decide "REVISE" and provide specific, actionable feedback for the writer to improve the content.
 
-<output_instructions>
-{format_instructions}
-</output_instructions>
+<article_outline>
+# {h1}
+{outline_markdown}
+</article_outline>""",
+        ),
+        (
+            "user",
+            """**Section Being Reviewed:** "## {h2_title}"
+**Required Sub-topics:** {h3_topics}
+
+**Content to Review:**
+<content>
+{content_to_review}
+</content>
 """,
         ),
     ]
 )
 
-# The editor chain combines the prompt, model, and the structured output parser.
-editor_chain = editor_prompt_template | editor_llm | editor_parser
+def build_editor_chain():
+    """
+    The editor returns an EditorDecision through native tool calling. We use Haiku
+    for cost-effectiveness; the router falls back to OpenAI without an Anthropic key.
+    """
+    return routed_chain(
+        "editor",
+        DEV_ANTHROPIC_MODEL_EDITOR,
+        lambda llm: structured_chain(cached_prefix(editor_prompt_template, llm), llm, EditorDecision),
+    )
+
+
+editor_chain = None
+
+
+def get_editor_chain():
+    global editor_chain
+    if editor_chain is None:
+        editor_chain = build_editor_chain()
+    return editor_chain
 
 
 def editor_node(state: GraphState):
     """
     The "Editor" node. Reviews the content and provides a structured decision.
     """
-    print("--- 🧐 EDITOR NODE ---")
+    logger.info("Editor node started", extra={"section_index": state["current_section_index"]})
 
     # Get the necessary context from the agent's memory (the state)
     outline = state["original_outline"]
     section_index = state["current_section_index"]
     section_to_review = outline["sections"][section_index]
     
-    h1 = outline["h1"]
     h2_title = section_to_review["h2"]
     h3_topics = ", ".join([h3["h3"] for h3 in section_to_review["h3s"]])
     content_to_review = state["current_section_content"]
 
     # Invoke the editor chain to get the structured decision
-    decision = editor_chain.invoke(
-        {
-            "h1": h1,
-            "h2_title": h2_title,
-            "h3_topics": h3_topics,
-            "content_to_review": content_to_review,
-            "format_instructions": editor_parser.get_format_instructions(),
-        }
-    )
+    with telemetry.stage("editor", section_index=section_index) as span:
+        decision = get_editor_chain().invoke(
+            {
+                "h1": outline["h1"],
+                "outline_markdown": render_outline_markdown(outline),
+                "h2_title": h2_title,
+                "h3_topics": h3_topics,
+                "content_to_review": content_to_review,
+            },
+            config=usage_config("editor"),
+        )
+        span["decision"] = decision.decision
     
-    # Update the state with the editor's feedback
-    return {"editor_feedback": decision}
+    # Update the state with the editor's feedback (and the draft, if approved)
+    return apply_editor_decision(state, decision)
 
 # In backend/app/agents/writer_editor_agent.py
 
-# --- 4. Define Conditional Edge Logic ---
+# --- 5. Define State Updates and Conditional Edge Logic ---
 
-def should_continue(state: GraphState):
+def apply_editor_decision(state: GraphState, decision: EditorDecision) -> dict:
     """
-    The agent's "brain". This function decides the next step based on the state.
+    Turns an editor decision into a state update. LangGraph only persists what a
+    node returns, so all bookkeeping (appending the section, advancing the index)
+    happens here rather than in the routing function.
     """
-    print("--- 🤔 DECISION ---")
-    editor_decision = state["editor_feedback"]
-
     # If the editor requests a revision and we haven't exceeded the limit,
-    # loop back to the writer.
-    if (
-        editor_decision.decision == "REVISE"
-        and state["revision_attempts"] < MAX_REVISIONS
-    ):
-        print(f"Decision: Revision attempt {state['revision_attempts']}. Sending back to writer.")
-        return "writer"
+    # keep the feedback so the writer can act on it.
+    if decision.decision == "REVISE" and state["revision_attempts"] < MAX_REVISIONS:
+        logger.info("Decision: sending back to writer", extra={"revision_attempts": state["revision_attempts"]})
+        return {"editor_feedback": decision}
 
     # If the content is approved (or we're out of revisions),
     # add the content to the final draft.
-    print("Decision: Content APPROVED. Appending to draft.")
+    logger.info("Decision: content approved, appending to draft")
     outline = state["original_outline"]
     section_index = state["current_section_index"]
     approved_section_outline = outline["sections"][section_index]
-    
+
     # Create an ArticleSection object with the approved content
     approved_section = ArticleSection(
         h2=approved_section_outline['h2'],
         content=state["current_section_content"]
     )
-    state["article_draft"].sections.append(approved_section)
-
-    # Check if there are more sections left to write.
-    if state["current_section_index"] < len(outline["sections"]) - 1:
-        print("Decision: Moving to the next section.")
-        # Increment the index to move to the next section
-        state["current_section_index"] += 1
-        # Reset the revision counter for the new section
-        state["revision_attempts"] = 0
+    article_draft = state["article_draft"]
+    article_draft.sections.append(approved_section)
+
+    # Only the new section is scored; the scorer keeps the running term counts.
+    scorer = state.get("content_scorer")
+    if scorer is not None:
+        with telemetry.stage("content_score", section_index=section_index) as span:
+            section_score = scorer.add_section(approved_section.h2, approved_section.content)
+            article_draft.content_score = scorer.score
+            span["score"] = scorer.score
+            span["score_gain"] = section_score.score_gain
+
+    # Move to the next section with a fresh revision counter and no stale feedback.
+    return {
+        "article_draft": article_draft,
+        "current_section_index": section_index + 1,
+        "revision_attempts": 0,
+        "editor_feedback": None,
+    }
+
+def should_continue(state: GraphState):
+    """
+    The agent's "brain". This function decides the next step based on the state.
+    """
+    # Either a revision was requested or there are more sections left to write.
+    if state["current_section_index"] < len(state["original_outline"]["sections"]):
         return "writer"
-    else:
-        # If all sections are done, end the process.
-        print("Decision: All sections are complete. Finishing.")
-        return END
 
-# --- 5. Wire up and compile the Graph ---
+    # If all sections are done, end the process.
+    logger.info("Decision: all sections are complete")
+    return END
+
+def route_after_prescreen(state: GraphState):
+    """Sends drafts that passed the pre-screen to the editor; otherwise it already decided."""
+    if state.get("needs_editor_review"):
+        return "editor"
+    return should_continue(state)
+
+# --- 6. Wire up and compile the Graph ---
 
 # Initialize the state graph
 workflow = StateGraph(GraphState)
 
 # Add the nodes (our "workers")
 workflow.add_node("writer", writer_node)
+workflow.add_node("prescreen", prescreen_node)
 workflow.add_node("editor", editor_node)
 
 # Set the entry point for the graph
 workflow.set_entry_point("writer")
 
-# The writer always sends its work to the editor
-workflow.add_edge("writer", "editor")
+# The writer always sends its work to the pre-screen, which may skip the editor
+workflow.add_edge("writer", "prescreen")
+workflow.add_conditional_edges(
+    "prescreen",
+    route_after_prescreen,
+    {
+        "editor": "editor",
+        "writer": "writer",
+        END: END
+    }
+)
 
 # The editor's decision is routed by our conditional logic
 workflow.add_conditional_edges(
@@ -283,5 +420,14 @@ workflow.add_conditional_edges(
     }
 )
 
-# Compile the graph into a runnable application
-app = workflow.compile()
\ No newline at end of file
+# Compile the graph into a runnable application on first use
+@lru_cache(maxsize=None)
+def get_app():
+    return workflow.compile()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `writer_editor_agent.app` working while deferring the compile.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,12 @@
+import os
 from celery import Celery
+from celery.signals import setup_logging, worker_ready
+
+from . import telemetry
 
 # Configure the Redis URL for Celery
-# Assumes Redis is running on localhost:6379
-REDIS_URL = "redis://localhost:6379/0"
+# Assumes Redis is running on localhost:6379 unless REDIS_URL is set
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 celery_app = Celery(
     "tasks",
@@ -11,6 +15,29 @@ celery_app = Celery(
     include=["app.tasks"] # Points Celery to our tasks.py file
 )
 
+# The internal-linking index lives on the local disk (LINK_INDEX_DIR) of the workers that
+# consume this queue. Unless that directory is shared storage, route both link tasks to
+# one worker with a persistent volume: `celery ... worker -Q link_index` with LINK_INDEX_QUEUE=link_index.
+LINK_INDEX_QUEUE = os.getenv("LINK_INDEX_QUEUE", "celery")
+
 celery_app.conf.update(
     task_track_started=True,
-)
\ No newline at end of file
+    task_routes={
+        "app.tasks.index_site_task": {"queue": LINK_INDEX_QUEUE},
+        "app.tasks.suggest_links_task": {"queue": LINK_INDEX_QUEUE},
+    },
+)
+
+
+@setup_logging.connect
+def configure_worker_logging(**kwargs):
+    """Replaces Celery's default log format with our structured JSON logging."""
+    telemetry.configure_logging()
+
+
+@worker_ready.connect
+def start_worker_metrics_server(**kwargs):
+    """Exposes worker metrics when WORKER_METRICS_PORT is set."""
+    port = os.getenv("WORKER_METRICS_PORT")
+    if port:
+        telemetry.start_metrics_server(int(port))
@@ -1,10 +1,104 @@
+import os
+
 # --- Development & Testing Models ---
 # Use the most cost-effective models suitable for development and testing.
 DEV_OPENAI_MODEL_GROUPER = "gpt-3.5-turbo"
 DEV_ANTHROPIC_MODEL_ARCHITECT = "claude-3-haiku-20240307"
 DEV_ANTHROPIC_MODEL_REFINER = "claude-3-5-haiku-20241022"
+DEV_OPENAI_MODEL_WRITER = "gpt-3.5-turbo"
+DEV_ANTHROPIC_MODEL_EDITOR = "claude-3-haiku-20240307"
 
 # --- Production Models (Future Use) ---
 # The most powerful models for the final production application.
 PROD_OPENAI_STRATEGIST_MODEL = "gpt-4o"
-PROD_ANTHROPIC_STRATEGIST_MODEL = "claude-3-opus-20240229"
\ No newline at end of file
+PROD_ANTHROPIC_STRATEGIST_MODEL = "claude-3-opus-20240229"
+
+# --- Topic Grouping ---
+# "llm": send every raw heading to the grouper model (original behaviour).
+# "hybrid": cluster headings locally with spaCy vectors; the LLM only names the clusters.
+# "fast": cluster locally and skip the grouper LLM entirely.
+GROUPER_MODE = os.getenv("GROUPER_MODE", "hybrid")
+CLUSTER_SIMILARITY_THRESHOLD = float(os.getenv("CLUSTER_SIMILARITY_THRESHOLD", "0.55"))
+# How many of each cluster's most central headings the naming prompt sees.
+CLUSTER_NAMING_SAMPLE_SIZE = 5
+
+# --- LLM Routing ---
+# Equivalent models on the other provider, in order of preference. A call is hedged to
+# them once the primary passes its observed p95 latency, and fails over to them on error.
+EQUIVALENT_MODELS = {
+    "gpt-3.5-turbo": ["claude-3-haiku-20240307"],
+    "claude-3-haiku-20240307": ["gpt-3.5-turbo"],
+    "claude-3-5-haiku-20241022": ["gpt-3.5-turbo"],
+}
+# Hedge delay is each model's own p95 once it has this many samples, never less than the minimum.
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_HEDGE_MIN_DELAY_SECONDS = 1.0
+# Circuit breaker per model: trips over the last N calls on error or slow-call rate.
+LLM_BREAKER_WINDOW = 20
+LLM_BREAKER_MIN_CALLS = 5
+LLM_BREAKER_ERROR_RATE = 0.5
+LLM_BREAKER_SLOW_CALL_SECONDS = 45.0
+LLM_BREAKER_SLOW_CALL_RATE = 0.5
+LLM_BREAKER_OPEN_SECONDS = 30.0
+
+# --- Draft Pre-screening (writer-editor agent) ---
+# Deterministic checks run before the editor LLM; failing drafts go straight back to the writer.
+# An H3 counts as covered when this share of its content-word lemmas appears in the draft.
+PRESCREEN_TOPIC_COVERAGE = 0.6
+PRESCREEN_MIN_WORDS = 150
+PRESCREEN_WORDS_PER_H3 = 60
+PRESCREEN_MAX_WORDS = 1800
+PRESCREEN_MAX_AVG_SENTENCE_WORDS = 30
+# Flesch Reading Ease; dense B2B prose sits around 30-50, below 10 is near-unreadable.
+PRESCREEN_MIN_READING_EASE = 10.0
+# Drafts passing every check with at least this confidence skip the editor LLM; 0 disables.
+PRESCREEN_AUTO_APPROVE_THRESHOLD = float(os.getenv("PRESCREEN_AUTO_APPROVE_THRESHOLD", "0"))
+
+# --- Entity Extraction ---
+# "ner": statistical NER over every competitor page (original behaviour).
+# "hybrid": count known entities with a regex gazetteer built from earlier projects
+#           in the same genre; NER runs only on a sample of pages to discover new entities.
+# "gazetteer": phrase matching only, once the genre has a gazetteer.
+ENTITY_EXTRACTION_MODE = os.getenv("ENTITY_EXTRACTION_MODE", "hybrid")
+# Pages (in SERP order) still run through NER in "hybrid" mode, to discover new entities.
+# NER dominates the cost of "hybrid", so keep this small.
+ENTITY_NER_SAMPLE_PAGES = int(os.getenv("ENTITY_NER_SAMPLE_PAGES", "1"))
+# The gazetteer is built from the entities of this many most recent projects in the genre.
+ENTITY_GAZETTEER_MAX_PROJECTS = 200
+
+# --- Keyword Clustering ---
+# Each keyword costs one Serper request, so a clustering request is capped.
+KEYWORD_CLUSTER_MAX_KEYWORDS = int(os.getenv("KEYWORD_CLUSTER_MAX_KEYWORDS", "500"))
+# Two top-10 SERPs sharing one URL have Jaccard 1/19; lower thresholds would merge
+# keywords that share nothing, and LSH banding can't find such pairs reliably.
+KEYWORD_CLUSTER_MIN_SIMILARITY = 0.05
+
+# --- Content Coverage Scoring ---
+# The term vector keeps the highest-weighted competitor terms (unigrams, bigrams and entities).
+CONTENT_SCORE_MAX_TERMS = 150
+# A term must appear on this many competitor pages to count; extracted entities always count.
+CONTENT_SCORE_MIN_PAGES = 2
+CONTENT_SCORE_ENTITY_BOOST = 1.5
+# Longest phrase matched, in words (entities such as "Google Cloud Platform").
+CONTENT_SCORE_MAX_NGRAM = 4
+
+# --- Pricing (USD per 1M tokens: input, output) ---
+# Used only for cost estimates in telemetry; keep in sync with provider price lists.
+MODEL_PRICING_PER_MILLION_TOKENS = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o": (2.50, 10.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-opus": (15.00, 75.00),
+}
+
+# Prompt caching per model prefix: (minimum cacheable prefix in tokens, cache read, cache write),
+# the last two as multiples of the input price. Models not listed never cache: OpenAI caches
+# prompts of 1024+ tokens automatically from gpt-4o on, but not gpt-3.5-turbo; Anthropic caches
+# marked prefixes of 2048+ tokens on Haiku models and 1024+ on the others, and charges extra to write.
+PROMPT_CACHE_MODELS = {
+    "gpt-4o": (1024, 0.5, 1.0),
+    "claude-3-haiku": (2048, 0.1, 1.25),
+    "claude-3-5-haiku": (2048, 0.1, 1.25),
+    "claude-3-opus": (1024, 0.1, 1.25),
+}
@@ -3,6 +3,7 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from . import models, schemas
+from .services import cache_service
 
 def create_project(db: Session, project: models.ProjectCreate) -> schemas.Project:
     db_project = schemas.Project(
@@ -18,6 +19,10 @@ def create_project(db: Session, project: models.ProjectCreate) -> schemas.Projec
     db.refresh(db_project)
     return db_project
 
+def get_project(db: Session, project_id: int) -> Optional[schemas.Project]:
+    """Retrieves a project by its ID."""
+    return db.query(schemas.Project).filter(schemas.Project.id == project_id).first()
+
 def update_project_status(db: Session, project_id: int, status: schemas.ProjectStatus) -> schemas.Project:
     db_project = db.query(schemas.Project).filter(schemas.Project.id == project_id).first()
     if db_project:
@@ -35,6 +40,7 @@ def create_article_for_project(db: Session, title: str, content: str, project_id
     db.add(db_article)
     db.commit()
     db.refresh(db_article)
+    cache_service.invalidate(cache_service.article_cache_key(project_id))
     return db_article
 
 def get_article(db: Session, article_id: int) -> Optional[schemas.Article]:
@@ -52,6 +58,7 @@ def update_article_content(
         db_article.status = status
         db.commit()
         db.refresh(db_article)
+        cache_service.invalidate(cache_service.article_cache_key(db_article.project_id))
     return db_article
 
 def update_project_entities(db: Session, project_id: int, entities: List[str]) -> schemas.Project:
@@ -65,6 +72,51 @@ def update_project_entities(db: Session, project_id: int, entities: List[str]) -
         db.refresh(db_project)
     return db_project
 
+def get_recent_entities(db: Session, genre: Optional[str], limit: int) -> List[str]:
+    """
+    Returns the extracted entities of the most recent projects in a genre
+    (projects without a genre form their own group).
+    """
+    query = db.query(schemas.Project.extracted_entities).filter(schemas.Project.extracted_entities.isnot(None))
+    if genre:
+        query = query.filter(schemas.Project.genre == genre)
+    else:
+        query = query.filter(schemas.Project.genre.is_(None))
+    rows = query.order_by(schemas.Project.id.desc()).limit(limit).all()
+    return [entity for (entities,) in rows for entity in entities or []]
+
+def update_project_term_weights(db: Session, project_id: int, term_weights: dict) -> schemas.Project:
+    """
+    Stores the competitor term vector used for content-coverage scoring.
+    """
+    db_project = db.query(schemas.Project).filter(schemas.Project.id == project_id).first()
+    if db_project:
+        db_project.term_weights = term_weights
+        db.commit()
+        db.refresh(db_project)
+    return db_project
+
+def copy_project_results(db: Session, source_project_id: int, target_project_id: int) -> Optional[schemas.Project]:
+    """
+    Copies a finished project's outputs (entities, term weights and outline
+    article) to a project that was coalesced with it, and completes that project.
+    """
+    source = get_project(db, source_project_id)
+    target = get_project(db, target_project_id)
+    # Projects that already finished (e.g. re-dispatched after a lapsed lease) keep their own results.
+    if source is None or target is None or target.status == schemas.ProjectStatus.COMPLETED:
+        return target
+    target.extracted_entities = source.extracted_entities
+    target.term_weights = source.term_weights
+    target.status = schemas.ProjectStatus.COMPLETED
+    article = get_article_by_project_id(db, project_id=source_project_id)
+    if article:
+        db.add(schemas.Article(title=article.title, content=article.content, project_id=target_project_id))
+    db.commit()
+    db.refresh(target)
+    cache_service.invalidate(cache_service.article_cache_key(target_project_id))
+    return target
+
 def get_article_by_project_id(db: Session, project_id: int) -> Optional[schemas.Article]:
     """Retrieves the first article associated with a project ID."""
     return db.query(schemas.Article).filter(schemas.Article.project_id == project_id).first()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# app/dispatch.py
+# Enqueues Celery tasks by name. The API imports this module instead of app.tasks,
+# so it never loads the worker's AI stack (LangChain, LangGraph, spaCy) to send a message.
+
+import uuid
+from typing import Any, Optional, Tuple
+
+from celery.result import AsyncResult
+from sqlalchemy.orm import Session
+
+from . import crud, schemas
+from .celery_config import celery_app
+from .services import coalescing_service
+
+# Registered names of the tasks defined in app/tasks.py.
+GENERATE_OUTLINE_TASK = "app.tasks.generate_outline_task"
+CLUSTER_KEYWORDS_TASK = "app.tasks.cluster_keywords_task"
+INDEX_SITE_TASK = "app.tasks.index_site_task"
+SUGGEST_LINKS_TASK = "app.tasks.suggest_links_task"
+RESUME_COALESCED_PROJECT_TASK = "app.tasks.resume_coalesced_project_task"
+
+
+def send(name: str, task_id: Optional[str] = None, countdown: Optional[float] = None, **kwargs: Any) -> AsyncResult:
+    """Sends a task message by name; `kwargs` become the task's keyword arguments."""
+    return celery_app.send_task(name, kwargs=kwargs, task_id=task_id, countdown=countdown)
+
+
+def dispatch_outline_task(
+    db: Session, project: schemas.Project, task_id: Optional[str] = None
+) -> Tuple[str, Optional[int]]:
+    """
+    Starts the outline pipeline for a project, or attaches the project to an
+    identical one (same normalized keyword, location, manual keywords and
+    genre) that is already in flight.
+
+    Args:
+        db: The database session.
+        project: The project to run.
+        task_id: The project's task id when it is dispatched again, so its
+            client keeps polling the same task; a new one otherwise.
+
+    Returns:
+        (task_id, leader_project_id): the project's own task to poll, and the
+        project it attached to, if any. An attached project's task stays
+        PENDING until the leader delivers the outline and marks it done, or
+        runs the pipeline itself if the leader fails.
+    """
+    fingerprint = coalescing_service.project_fingerprint(
+        project.keyword, project.location, project.manual_keywords, project.genre
+    )
+    task_id = task_id or str(uuid.uuid4())
+    leader = coalescing_service.attach(fingerprint, project.id, task_id)
+    if leader is None:
+        send(
+            GENERATE_OUTLINE_TASK,
+            task_id=task_id,
+            project_id=project.id,
+            keyword=project.keyword,
+            location=project.location,
+            manual_keywords=project.manual_keywords,
+            coalesce_key=fingerprint,
+        )
+        return task_id, None
+
+    crud.update_project_status(db, project_id=project.id, status=schemas.ProjectStatus.IN_PROGRESS)
+    # Safety net in case the leader's worker dies without delivering to its waiters.
+    send(
+        RESUME_COALESCED_PROJECT_TASK,
+        countdown=coalescing_service.PROJECT_COALESCING_LEASE_SECONDS,
+        project_id=project.id,
+        task_id=task_id,
+    )
+    return task_id, leader.project_id
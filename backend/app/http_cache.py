@@ -0,0 +1,45 @@
+# app/http_cache.py
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clients may keep a copy but must revalidate it with the ETag on every use.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Derives a weak ETag from the bytes of a response body. It is weak because
+    GZipMiddleware sends the same tag on the gzip and identity encodings, and a
+    strong tag must identify the exact bytes on the wire (RFC 9110, 8.8.3).
+    """
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against the current ETag with the weak
+    comparison If-None-Match calls for: 'W/' prefixes are ignored on both sides.
+    Handles the '*' wildcard and lists of tags.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == opaque_tag for tag in candidates)
+
+
+def json_response_with_etag(request: Request, body: bytes, etag: str) -> Response:
+    """
+    Returns the JSON body, or an empty 304 Not Modified if the client
+    already holds the representation identified by the ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,164 @@
+# app/llm.py
+# Shared helpers for the LLM calls made by the outline pipeline and the writer agent.
+
+import logging
+from typing import Any, Iterator, List, Type, TypeVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.prompt_values import PromptValue
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.utils.json import parse_json_markdown, parse_partial_json
+from langchain_anthropic import ChatAnthropic
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, ValidationError
+
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """
+    Reports token usage and estimated cost for every LLM call made under a stage.
+    Pass it through the runnable config: `chain.invoke(inputs, config=usage_config("grouper"))`.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                metadata = message.response_metadata or {}
+                model = metadata.get("model_name") or metadata.get("model") or "unknown"
+                # Both providers count cached tokens inside input_tokens and break them out here.
+                details = usage.get("input_token_details") or {}
+                telemetry.record_llm_usage(
+                    self.stage,
+                    model,
+                    usage.get("input_tokens", 0),
+                    usage.get("output_tokens", 0),
+                    cache_read_tokens=details.get("cache_read") or 0,
+                    cache_write_tokens=details.get("cache_creation") or 0,
+                )
+
+
+def usage_config(stage: str) -> dict:
+    """Builds a runnable config that attaches usage reporting for the given stage."""
+    return {"callbacks": [LLMUsageCallback(stage)], "run_name": stage}
+
+
+def _loads(text: str) -> Any:
+    """Parses JSON that may be fenced in markdown, preceded by prose or truncated."""
+    try:
+        return parse_json_markdown(text)
+    except ValueError:
+        pass
+    try:
+        return parse_partial_json(text[text.index("{"):]) if "{" in text else None
+    except ValueError:
+        return None
+
+
+def _candidate_payloads(raw: BaseMessage) -> Iterator[Any]:
+    """
+    Yields the objects a response could plausibly hold: tool-call arguments
+    first, then JSON found in the message text.
+    """
+    for call in getattr(raw, "tool_calls", None) or []:
+        yield call.get("args")
+    for call in getattr(raw, "invalid_tool_calls", None) or []:
+        yield _loads(call.get("args") or "")
+
+    if isinstance(raw.content, str):
+        yield _loads(raw.content)
+    else:
+        yield _loads("".join(block.get("text", "") for block in raw.content if isinstance(block, dict)))
+
+
+def _repair_locally(schema: Type[SchemaT], result: dict) -> SchemaT:
+    """
+    Returns the parsed object, or rebuilds it from the raw response when the
+    provider's parser gave up. The schema's own validators clean up the usual
+    defects (empty objects, blank headings), so no second LLM call is needed.
+    """
+    if result.get("parsed") is not None:
+        return result["parsed"]
+
+    raw = result["raw"]
+    for payload in _candidate_payloads(raw):
+        if not isinstance(payload, dict):
+            continue
+        try:
+            parsed = schema.model_validate(payload)
+        except ValidationError:
+            continue
+        logger.warning(
+            "Structured output repaired locally",
+            extra={"schema": schema.__name__, "error": str(result.get("parsing_error"))},
+        )
+        return parsed
+
+    raise OutputParserException(
+        f"Could not parse a {schema.__name__} from the model response.",
+        llm_output=str(raw.content),
+    )
+
+
+def _mark_cache_breakpoint(prompt_value: PromptValue) -> List[BaseMessage]:
+    """Flags the end of the last system message as an Anthropic prompt-cache breakpoint."""
+    messages = prompt_value.to_messages()
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if not isinstance(message, SystemMessage):
+            continue
+        blocks = (
+            [{"type": "text", "text": message.content}] if isinstance(message.content, str) else list(message.content)
+        )
+        blocks[-1] = {**blocks[-1], "cache_control": {"type": "ephemeral"}}
+        messages[index] = SystemMessage(content=blocks)
+        break
+    return messages
+
+
+def cached_prefix(prompt: ChatPromptTemplate, llm: BaseChatModel) -> Runnable:
+    """
+    Enables provider prompt caching for a prompt whose system message is the
+    stable prefix (instructions plus shared article context) and whose user
+    message holds everything that varies between calls.
+
+    Anthropic only caches content marked with `cache_control`, so the system
+    message is marked for Claude models. OpenAI caches prompts of 1024+ tokens
+    automatically by prefix, so nothing needs to change for GPT models.
+    Whether a call is actually cached depends on the model and the prefix
+    length; see PROMPT_CACHE_MODELS.
+    """
+    if isinstance(llm, ChatAnthropic):
+        return prompt | RunnableLambda(_mark_cache_breakpoint)
+    return prompt
+
+
+def structured_chain(
+    prompt: Runnable, llm: BaseChatModel, schema: Type[SchemaT]
+) -> Runnable[dict, SchemaT]:
+    """
+    Builds `prompt | llm` returning a validated `schema` instance through the
+    provider's native tool calling, so prompts need no format instructions.
+
+    OpenAI models use function calling rather than the strict JSON-schema mode,
+    which older models such as gpt-3.5-turbo don't support.
+    """
+    options = {"method": "function_calling"} if isinstance(llm, ChatOpenAI) else {}
+    structured_llm = llm.with_structured_output(schema, include_raw=True, **options)
+    return prompt | structured_llm | RunnableLambda(lambda result: _repair_locally(schema, result))
@@ -0,0 +1,288 @@
+# app/llm_router.py
+# Routes each LLM call across equivalent models with deadlines, hedging and per-model circuit breakers.
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_openai import ChatOpenAI
+
+from . import telemetry
+from .config import (
+    EQUIVALENT_MODELS,
+    LLM_BREAKER_ERROR_RATE,
+    LLM_BREAKER_MIN_CALLS,
+    LLM_BREAKER_OPEN_SECONDS,
+    LLM_BREAKER_SLOW_CALL_RATE,
+    LLM_BREAKER_SLOW_CALL_SECONDS,
+    LLM_BREAKER_WINDOW,
+    LLM_HEDGE_MIN_DELAY_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+)
+
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+
+# Client-side bounds on a single HTTP request; the router's deadline bounds the whole call.
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
+# Kept low: failing over to the equivalent model beats retrying a struggling provider.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_CALL_DEADLINE_SECONDS = float(os.getenv("LLM_CALL_DEADLINE_SECONDS", "120"))
+# Used until a model has LLM_HEDGE_MIN_SAMPLES latencies to compute its own p95 from.
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "20"))
+LLM_ROUTER_MAX_WORKERS = 32
+
+logger = logging.getLogger(__name__)
+
+# Calls run on a shared pool so the caller can stop waiting on a hung request;
+# an abandoned request finishes (or times out) in the background.
+_executor = ThreadPoolExecutor(max_workers=LLM_ROUTER_MAX_WORKERS, thread_name_prefix="llm-router")
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when no candidate model answered within the call's deadline."""
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class CircuitBreaker:
+    """
+    Tracks the recent calls of one provider/model and stops routing to it when
+    too many of them fail or are slow.
+
+    closed -> open when, over the last LLM_BREAKER_WINDOW calls (and at least
+    LLM_BREAKER_MIN_CALLS), the error rate or the slow-call rate reaches its
+    threshold. After LLM_BREAKER_OPEN_SECONDS one trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+
+    State is per process, like the LLM clients themselves.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=LLM_BREAKER_WINDOW)
+        self._latencies: Deque[float] = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be routed to this model right now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= LLM_BREAKER_OPEN_SECONDS:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Frees the half-open trial slot of a call that was cancelled before it ran."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, ok: bool, latency: float) -> None:
+        with self._lock:
+            if ok:
+                self._latencies.append(latency)
+            if self.state == "half_open":
+                if ok and latency < LLM_BREAKER_SLOW_CALL_SECONDS:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    logger.info("Circuit breaker closed", extra={"model": self.name})
+                else:
+                    self._open("trial call failed")
+                return
+
+            self._outcomes.append((ok, latency))
+            if self.state != "closed" or len(self._outcomes) < LLM_BREAKER_MIN_CALLS:
+                return
+            calls = len(self._outcomes)
+            error_rate = sum(not ok for ok, _ in self._outcomes) / calls
+            slow_rate = sum(latency >= LLM_BREAKER_SLOW_CALL_SECONDS for _, latency in self._outcomes) / calls
+            if error_rate >= LLM_BREAKER_ERROR_RATE:
+                self._open(f"error rate {error_rate:.0%}")
+            elif slow_rate >= LLM_BREAKER_SLOW_CALL_RATE:
+                self._open(f"slow-call rate {slow_rate:.0%}")
+
+    def _open(self, reason: str) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        telemetry.record_circuit_breaker_open(self.name)
+        logger.warning("Circuit breaker opened", extra={"model": self.name, "reason": reason})
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this model before hedging: its observed p95 latency."""
+        with self._lock:
+            if len(self._latencies) < LLM_HEDGE_MIN_SAMPLES:
+                return LLM_HEDGE_DEFAULT_DELAY_SECONDS
+            return max(_percentile(list(self._latencies), 95), LLM_HEDGE_MIN_DELAY_SECONDS)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(model)
+        return _breakers[model]
+
+
+def chat_model(model: str, temperature: float = 0) -> BaseChatModel:
+    """Builds the provider client for a model name, with request timeouts and few retries."""
+    if model.startswith("claude"):
+        return ChatAnthropic(
+            model=model,
+            temperature=temperature,
+            api_key=ANTHROPIC_API_KEY,
+            timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES,
+        )
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=OPENAI_API_KEY,
+        timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES,
+    )
+
+
+def _has_credentials(model: str) -> bool:
+    return bool(ANTHROPIC_API_KEY if model.startswith("claude") else OPENAI_API_KEY)
+
+
+class RoutedRunnable(Runnable):
+    """
+    Runs the same chain against a primary model and its equivalents.
+
+    - The primary is called first; if it has not answered by its observed p95
+      latency, the request is hedged to the next healthy equivalent, and the
+      first successful answer wins.
+    - An error fails over to the next candidate immediately.
+    - Models whose circuit breaker is open are skipped.
+    - The whole call is bounded by `deadline_seconds`.
+    """
+
+    def __init__(self, stage: str, candidates: List[Tuple[str, Runnable]], deadline_seconds: float):
+        self.stage = stage
+        self.candidates = candidates
+        self.deadline_seconds = deadline_seconds
+
+    @property
+    def primary_model(self) -> str:
+        """The model tried first (the requested one, unless its provider has no key)."""
+        return self.candidates[0][0]
+
+    def _submit(self, model: str, chain: Runnable, input: Any, config: Optional[RunnableConfig]) -> Future:
+        breaker = get_breaker(model)
+        started = time.monotonic()
+        future = _executor.submit(chain.invoke, input, config)
+        # Outcomes are recorded even for abandoned calls, so slow models keep being measured.
+
+        def on_done(f: Future) -> None:
+            if f.cancelled():
+                breaker.release()
+            else:
+                breaker.record(f.exception() is None, time.monotonic() - started)
+
+        future.add_done_callback(on_done)
+        return future
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        deadline = time.monotonic() + self.deadline_seconds
+        remaining_candidates = list(self.candidates)
+        in_flight: Dict[Future, str] = {}
+        hedge_at = math.inf
+        last_error: Optional[BaseException] = None
+
+        def launch(event: str) -> None:
+            nonlocal hedge_at
+            # Skip models with an open breaker; only the first call may fall back to one,
+            # since trying anyway beats failing the project outright.
+            while remaining_candidates:
+                model, chain = remaining_candidates.pop(0)
+                if get_breaker(model).allow():
+                    break
+                telemetry.record_llm_route_event(self.stage, model, "skipped_open_breaker")
+            else:
+                if in_flight or event != "primary":
+                    hedge_at = math.inf
+                    return
+                model, chain = self.candidates[0]
+            telemetry.record_llm_route_event(self.stage, model, event)
+            in_flight[self._submit(model, chain, input, config)] = model
+            hedge_at = time.monotonic() + get_breaker(model).hedge_delay() if remaining_candidates else math.inf
+
+        launch("primary")
+        while in_flight:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= hedge_at:
+                logger.info("Hedging slow LLM call", extra={"stage": self.stage, "models": list(in_flight.values())})
+                launch("hedged")
+                continue
+
+            done, _ = wait(list(in_flight), timeout=min(deadline, hedge_at) - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                model = in_flight.pop(future)
+                error = future.exception()
+                if error is None:
+                    telemetry.record_llm_route_event(self.stage, model, "won")
+                    for other in in_flight:
+                        other.cancel()
+                    return future.result()
+                last_error = error
+                telemetry.record_llm_route_event(self.stage, model, "error")
+                logger.warning("LLM call failed", extra={"stage": self.stage, "model": model, "error": str(error)})
+                launch("failover")
+
+        if in_flight:
+            for future in in_flight:
+                future.cancel()
+            telemetry.record_llm_route_event(self.stage, "all", "deadline")
+            raise LLMDeadlineExceeded(
+                f"No LLM answered the {self.stage} call within {self.deadline_seconds:g}s."
+            ) from last_error
+        raise last_error
+
+
+def routed_chain(
+    stage: str,
+    model: str,
+    build: Callable[[BaseChatModel], Runnable],
+    temperature: float = 0,
+    deadline_seconds: float = LLM_CALL_DEADLINE_SECONDS,
+) -> RoutedRunnable:
+    """
+    Builds `build(llm)` for the primary model and each configured equivalent
+    with credentials, and routes calls between them.
+
+    Example:
+        chain = routed_chain("architect", DEV_ANTHROPIC_MODEL_ARCHITECT,
+                             lambda llm: structured_chain(prompt, llm, models.SeoOutline))
+    """
+    models = [model] + [m for m in EQUIVALENT_MODELS.get(model, []) if m != model]
+    available = [m for m in models if _has_credentials(m)] or [model]
+    candidates = [(m, build(chat_model(m, temperature))) for m in available]
+    return RoutedRunnable(stage, candidates, deadline_seconds)
@@ -1,23 +1,26 @@
 # main.py
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from pathlib import Path
 
 from sqlalchemy.orm import Session
-from .database import create_db_and_tables, get_db
-from . import crud, models, schemas
-from .tasks import generate_outline_task
-from .tasks import generate_outline_task
+from .database import get_db
+from . import crud, dispatch, models, schemas, telemetry
+from .http_cache import make_etag, json_response_with_etag
+from .services import cache_service, content_scoring_service
 
 from celery.result import AsyncResult
 from .celery_config import celery_app
 
-# Initialize Database and tables
-create_db_and_tables()
+telemetry.configure_logging()
+
+# Tasks are enqueued by name (see app/dispatch.py), so the API never imports app.tasks
+# and its AI stack. Tables are created by the migration step: `python -m app.migrate`.
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -33,6 +36,9 @@ app.add_middleware(
     allow_headers=["*"], # Allows all headers
 )
 
+# Compress large JSON payloads (full articles); small responses aren't worth the CPU.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.mount("/static", StaticFiles(directory= BASE_DIR / "static"), name="static")
 
 
@@ -41,21 +47,45 @@ async def read_root():
     return "app/static/index.html"
 
 
+@app.get("/metrics", tags=["Monitoring"])
+def get_metrics():
+    """Exposes Prometheus metrics for scraping."""
+    payload = telemetry.metrics_payload()
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled: prometheus_client is not installed.")
+    body, content_type = payload
+    return Response(content=body, media_type=content_type)
+
+
 @app.post("/projects/", response_model=models.ProjectCreateResponse, tags=["Projects"])
 def create_new_project(
     project: models.ProjectCreate, db: Session = Depends(get_db)
 ):
     db_project = crud.create_project(db=db, project=project)
-    
-    task = generate_outline_task.delay(
-        project_id=db_project.id, 
-        keyword=db_project.keyword,
-        location=db_project.location,  
-        manual_keywords=db_project.manual_keywords
-    )
-    
+
+    # Identical projects already in flight are joined rather than run again;
+    # this project still gets its own status and its own copy of the outline.
+    task_id, leader_project_id = dispatch.dispatch_outline_task(db, db_project)
+    db.refresh(db_project)
+
     response_data = models.Project.model_validate(db_project)
-    return models.ProjectCreateResponse(**response_data.model_dump(), task_id=task.id)
+    return models.ProjectCreateResponse(
+        **response_data.model_dump(), task_id=task_id, coalesced_with_project_id=leader_project_id
+    )
+
+@app.post("/keywords/clusters", response_model=models.TaskCreationResponse, tags=["Keywords"])
+def create_keyword_clusters(request: models.KeywordClusterRequest):
+    """
+    Starts grouping a keyword list into article-level clusters by SERP overlap.
+    Poll /tasks/{task_id} for the resulting clusters.
+    """
+    task = dispatch.send(
+        dispatch.CLUSTER_KEYWORDS_TASK,
+        keywords=request.keywords,
+        location=request.location,
+        similarity_threshold=request.similarity_threshold,
+    )
+    return models.TaskCreationResponse(task_id=task.id, message=f"Clustering {len(request.keywords)} keywords.")
 
 @app.get("/tasks/{task_id}", response_model=models.TaskStatus, tags=["Tasks"])
 def get_task_status(task_id: str):
@@ -69,9 +99,69 @@ def get_task_status(task_id: str):
     return result
 
 @app.get("/projects/{project_id}/article", response_model=models.Article, tags=["Articles"])
-def get_article_for_project(project_id: int, db: Session = Depends(get_db)):
-    """Retrieves the first article associated with a given project."""
+def get_article_for_project(project_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Retrieves the first article associated with a given project.
+
+    The response carries a weak ETag, so clients revalidating with
+    If-None-Match get an empty 304 when the article hasn't changed.
+    """
+    cache_key = cache_service.article_cache_key(project_id)
+    cached = cache_service.get_cached_response(cache_key)
+    if cached:
+        body, etag = cached
+    else:
+        # Read before the database, so a write landing during this read stops us caching its old body.
+        generation = cache_service.current_generation(cache_key)
+        article = crud.get_article_by_project_id(db, project_id=project_id)
+        if article is None:
+            raise HTTPException(status_code=404, detail="Article not found for this project.")
+        body = models.Article.model_validate(article).model_dump_json().encode()
+        etag = make_etag(body)
+        cache_service.set_cached_response(cache_key, body, etag, generation)
+
+    return json_response_with_etag(request, body, etag)
+
+@app.post("/projects/{project_id}/content-score", response_model=models.ContentScore, tags=["Articles"])
+def score_article_draft(project_id: int, draft: models.ContentScoreRequest, db: Session = Depends(get_db)):
+    """
+    Scores a draft's coverage of the terms and entities the competitor pages use,
+    overall and per section, and lists the most important terms still missing.
+    Scoring a 5k-word draft takes milliseconds, so it can run on every edit.
+    """
+    project = crud.get_project(db, project_id=project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
+    if not project.term_weights:
+        raise HTTPException(status_code=404, detail="No competitor term weights yet; the outline task hasn't finished.")
+
+    term_weights = models.TermWeights.model_validate(project.term_weights)
+    return content_scoring_service.score_draft(term_weights, [(section.h2, section.content) for section in draft.sections])
+
+@app.post("/projects/{project_id}/link-index", response_model=models.TaskCreationResponse, tags=["Internal Linking"])
+def update_link_index(project_id: int, db: Session = Depends(get_db)):
+    """
+    Starts an incremental crawl of the project's base_url into its internal-linking index.
+    Poll /tasks/{task_id} for crawl statistics.
+    """
+    project = crud.get_project(db, project_id=project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
+    task = dispatch.send(dispatch.INDEX_SITE_TASK, base_url=project.base_url)
+    return models.TaskCreationResponse(task_id=task.id, message=f"Indexing {project.base_url}.")
+
+@app.post("/projects/{project_id}/link-suggestions", response_model=models.TaskCreationResponse, tags=["Internal Linking"])
+def create_link_suggestions(project_id: int, k: int = 5, db: Session = Depends(get_db)):
+    """
+    Starts finding the top-k pages of the client's own site to link from each
+    section of the project's article. Sections are matched on their H2, H3s and
+    any written content. Poll /tasks/{task_id} for the suggestions; they are
+    empty while the site hasn't been indexed.
+    """
+    project = crud.get_project(db, project_id=project_id)
     article = crud.get_article_by_project_id(db, project_id=project_id)
-    if article is None:
+    if project is None or article is None:
         raise HTTPException(status_code=404, detail="Article not found for this project.")
-    return article
+    # Embedding needs the spaCy vectors and the site's index, which live on the workers.
+    task = dispatch.send(dispatch.SUGGEST_LINKS_TASK, project_id=project_id, k=min(max(k, 1), 20))
+    return models.TaskCreationResponse(task_id=task.id, message=f"Finding internal links on {project.base_url}.")
@@ -0,0 +1,71 @@
+# app/migrate.py
+# Schema migration step, run once per deploy before the API and workers start:
+#     python -m app.migrate
+
+import logging
+from typing import List
+
+from sqlalchemy import Column, inspect, text
+
+from . import telemetry
+from .database import create_db_and_tables, engine
+from .schemas import Base
+
+logger = logging.getLogger(__name__)
+
+
+def missing_columns() -> List[Column]:
+    """The model columns absent from tables that already exist, e.g. projects.term_weights."""
+    inspector = inspect(engine)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing)
+    return missing
+
+
+def add_missing_columns() -> List[str]:
+    """
+    Adds columns introduced after a table was created (e.g. projects.term_weights).
+    create_all() only creates missing tables, so new nullable columns on existing
+    tables are added here with ALTER TABLE.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    added = []
+    with engine.begin() as connection:
+        for column in missing_columns():
+            column_type = column.type.compile(dialect=engine.dialect)
+            connection.execute(
+                text(f"ALTER TABLE {quote(column.table.name)} ADD COLUMN {quote(column.name)} {column_type}")
+            )
+            added.append(f"{column.table.name}.{column.name}")
+    return added
+
+
+def check_schema() -> List[str]:
+    """
+    Logs an error naming the columns the migration step hasn't added yet.
+    Workers call this on startup: without it, the first sign of a skipped
+    migration is every outline task failing as it saves its results.
+    """
+    missing = [f"{column.table.name}.{column.name}" for column in missing_columns()]
+    if missing:
+        logger.error(
+            "Database schema is behind the models; run `python -m app.migrate`",
+            extra={"missing_columns": missing},
+        )
+    return missing
+
+
+def migrate() -> None:
+    """Creates missing tables, then adds missing columns to existing ones."""
+    create_db_and_tables()
+    added = add_missing_columns()
+    logger.info("Database schema is up to date", extra={"added_columns": added})
+
+
+if __name__ == "__main__":
+    telemetry.configure_logging()
+    migrate()
@@ -1,8 +1,9 @@
 from typing import List, Optional, Any
 
 # Import exclusively from the modern Pydantic V2 library.
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
+from .config import KEYWORD_CLUSTER_MAX_KEYWORDS, KEYWORD_CLUSTER_MIN_SIMILARITY
 from .schemas import ProjectStatus, ArticleStatus
 
 
@@ -32,6 +33,9 @@ class Project(ProjectBase):
 
 class ProjectCreateResponse(Project):
     task_id: str
+    coalesced_with_project_id: Optional[int] = Field(
+        default=None, description="The identical in-flight project this one attached to, if any."
+    )
 
 
 class TaskCreationResponse(BaseModel):
@@ -53,24 +57,167 @@ class TaskStatus(BaseModel):
     task_result: Optional[Any] = None
 
 
+class KeywordClusterRequest(BaseModel):
+    keywords: List[str] = Field(
+        min_length=1,
+        max_length=KEYWORD_CLUSTER_MAX_KEYWORDS,
+        description="Keywords to plan, highest priority first. Repeats (ignoring case) are dropped.",
+    )
+    location: Optional[str] = "India"
+    similarity_threshold: float = Field(
+        default=0.25,
+        ge=KEYWORD_CLUSTER_MIN_SIMILARITY,
+        le=1,
+        description="Minimum Jaccard overlap of top-10 URLs to share an article.",
+    )
+
+    @field_validator("keywords")
+    @classmethod
+    def _dedupe_keywords(cls, keywords: List[str]) -> List[str]:
+        """Drops blank keywords and repeats, keeping the first spelling and the priority order."""
+        unique = {}
+        for keyword in keywords:
+            keyword = " ".join(keyword.split())
+            if keyword:
+                unique.setdefault(keyword.casefold(), keyword)
+        if not unique:
+            raise ValueError("At least one non-blank keyword is required.")
+        return list(unique.values())
+
+class KeywordCluster(BaseModel):
+    primary_keyword: str = Field(description="The keyword to pass to the outline task.")
+    keywords: List[str] = Field(description="All keywords served by this article, primary first.")
+    urls: List[str] = Field(description="Top results of the primary keyword.")
+
+class KeywordClusterList(BaseModel):
+    clusters: List[KeywordCluster]
+
+class LinkCandidate(BaseModel):
+    url: str
+    title: str
+    score: float = Field(description="Cosine similarity between the section and the page.")
+
+class SectionLinkSuggestions(BaseModel):
+    h2: str
+    candidates: List[LinkCandidate]
+
+class LinkSuggestionList(BaseModel):
+    sections: List[SectionLinkSuggestions]
+
+class TermWeight(BaseModel):
+    term: str
+    weight: float
+    target_count: int = Field(description="Median occurrences on the competitor pages that use the term.")
+    entity: bool = False
+
+class TermWeights(BaseModel):
+    """A project's competitor term vector, stored on the project for scoring drafts."""
+    page_count: int
+    terms: List[TermWeight]
+
+class DraftSection(BaseModel):
+    h2: str
+    content: str
+
+class ContentScoreRequest(BaseModel):
+    sections: List[DraftSection]
+
+class SectionScore(BaseModel):
+    h2: str
+    word_count: int
+    terms_used: int = Field(description="Competitor terms that appear in the section.")
+    score_gain: float = Field(description="Points the section added to the article's score.")
+
+class ContentScore(BaseModel):
+    score: float = Field(description="0-100: weighted share of competitor terms used at their typical frequency.")
+    word_count: int
+    sections: List[SectionScore]
+    missing_terms: List[str] = Field(description="The highest-weighted terms the draft doesn't use yet.")
+
+
 # --- AI Structured Output Models (Pydantic V2) ---
-# The PydanticOutputParser in the latest LangChain versions works correctly with V2 models.
+# These are sent to the providers as tool schemas. The "before" validators repair
+# the defects LLMs commonly produce (empty `{}` objects, blank or duplicate
+# entries, bare strings instead of objects) locally instead of via another LLM call.
+
+def _clean_strings(values: Any) -> List[str]:
+    """Strips entries, dropping blanks, non-strings and case-insensitive duplicates."""
+    seen = set()
+    cleaned = []
+    for value in values or []:
+        if not isinstance(value, str) or not value.strip():
+            continue
+        key = value.strip().casefold()
+        if key not in seen:
+            seen.add(key)
+            cleaned.append(value.strip())
+    return cleaned
+
+def _drop_empty_objects(values: Any, required_key: str) -> List[Any]:
+    """Removes `{}`, nulls and objects whose `required_key` is missing or blank."""
+    return [
+        value for value in values or []
+        if not isinstance(value, dict) or str(value.get(required_key) or "").strip()
+    ]
 
 class TopicCluster(BaseModel):
     cluster_name: str = Field(description="A concise, descriptive name for the topic cluster.")
     headings_and_keywords: List[str] = Field(description="A de-duplicated list of related headings and keywords belonging to this cluster.")
 
+    @field_validator("headings_and_keywords", mode="before")
+    @classmethod
+    def _clean_items(cls, items: Any) -> List[str]:
+        return _clean_strings(items)
+
 class TopicClusterList(BaseModel):
     clusters: List[TopicCluster]
 
+    @field_validator("clusters", mode="before")
+    @classmethod
+    def _drop_empty_clusters(cls, clusters: Any) -> List[Any]:
+        return [
+            cluster for cluster in _drop_empty_objects(clusters, "cluster_name")
+            if not isinstance(cluster, dict) or _clean_strings(cluster.get("headings_and_keywords"))
+        ]
+
+class ClusterName(BaseModel):
+    cluster_id: int = Field(description="The id of the pre-built cluster being named.")
+    cluster_name: str = Field(description="A concise, descriptive name for the topic cluster.")
+
+class ClusterNameList(BaseModel):
+    clusters: List[ClusterName]
+
+    @field_validator("clusters", mode="before")
+    @classmethod
+    def _drop_unnamed(cls, clusters: Any) -> List[Any]:
+        return _drop_empty_objects(clusters, "cluster_name")
+
+def _clean_h3s(h3s: Any) -> List[Any]:
+    """Accepts bare strings, then drops `{}` and blank entries."""
+    h3s = [{"h3": h3} if isinstance(h3, str) else h3 for h3 in h3s or []]
+    return _drop_empty_objects(h3s, "h3")
+
 class H3Subheading(BaseModel):
-    h3: str
+    h3: str = Field(description="A non-empty H3 subheading.")
 
 class H2Section(BaseModel):
-    h2: str
-    h3s: List[H3Subheading]
+    h2: str = Field(description="A non-empty H2 heading.")
+    h3s: List[H3Subheading] = Field(min_length=1, description="The H3 subheadings under this H2; at least one.")
+
+    @field_validator("h3s", mode="before")
+    @classmethod
+    def _clean_h3s(cls, h3s: Any) -> List[Any]:
+        return _clean_h3s(h3s)
 
 class SeoOutline(BaseModel):
     h1: str
-    sections: List[H2Section]
-
+    sections: List[H2Section] = Field(min_length=1)
+
+    @field_validator("sections", mode="before")
+    @classmethod
+    def _drop_empty_sections(cls, sections: Any) -> List[Any]:
+        # A section without H3s gives the writer nothing to cover, so it is dropped too.
+        return [
+            section for section in _drop_empty_objects(sections, "h2")
+            if not isinstance(section, dict) or _clean_h3s(section.get("h3s"))
+        ]
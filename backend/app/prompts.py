@@ -4,12 +4,8 @@
 
 # --- Phase 1: Outline Generation Prompts ---
 
-TOPIC_GROUPER_SYSTEM_PROMPT = """You are a data processing and topic modeling AI. Your task is to process raw text and keywords, and group them into clean, semantically related topic clusters. You must format your output as a JSON object that strictly adheres to the provided schema."""
+TOPIC_GROUPER_SYSTEM_PROMPT = """You are a data processing and topic modeling AI. Your task is to process raw text and keywords, and group them into clean, semantically related topic clusters."""
 TOPIC_GROUPER_USER_PROMPT = """
-<output_instructions>
-{format_instructions}
-</output_instructions>
-
 <competitor_content>
 {scraped_content}
 </competitor_content>
@@ -23,20 +19,24 @@ TOPIC_GROUPER_USER_PROMPT = """
 </extracted_entities>
 """
 
-OUTLINE_ARCHITECT_SYSTEM_PROMPT = """Act as an expert SEO Content Strategist. Your task is to take topic clusters and architect them into a final, logical content outline for a B2B audience. Your sole output is the hierarchical structure of headings. You MUST format your output as a JSON object that strictly adheres to the provided schema.
+TOPIC_NAMER_SYSTEM_PROMPT = """You are a topic modeling AI. Competitor headings have already been grouped into clusters of semantically related topics. Your task is to give each cluster a concise, descriptive name that a B2B reader would recognise, using the manual keywords and extracted entities as context. Return one name for every cluster id."""
+TOPIC_NAMER_USER_PROMPT = """
+<clusters>
+{pre_clusters_json}
+</clusters>
 
-**CRITICAL RULES:**
-1. Your entire response must be ONLY the JSON object, starting with `{{` and ending with `}}`. Do not include any other text, explanations, or markdown formatting like ```json.
-2. Every object in the `sections` list MUST contain both a non-empty `h2` key and a non-empty `h3s` list.
-3. Every object within an `h3s` list MUST contain a non-empty string for the `h3` key.
-4. **DO NOT generate empty objects like `{{}}`.** This is a strict violation. The `h3s` list should only contain valid `{{"h3": "..."}}` objects.
+<manual_keywords>
+{manual_keywords}
+</manual_keywords>
+
+<extracted_entities>
+{extracted_entities}
+</extracted_entities>
 """
 
-OUTLINE_ARCHITECT_USER_PROMPT = """
-<output_instructions>
-{format_instructions}
-</output_instructions>
+OUTLINE_ARCHITECT_SYSTEM_PROMPT = """Act as an expert SEO Content Strategist. Your task is to take topic clusters and architect them into a final, logical content outline for a B2B audience. Your sole output is the hierarchical structure of headings: every H2 section needs at least one H3."""
 
+OUTLINE_ARCHITECT_USER_PROMPT = """
 **Primary Keyword:** "{keyword}"
 
 <topic_clusters>
@@ -65,7 +65,7 @@ WRITER_NODE_USER_PROMPT = """Please write the content for the following section
 {feedback}
 """
 
-EDITOR_NODE_SYSTEM_PROMPT = """You are a meticulous, world-class editor and SEO strategist. Your task is to review a piece of content written by an AI writer and decide if it meets our quality standards. Your response must be a JSON object adhering to the provided schema."""
+EDITOR_NODE_SYSTEM_PROMPT = """You are a meticulous, world-class editor and SEO strategist. Your task is to review a piece of content written by an AI writer and decide if it meets our quality standards."""
 EDITOR_NODE_USER_PROMPT = """**Article Topic:** "{h1}"
 **Section Being Reviewed:** "## {h2_title}"
 
@@ -84,10 +84,6 @@ EDITOR_NODE_USER_PROMPT = """**Article Topic:** "{h1}"
 Based on the criteria, make a decision.
 - If the content is excellent and meets all criteria, decide "APPROVED".
 - If the content has issues, decide "REVISE" and provide specific, actionable feedback for the writer to improve the content.
-
-<output_instructions>
-{format_instructions}
-</output_instructions>
 """
 
 OUTLINE_REFINER_SYSTEM_PROMPT = """Act as a Senior SEO Content Strategist and Editor-in-Chief. Your task is to take a DRAFT article outline and transform it into a final, strategically superior, and non-redundant content blueprint.
@@ -96,14 +92,10 @@ OUTLINE_REFINER_SYSTEM_PROMPT = """Act as a Senior SEO Content Strategist and Ed
 1.  **De-duplicate Ruthlessly:** Review all H3s under each H2. Identify and merge any subheadings that are semantically identical or highly similar. Consolidate them into a single, well-phrased H3.
 2.  **Consolidate and Rephrase:** Rephrase the final headings to be clear, engaging, and unique. Ensure a logical flow.
 3.  **Add a Strategic Angle (The "Value-Add"):** Identify one or two unique, high-value topics or angles that are missing from the draft. Add these as new, compelling H3s to the most relevant section to make our article stand out.
-4.  **Maintain Structure:** Your final output MUST be a JSON object that strictly adheres to the provided `SeoOutline` schema. Do not add any conversational text.
+4.  **Maintain Structure:** Keep the H1 > H2 > H3 hierarchy, with at least one H3 under every H2.
 """
 
 OUTLINE_REFINER_USER_PROMPT = """
-<output_instructions>
-{format_instructions}
-</output_instructions>
-
 **Primary Keyword:** "{keyword}"
 
 <draft_outline>
@@ -0,0 +1,19 @@
+# app/redis_client.py
+
+import redis
+
+from .celery_config import REDIS_URL
+
+# A single connection pool is shared by every caller in the process.
+_redis_client = None
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Returns a process-wide Redis client pointed at the same instance Celery uses.
+    The client is created lazily so importing this module never opens a connection.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(REDIS_URL)
+    return _redis_client
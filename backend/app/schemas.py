@@ -37,6 +37,8 @@ class Project(Base):
     location = Column(String, nullable=True, default="India")
     manual_keywords = Column(JSON, nullable=True) 
     extracted_entities = Column(JSON, nullable=True)
+    # Competitor TF-IDF term vector (models.TermWeights) used to score drafts.
+    term_weights = Column(JSON, nullable=True)
     status = Column(Enum(ProjectStatus), default=ProjectStatus.PENDING, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
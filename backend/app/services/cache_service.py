@@ -0,0 +1,122 @@
+# In backend/app/services/cache_service.py
+
+import os
+import logging
+from typing import Optional, Tuple
+
+import redis
+from dotenv import load_dotenv
+
+from .. import telemetry
+from ..redis_client import get_redis_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# The response cache is optional: without it every read goes to the database,
+# which is still correct, just slower under read-heavy traffic.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+# Generation counters only need to outlive the reads in flight when a write lands.
+GENERATION_TTL_SECONDS = 24 * 60 * 60
+
+# KEYS: entry, generation. ARGV: body, etag, ttl, generation seen before the database read.
+# Stores the entry only if no write has bumped the generation since, so a slow read
+# can't put back a body that an invalidation already dropped.
+_SET_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[4] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'body', ARGV[1], 'etag', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def article_cache_key(project_id: int) -> str:
+    """Builds the cache key for the serialized article of a project."""
+    return f"response-cache:project:{project_id}:article"
+
+
+def _generation_key(key: str) -> str:
+    return f"{key}:generation"
+
+
+def get_cached_response(key: str) -> Optional[Tuple[bytes, str]]:
+    """
+    Looks up a serialized response body and its ETag.
+
+    Returns:
+        A (body, etag) tuple, or None on a miss, when the cache is disabled,
+        or when Redis is unreachable.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+
+    try:
+        cached = get_redis_client().hmget(key, "body", "etag")
+    except redis.exceptions.RedisError as e:
+        logger.warning("Response cache lookup failed", extra={"key": key, "error": str(e)})
+        return None
+
+    body, etag = cached
+    hit = body is not None and etag is not None
+    telemetry.record_cache_lookup("response", hit)
+    if not hit:
+        return None
+    return body, etag.decode()
+
+
+def current_generation(key: str) -> Optional[str]:
+    """
+    Returns the key's write generation. Read it before loading the data to
+    cache and pass it to `set_cached_response`. None when the cache is
+    disabled or unreachable, in which case nothing will be cached.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+
+    try:
+        generation = get_redis_client().get(_generation_key(key))
+    except redis.exceptions.RedisError as e:
+        logger.warning("Response cache lookup failed", extra={"key": key, "error": str(e)})
+        return None
+    return generation.decode() if generation is not None else ""
+
+
+def set_cached_response(key: str, body: bytes, etag: str, generation: Optional[str]) -> None:
+    """
+    Stores a serialized response body and its ETag with the configured TTL,
+    unless the key was invalidated after `generation` was read: the body may
+    then predate the write.
+    """
+    if not RESPONSE_CACHE_ENABLED or generation is None:
+        return
+
+    try:
+        script = get_redis_client().register_script(_SET_IF_CURRENT_SCRIPT)
+        stored = script(keys=[key, _generation_key(key)], args=[body, etag, RESPONSE_CACHE_TTL_SECONDS, generation])
+    except redis.exceptions.RedisError as e:
+        logger.warning("Response cache write failed", extra={"key": key, "error": str(e)})
+        return
+    if not stored:
+        logger.debug("Response cache write skipped; the entry changed during the read", extra={"key": key})
+
+
+def invalidate(key: str) -> None:
+    """
+    Drops a cached response so the next read is served from the database, and
+    bumps its generation so reads already in flight don't re-cache old data.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return
+
+    try:
+        pipe = get_redis_client().pipeline()
+        pipe.incr(_generation_key(key))
+        pipe.expire(_generation_key(key), GENERATION_TTL_SECONDS)
+        pipe.delete(key)
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.warning("Response cache invalidation failed", extra={"key": key, "error": str(e)})
@@ -0,0 +1,171 @@
+# In backend/app/services/clustering_service.py
+
+import re
+from typing import List, Sequence
+
+import numpy as np
+
+from .. import models
+from .nlp_service import get_nlp
+
+# Average-linkage cosine similarity above which two groups of headings are merged.
+DEFAULT_SIMILARITY_THRESHOLD = 0.55
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _dedupe(texts: Sequence[str]) -> List[str]:
+    """Drops blanks and case/whitespace-insensitive duplicates, keeping first occurrences."""
+    seen = set()
+    unique = []
+    for text in texts:
+        cleaned = _WHITESPACE.sub(" ", text).strip()
+        key = cleaned.casefold()
+        if len(cleaned) < 3 or key in seen:
+            continue
+        seen.add(key)
+        unique.append(cleaned)
+    return unique
+
+
+def mean_word_vectors(texts: Sequence[str]) -> np.ndarray:
+    """
+    Embeds texts as the mean word vector of their content words, using the
+    vectors shipped with the spaCy model. Only the tokenizer runs, so this is
+    cheap even for hundreds of headings or long page texts.
+
+    Returns:
+        A float32 matrix of shape (len(texts), vector_width); texts without any
+        known word get a zero row.
+    """
+    nlp = get_nlp()
+    width = nlp.vocab.vectors_length
+    matrix = np.zeros((len(texts), width), dtype=np.float32)
+
+    for row, doc in enumerate(nlp.tokenizer.pipe(texts)):
+        vectors = []
+        for token in doc:
+            if token.is_stop or token.is_punct or token.is_space:
+                continue
+            lexeme = token if token.has_vector else nlp.vocab[token.lower_]
+            if lexeme.has_vector:
+                vectors.append(lexeme.vector)
+        if vectors:
+            matrix[row] = np.mean(vectors, axis=0)
+    return matrix
+
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    Embeds short texts with `mean_word_vectors` for clustering.
+
+    The matrix is mean-centred and L2-normalised: averaged word vectors share a
+    large common component, and removing it makes cosine similarity far more
+    discriminative.
+
+    Returns:
+        A float32 matrix of shape (len(texts), vector_width).
+    """
+    matrix = mean_word_vectors(texts)
+    known = np.any(matrix != 0, axis=1)
+    if known.any():
+        matrix[known] -= matrix[known].mean(axis=0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def agglomerate(vectors: np.ndarray, threshold: float) -> List[List[int]]:
+    """
+    Average-linkage agglomerative clustering on cosine similarity.
+
+    Repeatedly merges the most similar pair of groups until no pair reaches
+    `threshold`. Similarities of a merged group are the size-weighted average
+    of its parts (UPGMA), so each merge is a single vectorised row update.
+
+    Args:
+        vectors: L2-normalised row vectors.
+        threshold: Minimum average similarity for two groups to merge.
+
+    Returns:
+        Groups of row indices.
+    """
+    n = len(vectors)
+    if n == 0:
+        return []
+
+    similarity = (vectors @ vectors.T).astype(np.float64)
+    np.fill_diagonal(similarity, -np.inf)
+    sizes = np.ones(n)
+    members = [[i] for i in range(n)]
+
+    while n > 1:
+        a, b = np.unravel_index(np.argmax(similarity), similarity.shape)
+        if similarity[a, b] < threshold:
+            break
+
+        merged = (sizes[a] * similarity[a] + sizes[b] * similarity[b]) / (sizes[a] + sizes[b])
+        similarity[a, :] = merged
+        similarity[:, a] = merged
+        similarity[a, a] = -np.inf
+        similarity[b, :] = -np.inf
+        similarity[:, b] = -np.inf
+
+        sizes[a] += sizes[b]
+        members[a].extend(members[b])
+        members[b] = []
+
+    return [group for group in members if group]
+
+
+def cluster_headings(
+    headings: Sequence[str], threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+) -> models.TopicClusterList:
+    """
+    Groups competitor headings (and any manual keywords) into topic clusters
+    locally, without an LLM call.
+
+    Within each cluster, items are ordered by similarity to the cluster
+    centroid, and the most central item names the cluster. Clusters are
+    returned largest first.
+
+    Args:
+        headings: Raw headings and keywords; duplicates are removed.
+        threshold: Average-linkage cosine similarity needed to merge groups.
+
+    Returns:
+        A TopicClusterList in the same shape the LLM grouper produces.
+    """
+    texts = _dedupe(headings)
+    if not texts:
+        return models.TopicClusterList(clusters=[])
+
+    vectors = embed_texts(texts)
+    groups = agglomerate(vectors, threshold)
+
+    clusters = []
+    for group in sorted(groups, key=len, reverse=True):
+        centroid = vectors[group].mean(axis=0)
+        ordered = sorted(group, key=lambda i: float(vectors[i] @ centroid), reverse=True)
+        items = [texts[i] for i in ordered]
+        clusters.append(models.TopicCluster(cluster_name=items[0], headings_and_keywords=items))
+    return models.TopicClusterList(clusters=clusters)
+
+
+def apply_cluster_names(
+    clusters: models.TopicClusterList, names: models.ClusterNameList
+) -> models.TopicClusterList:
+    """
+    Replaces the placeholder names of locally built clusters with the names
+    chosen by the LLM. Clusters the LLM skipped keep their local name.
+    """
+    chosen = {entry.cluster_id: entry.cluster_name.strip() for entry in names.clusters}
+    return models.TopicClusterList(
+        clusters=[
+            models.TopicCluster(
+                cluster_name=chosen.get(cluster_id) or cluster.cluster_name,
+                headings_and_keywords=cluster.headings_and_keywords,
+            )
+            for cluster_id, cluster in enumerate(clusters.clusters)
+        ]
+    )
@@ -0,0 +1,148 @@
+# In backend/app/services/coalescing_service.py
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import redis
+from dotenv import load_dotenv
+
+from .. import telemetry
+from ..redis_client import get_redis_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Identical projects submitted while one is in flight attach to it instead of
+# running their own pipeline. Without Redis every project simply runs alone.
+PROJECT_COALESCING_ENABLED = os.getenv("PROJECT_COALESCING_ENABLED", "true").lower() == "true"
+# The leader's lease; once it lapses, the next identical submission runs its own pipeline.
+PROJECT_COALESCING_LEASE_SECONDS = int(os.getenv("PROJECT_COALESCING_LEASE_SECONDS", "1800"))
+
+# KEYS: lease, waiters. ARGV: the caller's "project_id:task_id", lease ms.
+# Returns the current leader's value after queueing the caller as a waiter, or
+# nil when the caller took the lease and leads.
+_ATTACH_SCRIPT = """
+local leader = redis.call('GET', KEYS[1])
+if leader then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+    redis.call('PEXPIRE', KEYS[2], ARGV[2])
+    return leader
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return false
+"""
+
+# KEYS: lease, waiters. ARGV: leader value.
+# Releases the lease and returns the waiters, unless another leader has since
+# taken over the lapsed lease: it then serves the waiters itself.
+_FINISH_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder and holder ~= ARGV[1] then
+    return {}
+end
+local waiters = redis.call('LRANGE', KEYS[2], 0, -1)
+redis.call('DEL', KEYS[1], KEYS[2])
+return waiters
+"""
+
+
+@dataclass
+class Leader:
+    """The in-flight project a submission attached to."""
+    project_id: int
+    task_id: str
+
+
+@dataclass
+class Waiter:
+    """A project attached to a leader, with the task id its client polls."""
+    project_id: int
+    task_id: Optional[str]
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+def project_fingerprint(
+    keyword: str,
+    location: Optional[str],
+    manual_keywords: Optional[Sequence[str]],
+    genre: Optional[str] = None,
+) -> str:
+    """
+    Identifies projects that produce the same outline: case, spacing and the
+    order or duplication of manual keywords don't matter. The genre is part of
+    it because entities are matched against the genre's gazetteer.
+    """
+    payload = {
+        "keyword": _normalize(keyword),
+        "location": _normalize(location),
+        "genre": _normalize(genre),
+        "manual_keywords": sorted({_normalize(k) for k in manual_keywords or [] if _normalize(k)}),
+    }
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def _keys(fingerprint: str) -> List[str]:
+    return [f"singleflight:project:{fingerprint}", f"singleflight:project:{fingerprint}:waiters"]
+
+
+def attach(fingerprint: str, project_id: int, task_id: str) -> Optional[Leader]:
+    """
+    Atomically either takes the lease for `fingerprint` (returns None: run the
+    pipeline as `task_id`) or queues the project behind the in-flight leader
+    (returns the leader). A queued project keeps `task_id`: the leader marks it
+    done on delivery, or the project runs under it if the leader fails.
+    Returns None when coalescing is off or Redis fails.
+    """
+    if not PROJECT_COALESCING_ENABLED:
+        return None
+    try:
+        script = get_redis_client().register_script(_ATTACH_SCRIPT)
+        leader = script(
+            keys=_keys(fingerprint),
+            args=[f"{project_id}:{task_id}", PROJECT_COALESCING_LEASE_SECONDS * 1000],
+        )
+    except redis.exceptions.RedisError as e:
+        logger.warning("Project coalescing unavailable", extra={"project_id": project_id, "error": str(e)})
+        return None
+
+    if leader is None:
+        telemetry.record_project_coalescing("leader")
+        return None
+    leader_project_id, leader_task_id = leader.decode().split(":", 1)
+    telemetry.record_project_coalescing("attached")
+    logger.info(
+        "Project attached to an in-flight pipeline",
+        extra={"project_id": project_id, "leader_project_id": int(leader_project_id)},
+    )
+    return Leader(project_id=int(leader_project_id), task_id=leader_task_id)
+
+
+def finish(fingerprint: str, project_id: int, task_id: str) -> List[Waiter]:
+    """
+    Releases the leader's lease and returns the projects that attached to it,
+    in order. Safe to call for failed pipelines too.
+    """
+    if not PROJECT_COALESCING_ENABLED:
+        return []
+    try:
+        script = get_redis_client().register_script(_FINISH_SCRIPT)
+        waiters = script(keys=_keys(fingerprint), args=[f"{project_id}:{task_id}"])
+    except redis.exceptions.RedisError as e:
+        logger.warning("Project coalescing release failed", extra={"project_id": project_id, "error": str(e)})
+        return []
+    # A waiter that later re-dispatched itself may appear twice, or be the leader itself.
+    # Entries queued before waiters carried a task id hold the project id only.
+    by_project = {}
+    for value in waiters:
+        waiter_project_id, _, waiter_task_id = value.decode().partition(":")
+        by_project[int(waiter_project_id)] = Waiter(int(waiter_project_id), waiter_task_id or None)
+    by_project.pop(project_id, None)
+    return list(by_project.values())
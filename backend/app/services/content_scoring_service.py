@@ -0,0 +1,254 @@
+# In backend/app/services/content_scoring_service.py
+
+import math
+import re
+from collections import Counter, defaultdict
+from statistics import median
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from .. import models
+from ..config import (
+    CONTENT_SCORE_ENTITY_BOOST,
+    CONTENT_SCORE_MAX_NGRAM,
+    CONTENT_SCORE_MAX_TERMS,
+    CONTENT_SCORE_MIN_PAGES,
+)
+
+# Tokens keep their inner punctuation, so "node.js", "c++" and "e-commerce" stay whole.
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:['.\-][a-z0-9+#]+)*")
+
+# A regex tokenizer and a short stop-word list keep scoring free of spaCy: a
+# 5k-word draft is tokenized in a few milliseconds, in the API as well as the worker.
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each either etc even ever every few for from
+further get gets got had has have having he her here hers herself him himself his how however i if in
+into is it its itself just least less let like made make makes many may me might more most much must my
+myself neither no nor not now of off often on once one only or other others our ours ourselves out over
+own per rather same several she should since so some such than that the their theirs them themselves then
+there these they this those though through thus to too two under until up upon us use used uses using very
+via was we well were what when where whether which while who whom whose why will with within without would
+yet you your yours yourself yourselves
+""".split())
+
+
+def _normalize(token: str) -> str:
+    """Folds possessives and regular plurals so "images" and "image's" match "image"."""
+    if token.endswith("'s"):
+        token = token[:-2]
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_normalize(token) for token in _TOKEN.findall(text.lower())]
+
+
+def _phrase_key(phrase: str) -> str:
+    return " ".join(tokenize(phrase))
+
+
+def _is_term_edge(token: str) -> bool:
+    """Phrases may contain stop words and numbers ("bank of america") but not start or end with one."""
+    return len(token) > 1 and token not in STOP_WORDS and not token.isdigit()
+
+
+def _count_ngrams(tokens: Sequence[str], max_n: int) -> Counter:
+    """Counts every unigram and n-gram up to `max_n` words that starts and ends on a content word."""
+    counts: Counter = Counter()
+    for i, token in enumerate(tokens):
+        if not _is_term_edge(token):
+            continue
+        counts[token] += 1
+        phrase = token
+        for j in range(i + 1, min(i + max_n, len(tokens))):
+            phrase += " " + tokens[j]
+            if _is_term_edge(tokens[j]):
+                counts[phrase] += 1
+    return counts
+
+
+def _count_vocabulary(tokens: Sequence[str], vocabulary: Dict[str, object], prefixes: Set[str], max_n: int) -> Counter:
+    """
+    Counts only the phrases in `vocabulary`. A phrase is extended only while it
+    is the prefix of some vocabulary phrase, so most tokens cost one lookup.
+    """
+    counts: Counter = Counter()
+    for i, token in enumerate(tokens):
+        if token in vocabulary:
+            counts[token] += 1
+        phrase = token
+        for j in range(i + 1, min(i + max_n, len(tokens))):
+            if phrase not in prefixes:
+                break
+            phrase += " " + tokens[j]
+            if phrase in vocabulary:
+                counts[phrase] += 1
+    return counts
+
+
+def _prefixes(phrases: Iterable[str]) -> Set[str]:
+    prefixes = set()
+    for phrase in phrases:
+        words = phrase.split(" ")
+        prefixes.update(" ".join(words[:n]) for n in range(1, len(words)))
+    return prefixes
+
+
+# --- 1. Building a project's term vector ---
+
+def build_term_weights(page_texts: Sequence[str], entities: Sequence[str] = ()) -> models.TermWeights:
+    """
+    Builds the sparse TF-IDF term vector of the competitor pages.
+
+    Each page is a vector of sublinear TF-IDF weights over its unigrams and
+    bigrams (plus the extracted entities, matched as phrases); the project's
+    vector is the centroid of the L2-normalised page vectors. Terms used by
+    only one competitor are dropped as noise, entities are boosted, and only
+    the top CONTENT_SCORE_MAX_TERMS are kept.
+
+    Args:
+        page_texts: Main-content text of each scraped competitor page.
+        entities: Named entities extracted from the same pages.
+
+    Returns:
+        TermWeights with, per term, its weight and the median number of times
+        the competitors that use it do so.
+    """
+    entity_keys = {_phrase_key(entity): entity for entity in entities}
+    entity_keys.pop("", None)
+    entity_prefixes = _prefixes(entity_keys)
+
+    page_counts: List[Counter] = []
+    surface_forms: Dict[str, Counter] = defaultdict(Counter)
+    for text in page_texts:
+        tokens = tokenize(text)
+        counts = _count_ngrams(tokens, max_n=2)
+        counts |= _count_vocabulary(tokens, entity_keys, entity_prefixes, CONTENT_SCORE_MAX_NGRAM)
+        page_counts.append(counts)
+        # Unigram spellings, so terms are shown as written ("kubernetes", not "kubernete").
+        for surface in _TOKEN.findall(text.lower()):
+            surface_forms[_normalize(surface)][surface] += 1
+
+    page_total = len(page_counts)
+    document_frequency: Counter = Counter()
+    for counts in page_counts:
+        document_frequency.update(counts.keys())
+    min_pages = min(CONTENT_SCORE_MIN_PAGES, page_total)
+    candidates = {
+        term for term, df in document_frequency.items() if df >= min_pages or term in entity_keys
+    }
+
+    centroid: Counter = Counter()
+    for counts in page_counts:
+        vector = {
+            term: (1 + math.log(count)) * (math.log((1 + page_total) / (1 + document_frequency[term])) + 1)
+            for term, count in counts.items()
+            if term in candidates
+        }
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        for term, value in vector.items():
+            centroid[term] += value / norm / page_total
+    for term in entity_keys.keys() & centroid.keys():
+        centroid[term] *= CONTENT_SCORE_ENTITY_BOOST
+
+    def display(term: str) -> str:
+        if term in entity_keys:
+            return entity_keys[term]
+        return " ".join(
+            surface_forms[word].most_common(1)[0][0] if surface_forms[word] else word for word in term.split(" ")
+        )
+
+    terms = [
+        models.TermWeight(
+            term=display(term),
+            weight=round(weight, 5),
+            target_count=max(1, round(median(counts[term] for counts in page_counts if term in counts))),
+            entity=term in entity_keys,
+        )
+        for term, weight in centroid.most_common(CONTENT_SCORE_MAX_TERMS)
+    ]
+    return models.TermWeights(page_count=page_total, terms=terms)
+
+
+# --- 2. Scoring drafts ---
+
+class ContentScorer:
+    """
+    Scores a draft's coverage of a project's term vector, one section at a time.
+
+    The score is the weighted share of competitor terms the draft uses at
+    their typical frequency:
+
+        score = 100 * sum(w * min(count / target, 1)) / sum(w)
+
+    Term counts are additive across sections, so adding a section only
+    tokenizes that section and updates the terms it contains; the article is
+    never rescanned.
+    """
+
+    def __init__(self, term_weights: models.TermWeights):
+        self._terms: Dict[str, models.TermWeight] = {}
+        for term in term_weights.terms:
+            key = _phrase_key(term.term)
+            if key:
+                self._terms[key] = term
+        self._prefixes = _prefixes(self._terms)
+        self._max_n = max((key.count(" ") + 1 for key in self._terms), default=1)
+        self._total_weight = sum(term.weight for term in self._terms.values()) or 1.0
+        self._counts: Counter = Counter()
+        self._covered = 0.0
+        self.sections: List[models.SectionScore] = []
+        self.word_count = 0
+
+    def _coverage(self, key: str, count: int) -> float:
+        term = self._terms[key]
+        return term.weight * min(count / term.target_count, 1.0)
+
+    def add_section(self, h2: str, content: str) -> models.SectionScore:
+        """Adds a section's term counts to the draft and returns what it contributed."""
+        counts = _count_vocabulary(tokenize(content), self._terms, self._prefixes, self._max_n)
+        before = self._covered
+        for key, count in counts.items():
+            previous = self._counts[key]
+            self._covered += self._coverage(key, previous + count) - self._coverage(key, previous)
+            self._counts[key] = previous + count
+
+        section = models.SectionScore(
+            h2=h2,
+            word_count=len(content.split()),
+            terms_used=len(counts),
+            score_gain=round(100 * (self._covered - before) / self._total_weight, 2),
+        )
+        self.sections.append(section)
+        self.word_count += section.word_count
+        return section
+
+    @property
+    def score(self) -> float:
+        return round(100 * self._covered / self._total_weight, 2)
+
+    def missing_terms(self, limit: int = 10) -> List[str]:
+        """The highest-weighted terms the draft doesn't use at all yet."""
+        missing = [term for key, term in self._terms.items() if not self._counts[key]]
+        missing.sort(key=lambda term: term.weight, reverse=True)
+        return [term.term for term in missing[:limit]]
+
+    def result(self) -> models.ContentScore:
+        return models.ContentScore(
+            score=self.score,
+            word_count=self.word_count,
+            sections=list(self.sections),
+            missing_terms=self.missing_terms(),
+        )
+
+
+def score_draft(term_weights: models.TermWeights, sections: Sequence[Tuple[str, str]]) -> models.ContentScore:
+    """Scores a whole draft given as (h2, content) pairs."""
+    scorer = ContentScorer(term_weights)
+    for h2, content in sections:
+        scorer.add_section(h2, content)
+    return scorer.result()
@@ -0,0 +1,183 @@
+# In backend/app/services/draft_screening_service.py
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Sequence, Set, Tuple
+
+from ..config import (
+    PRESCREEN_MAX_AVG_SENTENCE_WORDS,
+    PRESCREEN_MAX_WORDS,
+    PRESCREEN_MIN_READING_EASE,
+    PRESCREEN_MIN_WORDS,
+    PRESCREEN_TOPIC_COVERAGE,
+    PRESCREEN_WORDS_PER_H3,
+)
+from .nlp_service import get_nlp
+
+# Only the components needed for lemmas; the parser and NER are the expensive part.
+_LEMMA_DISABLED_PIPES = ("parser", "ner")
+
+# Sentence-ending punctuation, allowing closing quotes, brackets and Markdown emphasis.
+_SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]*_]*(?:\s|$)")
+_ENDS_WITH_SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]*_]*$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_MARKDOWN_HEADING = re.compile(r"^\s*#{1,6}\s*(.+?)\s*#*\s*$")
+_BOLD_LINE = re.compile(r"^\s*\*\*(.+?)\*\*\s*:?\s*$")
+
+
+@dataclass
+class ScreenResult:
+    """The outcome of screening one drafted section."""
+    passed: bool
+    # 0-1: how confident the local checks are that an editor would approve.
+    confidence: float
+    issues: List[str] = field(default_factory=list)
+    missing_topics: List[str] = field(default_factory=list)
+
+    @property
+    def feedback(self) -> str:
+        """The issues as actionable feedback for the writer."""
+        return " ".join(self.issues)
+
+
+def _content_lemmas(doc) -> Set[str]:
+    return {
+        (token.lemma_ or token.text).lower()
+        for token in doc
+        if not (token.is_stop or token.is_punct or token.is_space)
+    }
+
+
+def _count_syllables(word: str) -> int:
+    """Vowel-group heuristic; accurate enough for a readability bound."""
+    word = word.lower()
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith("e") and not word.endswith("le") and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def reading_ease(words: Sequence[str], sentence_count: int) -> float:
+    """Flesch Reading Ease: higher is easier; dense B2B prose typically scores 30-50."""
+    if not words or not sentence_count:
+        return 0.0
+    syllables = sum(_count_syllables(word) for word in words)
+    return 206.835 - 1.015 * (len(words) / sentence_count) - 84.6 * (syllables / len(words))
+
+
+def _is_heading_line(line: str) -> bool:
+    return bool(_MARKDOWN_HEADING.match(line) or _BOLD_LINE.match(line))
+
+
+def _prose_sentences(content: str) -> Tuple[List[str], int]:
+    """
+    Returns the words of a draft's prose and its sentence count. Heading lines
+    are left out, and every list item and paragraph ends a sentence even when
+    it has no closing punctuation, as bullet points usually don't.
+    """
+    blocks: List[List[str]] = [[]]
+    for line in content.splitlines():
+        if not line.strip() or _is_heading_line(line):
+            blocks.append([])
+        elif _LIST_ITEM.match(line):
+            blocks.append([_LIST_ITEM.sub("", line, count=1)])
+        else:
+            blocks[-1].append(line)
+
+    words: List[str] = []
+    sentence_count = 0
+    for block in blocks:
+        text = " ".join(block).strip()
+        if not text:
+            continue
+        words.extend(text.split())
+        sentence_count += len(_SENTENCE_END.findall(text)) + (not _ENDS_WITH_SENTENCE_END.search(text))
+    return words, sentence_count
+
+
+def _heading_lines(content: str) -> List[str]:
+    headings = []
+    for line in content.splitlines():
+        match = _MARKDOWN_HEADING.match(line) or _BOLD_LINE.match(line)
+        if match:
+            headings.append(match.group(1).strip().rstrip(":"))
+    return headings
+
+
+def screen_section(content: str, h2: str, h3_topics: Sequence[str]) -> ScreenResult:
+    """
+    Checks a drafted section locally before it reaches the editor LLM.
+
+    - Coverage: each H3 counts as covered when enough of its content-word
+      lemmas appear in the draft.
+    - Length: within a floor that grows with the number of H3s and a ceiling.
+    - Readability: Flesch Reading Ease and average sentence length of the
+      prose, where list items and paragraphs end sentences and headings are skipped.
+    - Repetition: no heading line that repeats an outline title or another heading.
+
+    Args:
+        content: The writer's draft for the section.
+        h2: The section's H2 title.
+        h3_topics: The H3 topics the section must cover.
+
+    Returns:
+        A ScreenResult; `issues` doubles as feedback for the writer.
+    """
+    issues = []
+    words = content.split()
+    word_count = len(words)
+
+    nlp = get_nlp()
+    disabled = [name for name in _LEMMA_DISABLED_PIPES if name in nlp.pipe_names]
+    docs = list(nlp.pipe([content, *h3_topics], disable=disabled))
+    draft_lemmas = _content_lemmas(docs[0])
+    missing_topics = []
+    recalls = []
+    for topic, doc in zip(h3_topics, docs[1:]):
+        topic_lemmas = _content_lemmas(doc)
+        recall = len(topic_lemmas & draft_lemmas) / len(topic_lemmas) if topic_lemmas else 1.0
+        recalls.append(recall)
+        if recall < PRESCREEN_TOPIC_COVERAGE:
+            missing_topics.append(topic)
+    if missing_topics:
+        issues.append("Cover these sub-topics explicitly: " + "; ".join(missing_topics) + ".")
+
+    min_words = max(PRESCREEN_MIN_WORDS, PRESCREEN_WORDS_PER_H3 * len(h3_topics))
+    if word_count < min_words:
+        issues.append(f"The section is only {word_count} words; expand it to at least {min_words} words.")
+    elif word_count > PRESCREEN_MAX_WORDS:
+        issues.append(f"The section is {word_count} words; tighten it to under {PRESCREEN_MAX_WORDS} words.")
+
+    prose_words, sentence_count = _prose_sentences(content)
+    sentence_count = max(sentence_count, 1)
+    avg_sentence_words = len(prose_words) / sentence_count
+    ease = reading_ease(prose_words, sentence_count)
+    if avg_sentence_words > PRESCREEN_MAX_AVG_SENTENCE_WORDS:
+        issues.append(
+            f"Sentences average {avg_sentence_words:.0f} words; "
+            f"break them up to under {PRESCREEN_MAX_AVG_SENTENCE_WORDS} words."
+        )
+    elif ease < PRESCREEN_MIN_READING_EASE:
+        issues.append("The prose is hard to read; prefer shorter words and plainer phrasing.")
+
+    outline_titles = {title.casefold() for title in [h2, *h3_topics]}
+    seen = set()
+    repeated = []
+    for heading in _heading_lines(content):
+        key = heading.casefold()
+        if key in outline_titles or key in seen:
+            repeated.append(heading)
+        seen.add(key)
+    if repeated:
+        issues.append("Remove headings that repeat the outline titles or each other: " + "; ".join(repeated) + ".")
+
+    coverage = sum(recalls) / len(recalls) if recalls else 1.0
+    # Each failed check other than coverage costs a fixed share of confidence.
+    penalty = 0.25 * (len(issues) - bool(missing_topics))
+    return ScreenResult(
+        passed=not issues,
+        confidence=round(max(coverage - penalty, 0.0), 3),
+        issues=issues,
+        missing_topics=missing_topics,
+    )
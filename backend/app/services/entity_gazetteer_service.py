@@ -0,0 +1,276 @@
+# In backend/app/services/entity_gazetteer_service.py
+
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import ENTITY_EXTRACTION_MODE, ENTITY_NER_SAMPLE_PAGES
+from .nlp_service import ALLOWED_ENTITY_LABELS, extract_entities_from_text, get_nlp
+
+logger = logging.getLogger(__name__)
+
+# Trailing words that don't change which organisation is meant ("Google LLC" is "Google").
+LEGAL_SUFFIXES = {
+    "ab", "ag", "bv", "co", "company", "corp", "corporation", "gmbh", "inc", "incorporated",
+    "limited", "llc", "llp", "lp", "ltd", "nv", "plc", "private", "pte", "pvt", "sa",
+}
+# NER needs only its own tok2vec; the tagger, parser and lemmatizer are skipped.
+_NER_DISABLED_PIPES = ("tagger", "parser", "attribute_ruler", "lemmatizer")
+# Compiled gazetteers kept in memory; genres are free text, so the least recently used are dropped.
+GAZETTEER_CACHE_SIZE = 64
+
+_POSSESSIVE = re.compile(r"['’]s\b")
+_WORD = re.compile(r"\w+")
+
+
+def _words(name: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", name).casefold().replace("&", " and ")
+    return _WORD.findall(_POSSESSIVE.sub("", text.replace(".", "")))
+
+
+def normalize_entity(name: str) -> str:
+    """
+    The key that aliases of one entity share: case, punctuation, a leading
+    "The" and legal suffixes are ignored, so "Google LLC", "google" and
+    "Google's" all become "google".
+    """
+    words = _words(name)
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words = words[:-1]
+    return " ".join(words)
+
+
+def _strip_legal_suffix(name: str) -> str:
+    """The surface form without its legal suffix, kept as a matching alias."""
+    parts = name.split()
+    while len(parts) > 1 and parts[-1].casefold().strip(".,") in LEGAL_SUFFIXES:
+        parts = parts[:-1]
+    return " ".join(parts).rstrip(",")
+
+
+def _trie_pattern(node: Dict[str, Dict]) -> str:
+    """
+    Renders a character trie as a regex. Each branch point is one alternation,
+    so matching costs the same however many names there are, and an alias that
+    is a prefix of a longer one is optional, so the longest alias wins.
+    """
+    terminal = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+    return body
+
+
+def _trie(aliases: Iterable[str]) -> Dict[str, Dict]:
+    trie: Dict[str, Dict] = {}
+    for alias in aliases:
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return trie
+
+
+def _compile_aliases(phrases: Iterable[str], words: Iterable[str]) -> Optional[re.Pattern]:
+    """
+    One regex for both kinds of alias: lowercase phrases match in any case,
+    single words only as spelled. Phrases come first, since at any position a
+    matching phrase is longer than a matching word.
+    """
+    alternatives = []
+    phrase_trie, word_trie = _trie(phrases), _trie(words)
+    if phrase_trie:
+        alternatives.append("(?P<phrase>(?i:" + _trie_pattern(phrase_trie) + "))")
+    if word_trie:
+        alternatives.append("(?P<word>" + _trie_pattern(word_trie) + ")")
+    if not alternatives:
+        return None
+    # An alias only matches whole words: "ai" must not match inside "email".
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)")
+
+
+def _match_form(text: str) -> str:
+    """Single spaces, the form both aliases and pages are matched in."""
+    return " ".join(text.split())
+
+
+class Gazetteer:
+    """
+    The known entities of a niche, merged by normalized key and compiled into
+    trie-shaped regexes.
+
+    Multi-word aliases match in any case. A single word only matches as it was
+    spelled in a known name: "Teams", "Target" or "Apple" are entities, but
+    "our teams target growth" and "an apple a day" are ordinary words, which NER
+    wouldn't count either.
+
+    Matching runs in the regex engine without tokenizing the pages, so counting
+    known entities across all competitor pages is far cheaper than running the
+    statistical NER, or even spaCy's tokenizer.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = [" ".join(name.split()) for name in names if name and name.strip()]
+        forms: Dict[str, Counter] = defaultdict(Counter)
+        for name in self.names:
+            key = normalize_entity(name)
+            if len(key) > 2:
+                forms[key][name] += 1
+        # Each entity is shown as its most frequent spelling (shorter on ties), without a legal suffix.
+        self.display = {
+            key: _strip_legal_suffix(min(counts, key=lambda name: (-counts[name], len(name))))
+            for key, counts in forms.items()
+        }
+
+        # (pattern, {lowercase phrase: key}, {word: key})
+        self._patterns: List[Tuple[re.Pattern, Dict[str, str], Dict[str, str]]] = []
+        phrases: Dict[str, str] = {}
+        words: Dict[str, str] = {}
+        for key, counts in forms.items():
+            for alias in set(counts) | {_strip_legal_suffix(name) for name in counts}:
+                alias = _match_form(alias)
+                if " " in alias:
+                    phrases.setdefault(alias.lower(), key)
+                else:
+                    words.setdefault(alias, key)
+        pattern = _compile_aliases(phrases, words)
+        if pattern:
+            self._patterns.append((pattern, phrases, words))
+
+    def __len__(self) -> int:
+        return len(self.display)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_entity(name) in self.display
+
+    def extended(self, names: Sequence[str]) -> "Gazetteer":
+        """
+        A gazetteer that also knows `names`. Only the new names are compiled;
+        the existing patterns are shared, never mutated.
+        """
+        extension = Gazetteer(names)
+        extension.names = [*self.names, *extension.names]
+        extension.display = {**extension.display, **self.display}
+        extension._patterns = [*self._patterns, *extension._patterns]
+        return extension
+
+    def count(self, texts: Iterable[str]) -> Counter:
+        """
+        Counts entity mentions by key. Overlapping matches resolve to the
+        longest one, so "Google Cloud" isn't also counted as "Google".
+        """
+        counts: Counter = Counter()
+        for text in texts:
+            text = _match_form(text)
+            spans = [
+                (match.start(), match.end(), key)
+                for pattern, phrases, words in self._patterns
+                for match in pattern.finditer(text)
+                for key in [
+                    phrases.get(match.group().lower()) if match.lastgroup == "phrase" else words.get(match.group())
+                ]
+                if key
+            ]
+            if len(self._patterns) > 1:
+                spans = _longest_non_overlapping(spans)
+            counts.update(key for _, _, key in spans)
+        return counts
+
+
+def _longest_non_overlapping(spans: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+    """Keeps the longest of overlapping spans (the earliest on ties), like spaCy's filter_spans."""
+    kept: List[Tuple[int, int, str]] = []
+    taken: set = set()
+    for start, end, key in sorted(spans, key=lambda span: (span[0] - span[1], span[0])):
+        if not taken.intersection(range(start, end)):
+            kept.append((start, end, key))
+            taken.update(range(start, end))
+    return kept
+
+
+# Compiled gazetteers per genre, reused while the genre's entity history is unchanged.
+_gazetteers: "OrderedDict[str, Tuple[str, Gazetteer]]" = OrderedDict()
+
+
+def get_gazetteer(genre: Optional[str], names: Sequence[str]) -> Gazetteer:
+    """Returns the compiled gazetteer for a genre's known entities, building it only when they change."""
+    fingerprint = hashlib.blake2b("\n".join(sorted(names)).encode(), digest_size=16).hexdigest()
+    cached = _gazetteers.get(genre or "")
+    if cached is None or cached[0] != fingerprint:
+        cached = (fingerprint, Gazetteer(names))
+        _gazetteers[genre or ""] = cached
+    _gazetteers.move_to_end(genre or "")
+    while len(_gazetteers) > GAZETTEER_CACHE_SIZE:
+        _gazetteers.popitem(last=False)
+    return cached[1]
+
+
+def _discover_entities(texts: Sequence[str]) -> List[str]:
+    nlp = get_nlp()
+    disabled = [name for name in _NER_DISABLED_PIPES if name in nlp.pipe_names]
+    return [
+        ent.text.strip()
+        for doc in nlp.pipe(texts, disable=disabled)
+        for ent in doc.ents
+        if ent.label_ in ALLOWED_ENTITY_LABELS and len(ent.text.strip()) > 2
+    ]
+
+
+def extract_entities(
+    texts: Sequence[str],
+    gazetteer: Optional[Gazetteer] = None,
+    top_n: int = 20,
+    mode: str = ENTITY_EXTRACTION_MODE,
+) -> List[str]:
+    """
+    Extracts the most frequent named entities across competitor pages.
+
+    With a non-empty gazetteer, every mention is counted by phrase matching
+    on every page, so counts are consistent across pages and projects. In
+    "hybrid" mode the statistical NER also runs on the first
+    ENTITY_NER_SAMPLE_PAGES pages; entities it finds that the gazetteer
+    doesn't know are added to the gazetteer before counting. Without a
+    gazetteer (a genre's first project) or in "ner" mode, NER runs over
+    every page as before.
+
+    Args:
+        texts: Main-content text of each page, in SERP order.
+        gazetteer: Known entities of the project's genre.
+        top_n: The number of top entities to return.
+        mode: "ner", "hybrid" or "gazetteer"; see ENTITY_EXTRACTION_MODE.
+
+    Returns:
+        A list of the most frequent entities, each under its canonical spelling.
+    """
+    texts = [text for text in texts if text]
+    if mode == "ner" or not gazetteer:
+        return extract_entities_from_text("\n".join(texts), top_n=top_n)
+
+    new_entities = []
+    if mode == "hybrid" and ENTITY_NER_SAMPLE_PAGES > 0:
+        new_entities = [name for name in _discover_entities(texts[:ENTITY_NER_SAMPLE_PAGES]) if name not in gazetteer]
+        if new_entities:
+            gazetteer = gazetteer.extended(new_entities)
+
+    counts = gazetteer.count(texts)
+    most_common_entities = [gazetteer.display[key] for key, _ in counts.most_common(top_n)]
+
+    logger.info(
+        "Extracted top entities",
+        extra={
+            "mode": mode,
+            "entity_count": len(most_common_entities),
+            "known_entities": len(gazetteer),
+            "new_entities": len(set(new_entities)),
+            "entities": most_common_entities,
+        },
+    )
+    return most_common_entities
@@ -0,0 +1,251 @@
+# In backend/app/services/extraction_service.py
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# Elements that never carry article content.
+BOILERPLATE_TAGS = (
+    "script", "style", "noscript", "template", "iframe", "svg", "canvas",
+    "nav", "footer", "aside", "input", "button", "select", "textarea",
+)
+
+# Page chrome on most sites, but ASP.NET WebForms pages wrap the whole body in a
+# <form> and some themes put the article in a <header>, so these are removed only
+# when they pass the same checks as nodes with a boilerplate class or id.
+CONDITIONAL_TAGS = {"header", "form"}
+
+# class/id tokens that mark navigation, sidebars and other page chrome.
+BOILERPLATE_TOKENS = {
+    "nav", "navbar", "navigation", "menu", "breadcrumb", "breadcrumbs", "footer",
+    "sidebar", "rail", "widget", "promo", "ad", "ads", "advert", "banner", "cookie",
+    "comment", "comments", "related", "share", "social", "subscribe", "newsletter",
+    "toc", "catlinks", "masthead",
+}
+
+# class/id tokens of content wrappers; they outweigh boilerplate tokens ("post-share-enabled").
+CONTENT_TOKENS = {"content", "main", "article", "body", "post", "entry", "story", "text", "blog"}
+
+# Containers that may be stripped by tag but must never be stripped by a class/id hint.
+PROTECTED_TAGS = {"html", "body", "main", "article"}
+# A hinted node holding more than this share of the page's text is kept: it is a
+# wrapper ("page has-sidebar") rather than a sidebar.
+MAX_BOILERPLATE_TEXT_SHARE = 0.3
+# ...unless most of its text is links, like a long menu or link farm.
+MIN_BOILERPLATE_LINK_DENSITY = 0.5
+
+CANDIDATE_TAGS = ("div", "section", "article", "main", "td")
+PARAGRAPH_XPATH = etree.XPath("//p | //pre | //li[not(ancestor::li)] | //blockquote")
+HEADINGS_XPATH = etree.XPath(".//h2 | .//h3")
+HINTED_XPATH = etree.XPath("//*[@class or @id] | //header | //form")
+CONTAINS_MAIN_CONTENT_XPATH = etree.XPath("boolean(.//main | .//article | .//*[@role='main'])")
+# Evaluated inside libxml2, which is far cheaper than joining and normalizing text in Python.
+TEXT_LENGTH_XPATH = etree.XPath("string-length(normalize-space(.))")
+
+# Below this many characters the "main" node is probably a teaser, so we use the whole body.
+MIN_MAIN_CONTENT_CHARS = 250
+
+# Candidates scoring at least this share of the best one are alternatives to it;
+# when enough of them share an ancestor with it, the body is split across blocks
+# (<article><section><div><p>...) and the ancestor is the main content.
+ALTERNATIVE_SCORE_SHARE = 0.75
+MIN_ALTERNATIVES = 2
+TOP_CANDIDATES = 5
+# Siblings of the main node scoring at least this share of it are merged into it.
+SIBLING_SCORE_SHARE = 0.2
+# Unscored sibling paragraphs are merged when they are long and have few links.
+MIN_SIBLING_PARAGRAPH_CHARS = 80
+MAX_SIBLING_PARAGRAPH_LINK_DENSITY = 0.25
+
+_TOKEN_SPLIT = re.compile(r"[\s_\-]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class ExtractedPage:
+    """The useful parts of a competitor page."""
+    title: str = ""
+    headings: List[str] = field(default_factory=list)
+    text: str = ""
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _node_text(node: etree._Element) -> str:
+    return _normalize(" ".join(node.itertext()))
+
+
+def _text_length(node: etree._Element) -> int:
+    return int(TEXT_LENGTH_XPATH(node))
+
+
+def _is_boilerplate_hint(element: etree._Element) -> bool:
+    hints = f"{element.get('class', '')} {element.get('id', '')}".lower()
+    tokens = set(_TOKEN_SPLIT.split(hints))
+    return not BOILERPLATE_TOKENS.isdisjoint(tokens) and CONTENT_TOKENS.isdisjoint(tokens)
+
+
+def _link_density(node: etree._Element, text_length: int) -> float:
+    return sum(_text_length(link) for link in node.iter("a")) / (text_length or 1)
+
+
+def _is_removable(element: etree._Element, page_length: int) -> bool:
+    """
+    Whether a <header>, <form> or node with a boilerplate hint is page chrome: it
+    must not hold the main content, and must carry little of the page's text or
+    be mostly links.
+    """
+    if element.tag in PROTECTED_TAGS or element.get("role") == "main":
+        return False
+    if element.tag not in CONDITIONAL_TAGS and not _is_boilerplate_hint(element):
+        return False
+    if CONTAINS_MAIN_CONTENT_XPATH(element):
+        return False
+    text_length = _text_length(element)
+    return (
+        text_length <= page_length * MAX_BOILERPLATE_TEXT_SHARE
+        or _link_density(element, text_length) >= MIN_BOILERPLATE_LINK_DENSITY
+    )
+
+
+def strip_boilerplate(root: etree._Element) -> None:
+    """Removes scripts, styles, form controls, navigation, sidebars and footers in place."""
+    etree.strip_elements(root, *BOILERPLATE_TAGS, with_tail=False)
+    etree.strip_elements(root, etree.Comment, with_tail=False)
+
+    page_length = _text_length(root)
+    for element in HINTED_XPATH(root):
+        parent = element.getparent()
+        if parent is not None and _is_removable(element, page_length):
+            parent.remove(element)
+
+
+def _score_candidates(root: etree._Element) -> Dict[etree._Element, float]:
+    """
+    Scores candidate nodes Readability-style: every paragraph awards its text
+    length to its parent and half of it to its grandparent, and candidates full
+    of links are penalised.
+    """
+    scores: Dict[etree._Element, float] = {}
+    for paragraph in PARAGRAPH_XPATH(root):
+        text_length = _text_length(paragraph)
+        if text_length < 25:
+            continue
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for node, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if node is not None and node.tag in CANDIDATE_TAGS:
+                scores[node] = scores.get(node, 0.0) + text_length * weight
+    return {node: score * (1 - _link_density(node, _text_length(node))) for node, score in scores.items()}
+
+
+def _promote_common_ancestor(best_node: etree._Element, ranked: List[etree._Element],
+                             scores: Dict[etree._Element, float]) -> etree._Element:
+    """Returns the closest ancestor of best_node that also holds enough close alternatives to it."""
+    best_score = scores[best_node]
+    alternatives = [
+        node for node in ranked[1:TOP_CANDIDATES]
+        if scores[node] >= best_score * ALTERNATIVE_SCORE_SHARE
+    ]
+    if len(alternatives) < MIN_ALTERNATIVES:
+        return best_node
+    alternative_ancestors = [set(node.iterancestors()) for node in alternatives]
+    for ancestor in best_node.iterancestors():
+        if ancestor.tag in ("body", "html"):
+            break
+        if sum(ancestor in ancestors for ancestors in alternative_ancestors) >= MIN_ALTERNATIVES:
+            return ancestor
+    return best_node
+
+
+def _is_content_sibling(sibling: etree._Element, scores: Dict[etree._Element, float], threshold: float) -> bool:
+    if scores.get(sibling, 0.0) >= threshold:
+        return True
+    if sibling.tag != "p":
+        return False
+    text_length = _text_length(sibling)
+    return (
+        text_length >= MIN_SIBLING_PARAGRAPH_CHARS
+        and _link_density(sibling, text_length) < MAX_SIBLING_PARAGRAPH_LINK_DENSITY
+    )
+
+
+def find_main_content(root: etree._Element) -> List[etree._Element]:
+    """
+    Picks the nodes that hold the article body, in document order. The best
+    scoring candidate is promoted to a common ancestor when the body is split
+    across several similar blocks, then joined by siblings that score at least
+    a fifth of it, as Readability does.
+    """
+    scores = _score_candidates(root)
+    ranked = sorted((node for node, score in scores.items() if score > 0), key=scores.get, reverse=True)
+
+    body = root.find("body")
+    fallback = body if body is not None else root
+    if not ranked:
+        return [fallback]
+
+    best_node = ranked[0]
+    best_score = scores[best_node]
+    best_node = _promote_common_ancestor(best_node, ranked, scores)
+    main_nodes = [best_node]
+    parent = best_node.getparent()
+    if parent is not None and parent.tag not in ("body", "html"):
+        threshold = best_score * SIBLING_SCORE_SHARE
+        main_nodes = [
+            sibling for sibling in parent
+            if sibling is best_node or (isinstance(sibling.tag, str) and _is_content_sibling(sibling, scores, threshold))
+        ]
+
+    if sum(_text_length(node) for node in main_nodes) < MIN_MAIN_CONTENT_CHARS:
+        return [fallback]
+    return main_nodes
+
+
+def parse_html(content: bytes) -> Optional[etree._Element]:
+    """Parses raw HTML into an lxml tree. Returns None for empty or unparseable documents."""
+    if not content or not content.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(content)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def extract_from_tree(root: etree._Element) -> ExtractedPage:
+    """Extracts the title, main-content headings and main-content text from a parsed page."""
+    title_node = root.find(".//title")
+    title = _node_text(title_node) if title_node is not None else ""
+
+    strip_boilerplate(root)
+    main_nodes = find_main_content(root)
+
+    heading_nodes = [heading for node in main_nodes for heading in HEADINGS_XPATH(node)]
+    if len(heading_nodes) < 2:
+        # Some layouts put headings in sibling sections of the main text block.
+        heading_nodes = HEADINGS_XPATH(root)
+    headings = [text for text in (_node_text(h) for h in heading_nodes) if text]
+
+    text = " ".join(_node_text(node) for node in main_nodes)
+    return ExtractedPage(title=title, headings=headings, text=text)
+
+
+def extract_page(content: bytes) -> ExtractedPage:
+    """
+    Extracts boilerplate-free text and H2/H3 headings from raw HTML.
+
+    Args:
+        content: The raw HTML bytes of the page.
+
+    Returns:
+        An ExtractedPage; empty if the document could not be parsed.
+    """
+    root = parse_html(content)
+    if root is None:
+        return ExtractedPage()
+    return extract_from_tree(root)
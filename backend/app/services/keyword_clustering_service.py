@@ -0,0 +1,165 @@
+# In backend/app/services/keyword_clustering_service.py
+
+import hashlib
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from .. import models
+from ..config import KEYWORD_CLUSTER_MAX_KEYWORDS
+from . import serp_service
+
+logger = logging.getLogger(__name__)
+
+# Two top-10 SERPs sharing k URLs have Jaccard k / (20 - k); 0.25 means 4+ shared URLs.
+DEFAULT_SIMILARITY_THRESHOLD = 0.25
+
+# 128 permutations, split into bands per threshold: at 0.25, 64 bands of 2 rows make a
+# pair a candidate with ~98% probability, while most unrelated pairs never share a bucket.
+NUM_PERMUTATIONS = 128
+# Pairs at exactly the threshold must become candidates with at least this probability.
+LSH_MIN_RECALL = 0.95
+
+# Concurrent Serper requests per clustering task.
+SERP_FETCH_WORKERS = 8
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(seed=1)
+# Fixed seed: signatures must be comparable across processes and runs.
+_PERM_A = _rng.integers(1, int(_MERSENNE_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_MERSENNE_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def normalize_url(url: str) -> str:
+    """Reduces a result URL to host + path so trivial variants compare equal."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return host + (parts.path.rstrip("/") or "/")
+
+
+def _hash_url(url: str) -> int:
+    """A stable 32-bit hash (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=4).digest(), "little")
+
+
+def minhash_signature(urls: Set[str]) -> np.ndarray:
+    """
+    Computes the MinHash signature of a URL set with universal hashing
+    (a * x + b) mod p, vectorised across all permutations at once.
+    Values stay below 2**63, so uint64 arithmetic never overflows.
+    """
+    hashed = np.fromiter((_hash_url(url) for url in urls), dtype=np.uint64, count=len(urls))
+    permuted = (_PERM_A[:, None] * hashed[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def lsh_banding(threshold: float) -> Tuple[int, int]:
+    """
+    Returns (bands, rows per band) for a similarity threshold: the most rows per
+    band, which keeps dissimilar pairs out of shared buckets, such that a pair at
+    the threshold still becomes a candidate with LSH_MIN_RECALL probability.
+    Low thresholds get many one-row bands, high thresholds fewer, longer ones.
+    """
+    for rows in range(NUM_PERMUTATIONS, 1, -1):
+        bands = NUM_PERMUTATIONS // rows
+        if 1 - (1 - threshold ** rows) ** bands >= LSH_MIN_RECALL:
+            return bands, rows
+    return NUM_PERMUTATIONS, 1
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def cluster_keywords_by_serp(
+    keyword_urls: Dict[str, Sequence[str]], threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+) -> List[models.KeywordCluster]:
+    """
+    Groups keywords whose top results overlap enough to be served by one article.
+
+    Candidate pairs come from LSH banding of MinHash signatures, so the cost is
+    near-linear in the number of keywords instead of O(n²) pairwise Jaccard.
+    Every candidate is then checked with the exact Jaccard similarity.
+
+    Clustering is "hard": keywords are visited in input order (put the highest
+    priority first), each unassigned keyword becomes the primary keyword of a
+    new cluster, and only its own sufficiently similar neighbours join it. This
+    avoids chaining loosely related keywords into one oversized cluster.
+
+    Args:
+        keyword_urls: Top result URLs per keyword, in priority order.
+        threshold: Minimum Jaccard similarity between URL sets.
+
+    Returns:
+        Article-level clusters; keywords without results form their own cluster.
+    """
+    keywords = list(keyword_urls)
+    url_sets = {keyword: {normalize_url(url) for url in keyword_urls[keyword]} for keyword in keywords}
+
+    bands, rows_per_band = lsh_banding(threshold)
+    buckets: Dict[tuple, List[int]] = defaultdict(list)
+    for index, keyword in enumerate(keywords):
+        if not url_sets[keyword]:
+            continue
+        signature = minhash_signature(url_sets[keyword])
+        for band in range(bands):
+            key = (band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes())
+            buckets[key].append(index)
+
+    neighbours: Dict[int, Set[int]] = defaultdict(set)
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for member in members:
+            neighbours[member].update(members)
+
+    assigned: Set[int] = set()
+    clusters = []
+    for index, keyword in enumerate(keywords):
+        if index in assigned:
+            continue
+        assigned.add(index)
+        members = [keyword]
+        for other in sorted(neighbours[index] - assigned):
+            if _jaccard(url_sets[keyword], url_sets[keywords[other]]) >= threshold:
+                assigned.add(other)
+                members.append(keywords[other])
+        clusters.append(
+            models.KeywordCluster(
+                primary_keyword=keyword,
+                keywords=members,
+                urls=list(keyword_urls[keyword]),
+            )
+        )
+    return clusters
+
+
+def fetch_serp_urls(
+    keywords: Sequence[str], location: Optional[str] = None, num_results: int = 10
+) -> Dict[str, List[str]]:
+    """
+    Fetches the top organic URLs for many keywords, with at most
+    SERP_FETCH_WORKERS requests in flight. Repeated keywords are fetched once,
+    and only the first KEYWORD_CLUSTER_MAX_KEYWORDS are fetched at all.
+    Keywords whose SERP request fails map to an empty list.
+    """
+    keywords = list(dict.fromkeys(keywords))
+    if len(keywords) > KEYWORD_CLUSTER_MAX_KEYWORDS:
+        logger.warning(
+            "Too many keywords to cluster; fetching the highest-priority ones",
+            extra={"keyword_count": len(keywords), "limit": KEYWORD_CLUSTER_MAX_KEYWORDS},
+        )
+        keywords = keywords[:KEYWORD_CLUSTER_MAX_KEYWORDS]
+
+    def fetch(keyword: str) -> List[str]:
+        serp_data = serp_service.get_serp_results(keyword, location=location, num_results=num_results)
+        if "error" in serp_data:
+            logger.warning("SERP fetch failed for keyword", extra={"keyword": keyword})
+        return [result["link"] for result in serp_data.get("organic", [])[:num_results]]
+
+    with ThreadPoolExecutor(max_workers=SERP_FETCH_WORKERS) as pool:
+        return dict(zip(keywords, pool.map(fetch, keywords)))
@@ -0,0 +1,491 @@
+# In backend/app/services/link_index_service.py
+
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import numpy as np
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from lxml import etree
+
+from .. import models
+from .clustering_service import mean_word_vectors
+from .extraction_service import ExtractedPage
+from .scraper_service import SCRAPER_USER_AGENT, ScrapeResult, fetch_url
+
+load_dotenv()
+LINK_INDEX_DIR = Path(os.getenv("LINK_INDEX_DIR", "./data/link_index"))
+# "int8" (per-row scaled, 1 byte/dim) or "float16" (2 bytes/dim).
+LINK_INDEX_DTYPE = os.getenv("LINK_INDEX_DTYPE", "int8")
+# Parallel requests against the client's site; keep it polite.
+LINK_CRAWL_CONCURRENCY = int(os.getenv("LINK_CRAWL_CONCURRENCY", "4"))
+LINK_CRAWL_MAX_PAGES = int(os.getenv("LINK_CRAWL_MAX_PAGES", "50000"))
+# Pages fetched, embedded and appended together; bounds the crawl's memory and
+# keeps the work done before a failure.
+LINK_CRAWL_CHUNK_PAGES = int(os.getenv("LINK_CRAWL_CHUNK_PAGES", "500"))
+
+# Rewrite the index files once this share of rows belongs to changed or removed pages.
+COMPACT_DEAD_RATIO = 0.3
+# Rows are scored in blocks so dequantising never materialises the whole matrix.
+SEARCH_BLOCK_ROWS = 8192
+# Title, headings and the start of the body are enough to say what a page is about.
+EMBED_TEXT_CHARS = 4000
+MAX_SITEMAP_DEPTH = 3
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+_ROBOTS_SITEMAP = re.compile(r"^\s*sitemap:\s*(\S+)", re.IGNORECASE | re.MULTILINE)
+
+logger = logging.getLogger(__name__)
+
+
+def site_key(base_url: str) -> str:
+    """One index per host, shared by every project on that site."""
+    host = urlsplit(base_url if "//" in base_url else f"https://{base_url}").netloc.lower()
+    return host.removeprefix("www.")
+
+
+# --- 1. The on-disk index ---
+
+@dataclass
+class PageRecord:
+    """A page in the index; `row` points into the vector file."""
+    url: str
+    title: str
+    row: int
+    content_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    lastmod: Optional[str] = None
+
+
+class LinkIndex:
+    """
+    An append-only vector index for one site, stored as flat files:
+
+    - meta.json: vector width, dtype and the fixed centring vector;
+    - vectors.bin: one row per page version, int8 or float16;
+    - scales.bin: float32 per-row dequantisation scales (int8 only);
+    - pages.jsonl: a log of "add"/"remove" operations; replaying it gives the
+      live page for every URL.
+
+    New or changed pages are appended; their old rows simply become dead.
+    Vectors are memory-mapped, so only the pages touched by a search are paged
+    in, and 50k pages at 300 dims take ~15 MB as int8.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.meta: Dict = {}
+        self.pages: Dict[str, PageRecord] = {}
+        self.row_count = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._live_rows: Optional[np.ndarray] = None
+        self._row_pages: Dict[int, PageRecord] = {}
+        self._load()
+
+    @classmethod
+    def for_site(cls, base_url: str) -> "LinkIndex":
+        return cls(LINK_INDEX_DIR / site_key(base_url))
+
+    # Files
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.bin"
+
+    @property
+    def _scales_path(self) -> Path:
+        return self.directory / "scales.bin"
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.directory / "pages.jsonl"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    def _load(self) -> None:
+        if not self._meta_path.exists():
+            return
+        self.meta = json.loads(self._meta_path.read_text())
+        if not self._manifest_path.exists():
+            return
+        with open(self._manifest_path, encoding="utf-8") as f:
+            for line in f:
+                op = json.loads(line)
+                if op.pop("op") == "remove":
+                    self.pages.pop(op["url"], None)
+                else:
+                    self.pages[op["url"]] = PageRecord(**op)
+        # Rows written after the last manifest line (a crash mid-append) are dead rows.
+        # A crash between the two files leaves extra vectors without scales; the
+        # next append truncates both files to the rows they have in common.
+        row_bytes = self.meta["dim"] * np.dtype(self.meta["dtype"]).itemsize
+        self.row_count = self._vectors_path.stat().st_size // row_bytes
+        if self.meta["dtype"] == "int8":
+            scale_rows = self._scales_path.stat().st_size // 4 if self._scales_path.exists() else 0
+            self.row_count = min(self.row_count, scale_rows)
+
+    def _open_matrix(self) -> None:
+        dim, dtype = self.meta["dim"], np.dtype(self.meta["dtype"])
+        self._matrix = np.memmap(self._vectors_path, dtype=dtype, mode="r", shape=(self.row_count, dim))
+        if dtype == np.int8:
+            self._scales = np.fromfile(self._scales_path, dtype=np.float32, count=self.row_count)
+        live = np.zeros(self.row_count, dtype=bool)
+        self._row_pages = {record.row: record for record in self.pages.values() if record.row < self.row_count}
+        live[list(self._row_pages)] = True
+        self._live_rows = live
+
+    # Embedding
+
+    def prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Centres and L2-normalises raw mean word vectors with the index's fixed centroid."""
+        vectors = vectors.astype(np.float32)
+        if self.meta.get("centroid"):
+            # Texts without any known word stay zero rather than becoming "minus the centroid".
+            known = np.any(vectors != 0, axis=1)
+            vectors[known] -= np.asarray(self.meta["centroid"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    # Writes (callers hold `locked(...)`)
+
+    def append(self, records: List[PageRecord], raw_vectors: np.ndarray) -> None:
+        """Appends new page versions. `records[i].row` is assigned here."""
+        if not self.meta:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            known = raw_vectors[np.any(raw_vectors != 0, axis=1)]
+            # The centroid is fixed at creation, so later appends and queries are centred identically.
+            self.meta = {
+                "dim": int(raw_vectors.shape[1]),
+                "dtype": LINK_INDEX_DTYPE,
+                "centroid": known.mean(axis=0).tolist() if len(known) else None,
+            }
+            self._meta_path.write_text(json.dumps(self.meta))
+
+        vectors = self.prepare(raw_vectors)
+        int8 = self.meta["dtype"] == "int8"
+        if int8:
+            scales = np.abs(vectors).max(axis=1) / 127
+            safe = np.where(scales > 0, scales, 1)
+            stored = np.round(vectors / safe[:, None]).astype(np.int8)
+        else:
+            stored = vectors.astype(np.float16)
+        self._truncate_to_rows()
+        # Vectors first: a crash before the scales are written leaves rows the loader ignores.
+        with open(self._vectors_path, "ab") as f:
+            stored.tofile(f)
+        if int8:
+            with open(self._scales_path, "ab") as f:
+                scales.astype(np.float32).tofile(f)
+
+        for offset, record in enumerate(records):
+            record.row = self.row_count + offset
+        self.row_count += len(records)
+        self._log([{"op": "add", **asdict(record)} for record in records])
+        for record in records:
+            self.pages[record.url] = record
+        self._matrix = None
+
+    def _truncate_to_rows(self) -> None:
+        """Drops rows a crashed append wrote to only one of the files."""
+        row_bytes = self.meta["dim"] * np.dtype(self.meta["dtype"]).itemsize
+        for path, size in ((self._vectors_path, self.row_count * row_bytes), (self._scales_path, self.row_count * 4)):
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+
+    def update(self, records: List[PageRecord]) -> None:
+        """Stores new validators for pages whose vectors didn't change."""
+        self._log([{"op": "add", **asdict(record)} for record in records])
+        for record in records:
+            self.pages[record.url] = record
+
+    def remove(self, urls: Sequence[str]) -> None:
+        self._log([{"op": "remove", "url": url} for url in urls])
+        for url in urls:
+            self.pages.pop(url, None)
+        self._matrix = None
+
+    def _log(self, ops: List[Dict]) -> None:
+        if not ops:
+            return
+        with open(self._manifest_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(op) + "\n" for op in ops)
+
+    @property
+    def dead_ratio(self) -> float:
+        return 1 - len(self.pages) / self.row_count if self.row_count else 0.0
+
+    def compact(self) -> None:
+        """Rewrites the files with live rows only; vectors are copied, not re-embedded."""
+        if not self.row_count:
+            return
+        self._open_matrix()
+        records = sorted(self.pages.values(), key=lambda record: record.row)
+        rows = np.array([record.row for record in records], dtype=np.int64)
+
+        tmp_vectors = self._vectors_path.with_suffix(".tmp")
+        np.asarray(self._matrix[rows]).tofile(tmp_vectors)
+        if self._scales is not None:
+            self._scales[rows].tofile(self._scales_path.with_suffix(".tmp"))
+        for new_row, record in enumerate(records):
+            record.row = new_row
+        tmp_manifest = self._manifest_path.with_suffix(".tmp")
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps({"op": "add", **asdict(record)}) + "\n" for record in records)
+
+        self._matrix = self._scales = None
+        os.replace(tmp_vectors, self._vectors_path)
+        if self.meta["dtype"] == "int8":
+            os.replace(self._scales_path.with_suffix(".tmp"), self._scales_path)
+        os.replace(tmp_manifest, self._manifest_path)
+        self.row_count = len(records)
+        logger.info("Link index compacted", extra={"site": self.directory.name, "pages": self.row_count})
+
+    # Reads
+
+    def search(self, raw_queries: np.ndarray, k: int) -> List[List[Tuple[PageRecord, float]]]:
+        """
+        Returns the top-k live pages by cosine similarity for each query vector.
+        Scoring is a blocked matrix product over the memory-mapped rows.
+        """
+        if not self.pages or not len(raw_queries):
+            return [[] for _ in range(len(raw_queries))]
+        if self._matrix is None:
+            self._open_matrix()
+
+        queries = self.prepare(raw_queries).T
+        scores = np.empty((self.row_count, queries.shape[1]), dtype=np.float32)
+        for start in range(0, self.row_count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self._matrix[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ queries
+        if self._scales is not None:
+            scores *= self._scales[:, None]
+        scores[~self._live_rows] = -np.inf
+
+        k = min(k, len(self._row_pages))
+        results = []
+        for column in scores.T:
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            # Unrelated pages (and queries without a single known word) score <= 0.
+            results.append([(self._row_pages[int(row)], float(column[row])) for row in top if column[row] > 0])
+        return results
+
+
+@contextmanager
+def locked(base_url: str) -> Iterator[None]:
+    """Serialises writers to one site's index across worker processes."""
+    directory = LINK_INDEX_DIR / site_key(base_url)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Indexes opened for search, reused until their manifest changes on disk.
+_open_indexes: Dict[str, Tuple[float, LinkIndex]] = {}
+
+
+def get_index(base_url: str) -> LinkIndex:
+    directory = LINK_INDEX_DIR / site_key(base_url)
+    manifest = directory / "pages.jsonl"
+    mtime = manifest.stat().st_mtime if manifest.exists() else 0.0
+    cached = _open_indexes.get(str(directory))
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, LinkIndex(directory))
+        _open_indexes[str(directory)] = cached
+    return cached[1]
+
+
+# --- 2. Incremental crawling ---
+
+def _get(session: requests.Session, url: str, optional: bool = False) -> Optional[bytes]:
+    try:
+        response = session.get(url, timeout=(10, 20))
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        log = logger.debug if optional else logger.warning
+        log("Sitemap request failed", extra={"url": url, "error": str(e)})
+        return None
+    body = response.content
+    return gzip.decompress(body) if url.endswith(".gz") and body[:2] == b"\x1f\x8b" else body
+
+
+def discover_sitemaps(base_url: str, session: requests.Session) -> List[str]:
+    """Sitemaps declared in robots.txt, falling back to /sitemap.xml."""
+    robots = _get(session, urljoin(base_url, "/robots.txt"), optional=True)
+    declared = _ROBOTS_SITEMAP.findall(robots.decode("utf-8", "replace")) if robots else []
+    return declared or [urljoin(base_url, "/sitemap.xml")]
+
+
+def read_sitemap(url: str, session: requests.Session, depth: int = 0) -> Dict[str, Optional[str]]:
+    """
+    Returns {page_url: lastmod} from a sitemap, following sitemap indexes.
+    Pages on other hosts are ignored.
+    """
+    body = _get(session, url)
+    if not body:
+        return {}
+    try:
+        root = etree.fromstring(body, parser=etree.XMLParser(resolve_entities=False, huge_tree=True))
+    except etree.XMLSyntaxError as e:
+        logger.warning("Invalid sitemap", extra={"url": url, "error": str(e)})
+        return {}
+
+    entries: Dict[str, Optional[str]] = {}
+    if root.tag == f"{SITEMAP_NS}sitemapindex":
+        if depth >= MAX_SITEMAP_DEPTH:
+            return entries
+        for loc in root.iterfind(f"{SITEMAP_NS}sitemap/{SITEMAP_NS}loc"):
+            entries.update(read_sitemap(loc.text.strip(), session, depth + 1))
+        return entries
+
+    host = site_key(url)
+    for node in root.iterfind(f"{SITEMAP_NS}url"):
+        loc = node.findtext(f"{SITEMAP_NS}loc")
+        if loc and site_key(loc.strip()) == host:
+            entries[loc.strip()] = node.findtext(f"{SITEMAP_NS}lastmod")
+    return entries
+
+
+def _page_text(page) -> str:
+    return "\n".join([page.title, *page.headings, page.text])[:EMBED_TEXT_CHARS]
+
+
+def crawl_site(base_url: str) -> Dict[str, int]:
+    """
+    Brings a site's link index up to date with its sitemaps.
+
+    Only pages that are new or whose sitemap <lastmod> changed are fetched,
+    with conditional GETs (ETag / Last-Modified) and at most
+    LINK_CRAWL_CONCURRENCY requests in flight. Changed pages are re-embedded
+    and appended every LINK_CRAWL_CHUNK_PAGES pages, so a crawl that fails
+    keeps what it indexed; pages gone from the sitemaps are removed.
+
+    Returns:
+        Counts of discovered, fetched, not-modified (304), unchanged, added,
+        removed and failed pages.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = SCRAPER_USER_AGENT
+    adapter = HTTPAdapter(pool_maxsize=LINK_CRAWL_CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    entries: Dict[str, Optional[str]] = {}
+    for sitemap_url in discover_sitemaps(base_url, session):
+        entries.update(read_sitemap(sitemap_url, session))
+    if not entries:
+        logger.warning("No sitemap entries found; indexing the home page only", extra={"base_url": base_url})
+        entries = {base_url: None}
+    entries = dict(list(entries.items())[:LINK_CRAWL_MAX_PAGES])
+
+    with locked(base_url):
+        index = LinkIndex.for_site(base_url)
+        stale = [
+            url for url, lastmod in entries.items()
+            if url not in index.pages or not lastmod or lastmod != index.pages[url].lastmod
+        ]
+
+        def fetch(url: str) -> Tuple[ScrapeResult, str]:
+            known = index.pages.get(url)
+            result = fetch_url(url, known and known.etag, known and known.last_modified, session=session)
+            # Only the embedded prefix of the page is kept until its chunk is appended.
+            text = _page_text(result.page)
+            result.page = ExtractedPage(title=result.page.title)
+            return result, text
+
+        added = failed = not_modified = 0
+        with ThreadPoolExecutor(max_workers=LINK_CRAWL_CONCURRENCY) as pool:
+            for start in range(0, len(stale), LINK_CRAWL_CHUNK_PAGES):
+                chunk = stale[start:start + LINK_CRAWL_CHUNK_PAGES]
+                new_records, new_texts, refreshed = [], [], []
+                for url, (result, text) in zip(chunk, pool.map(fetch, chunk)):
+                    known = index.pages.get(url)
+                    if result.rejected_reason:
+                        failed += 1
+                        continue
+                    if result.not_modified and known:
+                        not_modified += 1
+                        refreshed.append(PageRecord(**{**asdict(known), "lastmod": entries[url]}))
+                        continue
+                    content_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+                    record = PageRecord(
+                        url=url,
+                        title=result.page.title,
+                        row=known.row if known else -1,
+                        content_hash=content_hash,
+                        etag=result.etag,
+                        last_modified=result.last_modified,
+                        lastmod=entries[url],
+                    )
+                    if known and known.content_hash == content_hash:
+                        refreshed.append(record)
+                    else:
+                        new_records.append(record)
+                        new_texts.append(text)
+
+                if new_records:
+                    index.append(new_records, mean_word_vectors(new_texts))
+                    added += len(new_records)
+                index.update(refreshed)
+
+        removed = [url for url in index.pages if url not in entries]
+        index.remove(removed)
+        if index.dead_ratio > COMPACT_DEAD_RATIO:
+            index.compact()
+
+    stats = {
+        "discovered": len(entries),
+        "fetched": len(stale),
+        "not_modified": not_modified,
+        "unchanged": len(entries) - added - failed,
+        "added": added,
+        "removed": len(removed),
+        "failed": failed,
+    }
+    logger.info("Link index updated", extra={"site": site_key(base_url), **stats})
+    return stats
+
+
+# --- 3. Link suggestions ---
+
+def section_queries(sections: Sequence[Dict]) -> List[str]:
+    """The text each article section is matched on: its H2, H3s and any written content."""
+    return [
+        "\n".join([section["h2"], *(h3["h3"] for h3 in section.get("h3s", [])), section.get("content", "")])
+        for section in sections
+    ]
+
+
+def suggest_links(base_url: str, queries: Sequence[str], k: int = 5) -> List[List[models.LinkCandidate]]:
+    """
+    Finds the k most similar pages of the client's site for each query text
+    (e.g. a draft section). Returns empty lists if the site isn't indexed yet.
+    """
+    index = get_index(base_url)
+    if not index.pages:
+        return [[] for _ in queries]
+    matches = index.search(mean_word_vectors(list(queries)), k)
+    return [
+        [models.LinkCandidate(url=record.url, title=record.title, score=round(score, 4)) for record, score in hits]
+        for hits in matches
+    ]
@@ -1,22 +1,44 @@
 # In backend/app/services/nlp_service.py
 
-import spacy
+import logging
 from collections import Counter
+from functools import lru_cache
 from typing import List
 
-# Load the spaCy model once when the module is imported.
-# This is efficient as it avoids reloading the model on every function call.
-try:
-    nlp = spacy.load("en_core_web_lg")
-except OSError:
-    print(
-        "Downloading 'en_core_web_lg' model...\n"
-        "This may take a moment. Please run the following command if it fails:\n"
-        "poetry run python -m spacy download en_core_web_lg"
-    )
-    from spacy.cli import download
-    download("en_core_web_lg")
-    nlp = spacy.load("en_core_web_lg")
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """
+    Loads the spaCy model on first use, once per process. spaCy itself is
+    imported here too, so importing this module (e.g. from the API) costs nothing.
+    """
+    import spacy
+
+    try:
+        return spacy.load("en_core_web_lg")
+    except OSError:
+        logger.warning(
+            "Downloading 'en_core_web_lg' model...\n"
+            "This may take a moment. Please run the following command if it fails:\n"
+            "poetry run python -m spacy download en_core_web_lg"
+        )
+        from spacy.cli import download
+        download("en_core_web_lg")
+        return spacy.load("en_core_web_lg")
+
+# We are interested in specific entity types that add the most SEO value.
+# Excluded types like DATE, CARDINAL, etc., are often just noise.
+ALLOWED_ENTITY_LABELS = [
+    "PERSON",  # People, characters
+    "ORG",     # Companies, agencies, institutions
+    "GPE",     # Geopolitical entities (countries, cities, states)
+    "PRODUCT", # Objects, vehicles, foods, etc. (not services)
+    "WORK_OF_ART", # Titles of books, songs, etc.
+    "EVENT",   # Named hurricanes, battles, wars, sports events, etc.
+    "FAC"      # Buildings, airports, highways, bridges, etc.
+]
 
 def extract_entities_from_text(text: str, top_n: int = 20) -> List[str]:
     """
@@ -37,23 +59,11 @@ def extract_entities_from_text(text: str, top_n: int = 20) -> List[str]:
     if not text:
         return []
         
-    doc = nlp(text)
-    
-    # We are interested in specific entity types that add the most SEO value.
-    # Excluded types like DATE, CARDINAL, etc., are often just noise.
-    allowed_entity_labels = [
-        "PERSON",  # People, characters
-        "ORG",     # Companies, agencies, institutions
-        "GPE",     # Geopolitical entities (countries, cities, states)
-        "PRODUCT", # Objects, vehicles, foods, etc. (not services)
-        "WORK_OF_ART", # Titles of books, songs, etc.
-        "EVENT",   # Named hurricanes, battles, wars, sports events, etc.
-        "FAC"      # Buildings, airports, highways, bridges, etc.
-    ]
+    doc = get_nlp()(text)
     
     entities = [
         ent.text.strip() for ent in doc.ents 
-        if ent.label_ in allowed_entity_labels and len(ent.text.strip()) > 2
+        if ent.label_ in ALLOWED_ENTITY_LABELS and len(ent.text.strip()) > 2
     ]
     
     # Count the frequency of each entity
@@ -62,5 +72,5 @@ def extract_entities_from_text(text: str, top_n: int = 20) -> List[str]:
     # Get the most common entities
     most_common_entities = [entity for entity, count in entity_counts.most_common(top_n)]
     
-    print(f"Extracted Top {len(most_common_entities)} Entities: {most_common_entities}")
+    logger.info("Extracted top entities", extra={"entity_count": len(most_common_entities), "entities": most_common_entities})
     return most_common_entities
\ No newline at end of file
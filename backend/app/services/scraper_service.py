@@ -1,34 +1,225 @@
 # In backend/app/services/scraper_service.py
 
 import os
+import time
+import socket
+import logging
+import threading
 import requests
-from bs4 import BeautifulSoup
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
+from lxml import etree
+from lxml import html as lxml_html
+from typing import Callable, Optional
+from urllib3.exceptions import ReadTimeoutError
+
+from .. import telemetry
+from .extraction_service import ExtractedPage, extract_from_tree
 
 load_dotenv()
 SCRAPINGANT_API_KEY = os.getenv("SCRAPINGANT_API_KEY")
+# Overridable so the offline benchmarks can point the scraper at a local stub server.
+SCRAPINGANT_API_URL = os.getenv("SCRAPINGANT_API_URL", "https://api.scrapingant.com/v2/general")
+
+# Bounds on a single download, so no page can pin a worker's memory or time.
+SCRAPER_MAX_BYTES = int(os.getenv("SCRAPER_MAX_BYTES", str(5 * 1024 * 1024)))
+SCRAPER_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_CONNECT_TIMEOUT_SECONDS", "10"))
+# Maximum wait for any single read; catches hosts that go silent.
+SCRAPER_STALL_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_STALL_TIMEOUT_SECONDS", "20"))
+# Wall-clock bound on a whole download, enforced by a timer rather than between chunks,
+# so it also catches hosts that trickle bytes and never trip the stall timeout (slowloris).
+SCRAPER_TOTAL_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_TOTAL_TIMEOUT_SECONDS", "60"))
+SCRAPER_CHUNK_BYTES = 64 * 1024
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+SCRAPER_USER_AGENT = os.getenv("SCRAPER_USER_AGENT", "seo-ai-agent/1.0 (+internal-link indexer)")
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeRejected(Exception):
+    """Raised when a download is abandoned; `reason` is a short, metric-friendly label."""
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+
+
+@dataclass
+class ScrapeResult:
+    """The outcome of scraping one URL."""
+    url: str
+    page: ExtractedPage = field(default_factory=ExtractedPage)
+    bytes_downloaded: int = 0
+    rejected_reason: Optional[str] = None
+    # Validators for conditional re-fetches (direct fetches only).
+    status_code: int = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def _check_headers(response: requests.Response) -> None:
+    """Rejects non-HTML or oversized responses before any of the body is read."""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        raise ScrapeRejected("content_type", content_type)
 
-def scrape_url_for_headings(url: str) -> list[str]:
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > SCRAPER_MAX_BYTES:
+        raise ScrapeRejected("too_large", f"Content-Length {content_length}")
+
+
+def _response_socket(response: requests.Response) -> Optional[socket.socket]:
+    """The socket under a streamed response (urllib3 -> http.client -> SocketIO), if still open."""
+    connection = getattr(response.raw, "_connection", None)
+    if getattr(connection, "sock", None) is not None:
+        return connection.sock
+    buffered = getattr(getattr(response.raw, "_fp", None), "fp", None)
+    return getattr(getattr(buffered, "raw", None), "_sock", None)
+
+
+def _abort_connection(response: requests.Response) -> None:
     """
-    Scrapes a single URL specifically for its H2 and H3 headings using ScrapingAnt.
+    Shuts down the response's socket, which wakes a read blocked on it in
+    another thread. Closing the response instead would wait for that read.
     """
-    if not SCRAPINGANT_API_KEY:
-        print("ERROR: SCRAPINGANT_API_KEY is not configured in .env file.")
-        return []
+    sock = _response_socket(response)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
 
-    print(f"Scraping headings from {url} via ScrapingAnt...")
-    api_url = "https://api.scrapingant.com/v2/general"
-    params = {'url': url, 'x-api-key': SCRAPINGANT_API_KEY, 'browser': 'false'}
-    
+
+def _stream_and_parse(response: requests.Response, result: ScrapeResult, deadline: float) -> etree._Element:
+    """
+    Feeds the body to lxml's incremental parser chunk by chunk, so the raw
+    document is never buffered in full and the byte cap is enforced while
+    downloading. A timer aborts the connection at `deadline` (a
+    time.monotonic() value), however slowly the bytes arrive.
+    """
+    parser = lxml_html.HTMLParser()
+    expired = threading.Event()
+
+    def expire() -> None:
+        expired.set()
+        _abort_connection(response)
+
+    timer = threading.Timer(max(deadline - time.monotonic(), 0.0), expire)
+    timer.daemon = True
+    timer.start()
+
+    try:
+        for chunk in response.iter_content(chunk_size=SCRAPER_CHUNK_BYTES):
+            if expired.is_set():
+                break
+            result.bytes_downloaded += len(chunk)
+            if result.bytes_downloaded > SCRAPER_MAX_BYTES:
+                raise ScrapeRejected("too_large", f"exceeded {SCRAPER_MAX_BYTES} bytes")
+            parser.feed(chunk)
+    except requests.exceptions.RequestException as e:
+        # requests surfaces a read timeout or an aborted connection mid-body as a ConnectionError.
+        if expired.is_set():
+            raise ScrapeRejected("timeout", f"exceeded {SCRAPER_TOTAL_TIMEOUT_SECONDS}s")
+        if any(isinstance(arg, ReadTimeoutError) for arg in e.args):
+            raise ScrapeRejected("stalled", str(e))
+        raise
+    finally:
+        timer.cancel()
+
+    # The aborted socket may also look like a clean end of body.
+    if expired.is_set():
+        raise ScrapeRejected("timeout", f"exceeded {SCRAPER_TOTAL_TIMEOUT_SECONDS}s")
+    if result.bytes_downloaded == 0:
+        raise ScrapeRejected("empty")
+    try:
+        return parser.close()
+    except etree.XMLSyntaxError as e:
+        raise ScrapeRejected("parse_error", str(e))
+
+
+def _download(result: ScrapeResult, get: Callable[..., requests.Response], url: str, **kwargs) -> None:
+    """
+    Streams one response into `result`, mapping every failure to a rejection
+    reason. A 304 Not Modified is a success with an empty page.
+    """
+    deadline = time.monotonic() + SCRAPER_TOTAL_TIMEOUT_SECONDS
     try:
-        response = requests.get(api_url, params=params, timeout=60)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'lxml')
-        
-        # Extract the text from all H2 and H3 tags
-        headings = [h.get_text(strip=True) for h in soup.find_all(['h2', 'h3'])]
-        return headings
+        with get(
+            url,
+            stream=True,
+            timeout=(SCRAPER_CONNECT_TIMEOUT_SECONDS, SCRAPER_STALL_TIMEOUT_SECONDS),
+            **kwargs,
+        ) as response:
+            result.status_code = response.status_code
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            result.etag = response.headers.get("ETag")
+            result.last_modified = response.headers.get("Last-Modified")
+            _check_headers(response)
+            root = _stream_and_parse(response, result, deadline)
+        result.page = extract_from_tree(root)
 
+    except ScrapeRejected as e:
+        result.rejected_reason = e.reason
+        logger.warning("Scrape rejected", extra={"url": result.url, "reason": e.reason, "error": str(e)})
+    except requests.exceptions.Timeout as e:
+        result.rejected_reason = "stalled"
+        logger.warning("Scrape rejected", extra={"url": result.url, "reason": "stalled", "error": str(e)})
     except requests.exceptions.RequestException as e:
-        print(f"ScrapingAnt failed for URL {url}: {e}")
-        return []
\ No newline at end of file
+        result.rejected_reason = "http_error"
+        logger.warning("Page request failed", extra={"url": result.url, "error": str(e)})
+
+    if result.rejected_reason:
+        telemetry.record_scrape_rejection(result.rejected_reason)
+
+
+def scrape_url(url: str) -> ScrapeResult:
+    """
+    Scrapes a single URL once through ScrapingAnt and extracts both its
+    boilerplate-free text (for entity analysis) and its H2/H3 headings
+    (for structural analysis).
+
+    Downloads are streamed with a byte cap, a per-read stall timeout and an
+    overall deadline; non-HTML responses are rejected from their headers.
+    A rejected or failed download yields an empty page with `rejected_reason` set.
+    """
+    result = ScrapeResult(url=url)
+    if not SCRAPINGANT_API_KEY:
+        logger.error("SCRAPINGANT_API_KEY is not configured in .env file.")
+        result.rejected_reason = "missing_api_key"
+        return result
+
+    logger.info("Scraping page via ScrapingAnt", extra={"url": url})
+    params = {'url': url, 'x-api-key': SCRAPINGANT_API_KEY, 'browser': 'false'}
+    _download(result, requests.get, SCRAPINGANT_API_URL, params=params)
+    return result
+
+
+def fetch_url(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> ScrapeResult:
+    """
+    Fetches a page directly, without ScrapingAnt, for crawling the client's own
+    site. Passing the validators from a previous fetch makes it a conditional
+    GET: an unchanged page comes back as `not_modified` without a body.
+    Same streaming limits as `scrape_url`.
+    """
+    headers = {"User-Agent": SCRAPER_USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    result = ScrapeResult(url=url)
+    _download(result, (session or requests).get, url, headers=headers)
+    return result
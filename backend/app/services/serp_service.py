@@ -1,14 +1,21 @@
 # app/services/serp_service.py
 
 import os
-import requests
 import json
+import logging
+import requests
 from dotenv import load_dotenv
 from typing import Optional
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+# Overridable so the offline benchmarks can point the client at a local stub server.
+SERPER_API_URL = os.getenv("SERPER_API_URL", "https://google.serper.dev/search")
+# Connect and read timeouts; a hung request would otherwise block its worker indefinitely.
+SERPER_TIMEOUT_SECONDS = (5, float(os.getenv("SERPER_TIMEOUT_SECONDS", "20")))
 
 def get_serp_results(query: str, location: Optional[str] = None, num_results: int = 10) -> dict:
     """
@@ -25,7 +32,6 @@ def get_serp_results(query: str, location: Optional[str] = None, num_results: in
     if not SERPER_API_KEY:
         raise ValueError("SERPER_API_KEY not found in environment variables.")
 
-    url = "https://google.serper.dev/search"
     payload = {
         "q": query,
         "num": num_results
@@ -40,9 +46,11 @@ def get_serp_results(query: str, location: Optional[str] = None, num_results: in
     }
 
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = requests.post(
+            SERPER_API_URL, headers=headers, data=json.dumps(payload), timeout=SERPER_TIMEOUT_SECONDS
+        )
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching SERP results: {e}")
+        logger.error("Error fetching SERP results", extra={"query": query, "error": str(e)})
         return {"error": str(e)}
\ No newline at end of file
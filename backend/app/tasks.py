@@ -1,146 +1,256 @@
 # In fynix-gaurav/seo-ai-agent/seo-ai-agent-main/backend/app/tasks.py
 
-import os
 import json
+import logging
 from typing import List, Optional
+from celery.signals import worker_ready
 from .celery_config import celery_app
-from .services import serp_service, scraper_service, nlp_service
-from . import crud, schemas, models
+from .services import (
+    serp_service,
+    scraper_service,
+    clustering_service,
+    coalescing_service,
+    content_scoring_service,
+    entity_gazetteer_service,
+    keyword_clustering_service,
+    link_index_service,
+)
+from . import crud, schemas, models, telemetry
+from .dispatch import (
+    CLUSTER_KEYWORDS_TASK,
+    GENERATE_OUTLINE_TASK,
+    INDEX_SITE_TASK,
+    RESUME_COALESCED_PROJECT_TASK,
+    SUGGEST_LINKS_TASK,
+    dispatch_outline_task,
+)
+from .llm import structured_chain, usage_config
+from .llm_router import routed_chain
 from .database import SessionLocal
-from .agents.writer_editor_agent import app as writing_agent_app, GraphState, ArticleDraft
+from .migrate import check_schema
 
 from .config import (
     DEV_OPENAI_MODEL_GROUPER,
     DEV_ANTHROPIC_MODEL_ARCHITECT,
-    DEV_ANTHROPIC_MODEL_REFINER
+    DEV_ANTHROPIC_MODEL_REFINER,
+    ENTITY_EXTRACTION_MODE,
+    ENTITY_GAZETTEER_MAX_PROJECTS,
+    GROUPER_MODE,
+    CLUSTER_SIMILARITY_THRESHOLD,
+    CLUSTER_NAMING_SAMPLE_SIZE
 )
 from .prompts import (
     TOPIC_GROUPER_SYSTEM_PROMPT,
     TOPIC_GROUPER_USER_PROMPT,
+    TOPIC_NAMER_SYSTEM_PROMPT,
+    TOPIC_NAMER_USER_PROMPT,
     OUTLINE_ARCHITECT_SYSTEM_PROMPT,
     OUTLINE_ARCHITECT_USER_PROMPT,
     OUTLINE_REFINER_SYSTEM_PROMPT,
     OUTLINE_REFINER_USER_PROMPT
 )
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain.output_parsers import OutputFixingParser
 
+logger = logging.getLogger(__name__)
+
+
+@worker_ready.connect
+def check_database_schema(**kwargs):
+    """Reports a skipped migration once at startup rather than as failing tasks."""
+    try:
+        check_schema()
+    except Exception:
+        logger.exception("Could not inspect the database schema")
+
+def group_topics(
+    headings: List[str], manual_keywords: Optional[List[str]], extracted_entities: List[str]
+) -> models.TopicClusterList:
+    """
+    Groups competitor headings into topic clusters according to GROUPER_MODE.
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+    In "fast" and "hybrid" modes the clusters are built locally from spaCy word
+    vectors; "hybrid" then asks the grouper LLM only to name the compact
+    clusters, and "llm" sends every raw heading to the LLM as before.
+    """
+    manual_keywords_text = ", ".join(manual_keywords) if manual_keywords else "None"
+
+    if GROUPER_MODE == "llm":
+        grouper_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", TOPIC_GROUPER_SYSTEM_PROMPT),
+                ("user", TOPIC_GROUPER_USER_PROMPT),
+            ]
+        )
+        chain_grouper = routed_chain(
+            "grouper",
+            DEV_OPENAI_MODEL_GROUPER,
+            lambda llm: structured_chain(grouper_prompt, llm, models.TopicClusterList),
+        )
+
+        with telemetry.stage("grouper", model=chain_grouper.primary_model, mode=GROUPER_MODE):
+            return chain_grouper.invoke({
+                "scraped_content": "\n".join(headings),
+                "manual_keywords": manual_keywords_text,
+                "extracted_entities": ", ".join(extracted_entities)
+            }, config=usage_config("grouper"))
+
+    # Manual keywords are clustered alongside the headings so they land in a topic.
+    with telemetry.stage("cluster", heading_count=len(headings)) as span:
+        pre_clusters = clustering_service.cluster_headings(
+            headings + (manual_keywords or []), threshold=CLUSTER_SIMILARITY_THRESHOLD
+        )
+        span["cluster_count"] = len(pre_clusters.clusters)
+
+    if GROUPER_MODE == "fast":
+        return pre_clusters
+
+    namer_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", TOPIC_NAMER_SYSTEM_PROMPT),
+            ("user", TOPIC_NAMER_USER_PROMPT),
+        ]
+    )
+    chain_namer = routed_chain(
+        "grouper", DEV_OPENAI_MODEL_GROUPER, lambda llm: structured_chain(namer_prompt, llm, models.ClusterNameList)
+    )
+
+    # Only the most central headings of each cluster are needed to name it.
+    compact_clusters = [
+        {
+            "cluster_id": cluster_id,
+            "size": len(cluster.headings_and_keywords),
+            "headings": cluster.headings_and_keywords[:CLUSTER_NAMING_SAMPLE_SIZE],
+        }
+        for cluster_id, cluster in enumerate(pre_clusters.clusters)
+    ]
+    with telemetry.stage("grouper", model=chain_namer.primary_model, mode=GROUPER_MODE):
+        names = chain_namer.invoke({
+            "pre_clusters_json": json.dumps(compact_clusters),
+            "manual_keywords": manual_keywords_text,
+            "extracted_entities": ", ".join(extracted_entities)
+        }, config=usage_config("grouper"))
+    return clustering_service.apply_cluster_names(pre_clusters, names)
 
-@celery_app.task(bind=True)
-def generate_outline_task(self, project_id: int, keyword: str, location: Optional[str] = None, manual_keywords: Optional[List[str]] = None):
+@celery_app.task(bind=True, name=GENERATE_OUTLINE_TASK)
+def generate_outline_task(
+    self,
+    project_id: int,
+    keyword: str,
+    location: Optional[str] = None,
+    manual_keywords: Optional[List[str]] = None,
+    coalesce_key: Optional[str] = None,
+):
     db = SessionLocal()
     try:
         crud.update_project_status(db, project_id=project_id, status=schemas.ProjectStatus.IN_PROGRESS)
 
-        print("Fetching SERP data...")
-        serp_data = serp_service.get_serp_results(keyword, location=location)
-        if "error" in serp_data or "organic" not in serp_data:
-            raise ValueError("Failed to fetch SERP data.")
+        with telemetry.stage("serp", keyword=keyword) as span:
+            serp_data = serp_service.get_serp_results(keyword, location=location)
+            if "error" in serp_data or "organic" not in serp_data:
+                raise ValueError("Failed to fetch SERP data.")
 
-        urls = [result['link'] for result in serp_data.get('organic', [])[:10]]
+            urls = [result['link'] for result in serp_data.get('organic', [])[:10]]
+            span["result_count"] = len(urls)
         
-        # --- PHASE 2: DUAL SCRAPING FOR FULL TEXT AND HEADINGS ---
+        # --- PHASE 2: SINGLE SCRAPE FOR FULL TEXT AND HEADINGS ---
         all_scraped_text = []
         all_scraped_headings = []
         for url in urls:
-            # Scrape full text for entity analysis
-            full_text = scraper_service.scrape_and_clean_url(url)
-            if full_text:
-                all_scraped_text.append(full_text)
-            
-            # Scrape headings for structural analysis
-            headings = scraper_service.scrape_url_for_headings(url)
-            if headings:
-                all_scraped_headings.extend(headings)
+            with telemetry.stage("scrape", url=url) as span:
+                result = scraper_service.scrape_url(url)
+                page = result.page
+                # Main-content text for entity analysis
+                if page.text:
+                    all_scraped_text.append(page.text)
+                # Headings for structural analysis
+                all_scraped_headings.extend(page.headings)
+
+                span["payload_bytes"] = result.bytes_downloaded
+                span["text_chars"] = len(page.text)
+                span["heading_count"] = len(page.headings)
+                if result.rejected_reason:
+                    span["rejected_reason"] = result.rejected_reason
 
         # --- PHASE 2: NLP ENTITY EXTRACTION ---
+        # Entities already extracted for this genre are matched with a gazetteer;
+        # the statistical NER only runs on a sample of pages to find new ones.
         aggregated_text = "\n".join(all_scraped_text)
-        extracted_entities = nlp_service.extract_entities_from_text(aggregated_text)
+        with telemetry.stage("ner", payload_bytes=len(aggregated_text), mode=ENTITY_EXTRACTION_MODE) as span:
+            gazetteer = None
+            if ENTITY_EXTRACTION_MODE != "ner":
+                project = crud.get_project(db, project_id=project_id)
+                genre = project.genre if project else None
+                known_entities = crud.get_recent_entities(db, genre=genre, limit=ENTITY_GAZETTEER_MAX_PROJECTS)
+                gazetteer = entity_gazetteer_service.get_gazetteer(genre, known_entities)
+                span["known_entities"] = len(gazetteer)
+            extracted_entities = entity_gazetteer_service.extract_entities(all_scraped_text, gazetteer)
+            span["entity_count"] = len(extracted_entities)
     
         crud.update_project_entities(db, project_id=project_id, entities=extracted_entities)
 
-        scraped_content_for_prompt = "\n".join(all_scraped_headings)
-        print(f"Scraped {len(all_scraped_headings)} headings from top {len(urls)} URLs.")
+        # --- PHASE 2: COMPETITOR TERM VECTOR (for scoring drafts) ---
+        with telemetry.stage("term_weights", page_count=len(all_scraped_text)) as span:
+            term_weights = content_scoring_service.build_term_weights(all_scraped_text, extracted_entities)
+            span["term_count"] = len(term_weights.terms)
 
-        # --- AI Step 1: Topic Grouper (Enriched with Entities) ---
-        print(f"Grouping topics with {DEV_OPENAI_MODEL_GROUPER}...")
-        grouper_parser = PydanticOutputParser(pydantic_object=models.TopicClusterList)
-        grouper_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", TOPIC_GROUPER_SYSTEM_PROMPT),
-                ("user", TOPIC_GROUPER_USER_PROMPT),
-            ]
+        crud.update_project_term_weights(db, project_id=project_id, term_weights=term_weights.model_dump())
+
+        logger.info(
+            "Scraped competitor headings",
+            extra={"heading_count": len(all_scraped_headings), "url_count": len(urls)},
         )
-        llm_grouper = ChatOpenAI(model=DEV_OPENAI_MODEL_GROUPER, temperature=0, api_key=OPENAI_API_KEY)
-        chain_grouper = grouper_prompt | llm_grouper | grouper_parser
-        
-        topic_clusters = chain_grouper.invoke({
-            "format_instructions": grouper_parser.get_format_instructions(),
-            "scraped_content": scraped_content_for_prompt,
-            "manual_keywords": ", ".join(manual_keywords) if manual_keywords else "None",
-            "extracted_entities": ", ".join(extracted_entities)
-        })
+
+        # --- AI Step 1: Topic Grouper (Enriched with Entities) ---
+        topic_clusters = group_topics(all_scraped_headings, manual_keywords, extracted_entities)
 
         # --- AI Step 2: Outline Architect ---
-        print(f"Architecting outline with {DEV_ANTHROPIC_MODEL_ARCHITECT}...")
-        architect_parser = PydanticOutputParser(pydantic_object=models.SeoOutline)
-        
-        output_fixing_parser = OutputFixingParser.from_llm(
-            parser=architect_parser, llm=ChatOpenAI(model=DEV_OPENAI_MODEL_GROUPER)
-        )
-        
+        # Native tool calling returns a validated SeoOutline; common defects are
+        # repaired by the model's validators rather than a second LLM call.
         architect_prompt = ChatPromptTemplate.from_messages(
             [
                 ("system", OUTLINE_ARCHITECT_SYSTEM_PROMPT),
                 ("user", OUTLINE_ARCHITECT_USER_PROMPT),
             ]
         )
-        
-        if ANTHROPIC_API_KEY:
-            llm_architect = ChatAnthropic(model=DEV_ANTHROPIC_MODEL_ARCHITECT, temperature=0, api_key=ANTHROPIC_API_KEY)
-        else:
-            llm_architect = ChatOpenAI(model=DEV_OPENAI_MODEL_GROUPER, temperature=0, api_key=OPENAI_API_KEY)
 
-        chain_architect = architect_prompt | llm_architect | output_fixing_parser
-        
-        draft_outline = chain_architect.invoke({
-            "format_instructions": architect_parser.get_format_instructions(),
-            "keyword": keyword,
-            "topic_clusters_json": topic_clusters.model_dump_json()
-        })
+        # The router falls back to the equivalent OpenAI model when no Anthropic key is set,
+        # and hedges/fails over between providers when one is slow or erroring.
+        chain_architect = routed_chain(
+            "architect",
+            DEV_ANTHROPIC_MODEL_ARCHITECT,
+            lambda llm: structured_chain(architect_prompt, llm, models.SeoOutline),
+        )
+
+        with telemetry.stage("architect", model=chain_architect.primary_model):
+            draft_outline = chain_architect.invoke({
+                "keyword": keyword,
+                "topic_clusters_json": topic_clusters.model_dump_json()
+            }, config=usage_config("architect"))
 
         # --- AI Step 3: Outline Refiner ---
-        print(f"Refining outline with {DEV_ANTHROPIC_MODEL_REFINER}...")
-        refiner_parser = architect_parser 
-        
         refiner_prompt = ChatPromptTemplate.from_messages(
             [
                 ("system", OUTLINE_REFINER_SYSTEM_PROMPT),
                 ("user", OUTLINE_REFINER_USER_PROMPT),
             ]
         )
-        
-        llm_refiner = ChatAnthropic(
-            model=DEV_ANTHROPIC_MODEL_REFINER, temperature=0, api_key=ANTHROPIC_API_KEY
-        )
-        
-        chain_refiner = refiner_prompt | llm_refiner | refiner_parser
 
-        final_outline = chain_refiner.invoke(
-            {
-                "format_instructions": refiner_parser.get_format_instructions(),
-                "keyword": keyword,
-                "draft_outline_json": draft_outline.model_dump_json(),
-            }
+        chain_refiner = routed_chain(
+            "refiner",
+            DEV_ANTHROPIC_MODEL_REFINER,
+            lambda llm: structured_chain(refiner_prompt, llm, models.SeoOutline),
         )
 
+        with telemetry.stage("refiner", model=chain_refiner.primary_model):
+            final_outline = chain_refiner.invoke(
+                {
+                    "keyword": keyword,
+                    "draft_outline_json": draft_outline.model_dump_json(),
+                },
+                config=usage_config("refiner"),
+            )
+
         # --- Save the final result ---
         article_title = final_outline.h1
         article_content = final_outline.model_dump_json(indent=2)
@@ -148,12 +258,168 @@ def generate_outline_task(self, project_id: int, keyword: str, location: Optiona
         crud.create_article_for_project(db, title=article_title, content=article_content, project_id=project_id)
         crud.update_project_status(db, project_id=project_id, status=schemas.ProjectStatus.COMPLETED)
         
-        print("Task succeeded. Outline saved to database.")
-        return {"status": "SUCCESS", "outline_h1": article_title}
+        logger.info("Task succeeded. Outline saved to database.", extra={"project_id": project_id})
 
     except Exception as e:
-        print(f"Task failed: {e}")
+        logger.exception("Task failed", extra={"project_id": project_id})
         crud.update_project_status(db, project_id=project_id, status=schemas.ProjectStatus.FAILED)
+        if coalesce_key:
+            _redispatch_waiters(db, coalesce_key, project_id, self.request.id)
         raise e
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+    # Outside the pipeline's error handling: a failed copy must not mark the finished leader FAILED.
+    coalesced = (
+        _deliver_to_waiters(coalesce_key, project_id, self.request.id, article_title) if coalesce_key else []
+    )
+    return {"status": "SUCCESS", "outline_h1": article_title, "coalesced_project_ids": coalesced}
+
+
+# --- Single-flight coalescing of identical projects ---
+
+def _deliver_to_waiters(coalesce_key: str, project_id: int, task_id: str, outline_h1: str) -> List[int]:
+    """
+    Releases the lease, copies the finished outline to every project that
+    attached to it and marks each waiter's own task done. A waiter whose copy
+    fails is dispatched to run on its own, rather than waiting for its resume task.
+    """
+    waiters = coalescing_service.finish(coalesce_key, project_id, task_id)
+    delivered = []
+    db = SessionLocal()
+    try:
+        for waiter in waiters:
+            try:
+                crud.copy_project_results(db, source_project_id=project_id, target_project_id=waiter.project_id)
+                delivered.append(waiter.project_id)
+            except Exception:
+                logger.exception(
+                    "Failed to copy outline to coalesced project; re-dispatching it",
+                    extra={"project_id": project_id, "waiter_id": waiter.project_id},
+                )
+                db.rollback()
+                _redispatch(db, waiter)
+                continue
+            _complete_waiter_task(waiter, project_id, outline_h1)
+    finally:
+        db.close()
+
+    if delivered:
+        telemetry.record_project_coalescing("delivered", len(delivered))
+        logger.info("Outline copied to coalesced projects", extra={"project_id": project_id, "waiter_ids": delivered})
+    return delivered
+
+
+def _complete_waiter_task(waiter: coalescing_service.Waiter, project_id: int, outline_h1: str) -> None:
+    """Stores a delivered waiter's task result, so its client's polling ends."""
+    if not waiter.task_id:
+        return
+    try:
+        celery_app.backend.mark_as_done(
+            waiter.task_id,
+            {"status": "SUCCESS", "outline_h1": outline_h1, "coalesced_from_project_id": project_id},
+        )
+    except Exception:
+        logger.exception("Failed to complete coalesced project's task", extra={"waiter_id": waiter.project_id})
+
+
+def _redispatch(db, waiter: coalescing_service.Waiter) -> None:
+    """Dispatches a waiting project again under its own task id, if it is still waiting."""
+    try:
+        project = crud.get_project(db, project_id=waiter.project_id)
+        if project is not None and project.status == schemas.ProjectStatus.IN_PROGRESS:
+            dispatch_outline_task(db, project, task_id=waiter.task_id)
+            telemetry.record_project_coalescing("redispatched")
+    except Exception:
+        logger.exception("Failed to re-dispatch coalesced project", extra={"waiter_id": waiter.project_id})
+
+
+def _redispatch_waiters(db, coalesce_key: str, project_id: int, task_id: str) -> None:
+    """
+    The leader failed: each waiter is dispatched again, so the first becomes
+    the new leader and the rest attach to it.
+    """
+    try:
+        waiters = coalescing_service.finish(coalesce_key, project_id, task_id)
+    except Exception:
+        logger.exception("Failed to release coalesced projects", extra={"project_id": project_id})
+        return
+    for waiter in waiters:
+        _redispatch(db, waiter)
+
+
+@celery_app.task(name=RESUME_COALESCED_PROJECT_TASK)
+def resume_coalesced_project_task(project_id: int, task_id: Optional[str] = None):
+    """
+    Runs once the lease of the pipeline a project attached to has lapsed. A
+    project still waiting by then (its leader's worker died) is dispatched
+    again under its own task id.
+    """
+    db = SessionLocal()
+    try:
+        project = crud.get_project(db, project_id=project_id)
+        if project is None or project.status != schemas.ProjectStatus.IN_PROGRESS:
+            return {"status": "DONE"}
+        logger.warning("Coalesced project was never delivered; re-dispatching", extra={"project_id": project_id})
+        task_id, _ = dispatch_outline_task(db, project, task_id=task_id)
+        telemetry.record_project_coalescing("redispatched")
+        return {"status": "REDISPATCHED", "task_id": task_id}
+    finally:
+        db.close()
+
+
+@celery_app.task(name=CLUSTER_KEYWORDS_TASK)
+def cluster_keywords_task(keywords: List[str], location: Optional[str] = None, similarity_threshold: float = 0.25):
+    """
+    Groups a keyword list into article-level clusters by SERP overlap.
+    Each cluster can be fed to one outline task: the primary keyword as
+    `keyword` and the remaining keywords as `manual_keywords`.
+    """
+    with telemetry.stage("serp_batch", keyword_count=len(keywords)):
+        keyword_urls = keyword_clustering_service.fetch_serp_urls(keywords, location=location)
+
+    with telemetry.stage("keyword_clustering", keyword_count=len(keywords)) as span:
+        clusters = keyword_clustering_service.cluster_keywords_by_serp(keyword_urls, threshold=similarity_threshold)
+        span["cluster_count"] = len(clusters)
+
+    return models.KeywordClusterList(clusters=clusters).model_dump()
+
+
+@celery_app.task(name=INDEX_SITE_TASK)
+def index_site_task(base_url: str):
+    """
+    Crawls the client's site incrementally and updates its internal-linking index.
+    Safe to re-run: unchanged pages are skipped with conditional requests.
+    """
+    with telemetry.stage("link_index", site=link_index_service.site_key(base_url)) as span:
+        stats = link_index_service.crawl_site(base_url)
+        span.update(stats)
+    return stats
+
+
+@celery_app.task(name=SUGGEST_LINKS_TASK)
+def suggest_links_task(project_id: int, k: int = 5):
+    """
+    Finds the top-k pages of the client's own site to link from each section of
+    the project's article. Runs on the worker that holds the site's index, and
+    keeps the spaCy vectors used to embed the sections out of the API.
+    """
+    db = SessionLocal()
+    try:
+        project = crud.get_project(db, project_id=project_id)
+        article = crud.get_article_by_project_id(db, project_id=project_id)
+        if project is None or article is None:
+            return models.LinkSuggestionList(sections=[]).model_dump()
+        sections = json.loads(article.content).get("sections", [])
+    finally:
+        db.close()
+
+    with telemetry.stage("link_suggestions", site=link_index_service.site_key(project.base_url)) as span:
+        matches = link_index_service.suggest_links(project.base_url, link_index_service.section_queries(sections), k=k)
+        span["section_count"] = len(sections)
+    return models.LinkSuggestionList(
+        sections=[
+            models.SectionLinkSuggestions(h2=section["h2"], candidates=candidates)
+            for section, candidates in zip(sections, matches)
+        ]
+    ).model_dump()
@@ -0,0 +1,348 @@
+# app/telemetry.py
+# Structured logging, OpenTelemetry spans and Prometheus metrics for every pipeline stage.
+# Both observability libraries are declared dependencies; the guarded imports only keep
+# stripped-down environments working, where the stages still log their timings.
+
+import json
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import MODEL_PRICING_PER_MILLION_TOKENS, PROMPT_CACHE_MODELS
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Histogram
+except ImportError:  # pragma: no cover - depends on the deployment image
+    prometheus_client = None
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - depends on the deployment image
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RESERVED_LOG_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+# --- 1. Structured Logging ---
+
+class JsonFormatter(logging.Formatter):
+    """Renders log records as single-line JSON, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_LOG_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+# The provider SDKs retry failed requests themselves (`max_retries`), invisibly to
+# LangChain; each retry is announced with this log message.
+_SDK_RETRY_MESSAGE = "Retrying request to %s in %f seconds"
+_SDK_LOGGERS = {"openai": "openai._base_client", "anthropic": "anthropic._base_client"}
+
+
+class _SdkRetryCounter(logging.Filter):
+    """Counts the retries a provider SDK logs, then lets the record through as the root level allows."""
+
+    def __init__(self, provider: str):
+        super().__init__()
+        self.provider = provider
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.msg == _SDK_RETRY_MESSAGE:
+            record_llm_retry(self.provider)
+        return record.levelno >= logging.getLogger().getEffectiveLevel()
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Installs the JSON formatter on the root logger, and counts the provider
+    SDKs' retries. Safe to call more than once.
+    """
+    root = logging.getLogger()
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    root.handlers = [handler]
+    root.setLevel(level or LOG_LEVEL)
+
+    for provider, logger_name in _SDK_LOGGERS.items():
+        sdk_logger = logging.getLogger(logger_name)
+        # The retry message is logged at INFO; the filter still applies the root level.
+        sdk_logger.setLevel(logging.INFO)
+        sdk_logger.filters = [f for f in sdk_logger.filters if not isinstance(f, _SdkRetryCounter)]
+        sdk_logger.addFilter(_SdkRetryCounter(provider))
+
+
+# --- 2. Metrics ---
+
+if prometheus_client:
+    STAGE_DURATION = Histogram(
+        "pipeline_stage_duration_seconds",
+        "Wall-clock duration of a pipeline stage.",
+        ["stage", "outcome"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160),
+    )
+    STAGE_PAYLOAD_BYTES = Histogram(
+        "pipeline_stage_payload_bytes",
+        "Size of the payload a stage consumed or produced.",
+        ["stage"],
+        buckets=(1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7),
+    )
+    LLM_TOKENS = Counter(
+        "llm_tokens_total",
+        "Tokens sent to and received from LLM providers.",
+        ["stage", "model", "kind"],
+    )
+    LLM_COST = Counter(
+        "llm_cost_usd_total",
+        "Estimated LLM spend in US dollars.",
+        ["stage", "model"],
+    )
+    LLM_RETRIES = Counter(
+        "llm_retries_total",
+        "LLM requests retried by the provider SDK (rate limits, 5xx, timeouts).",
+        ["provider"],
+    )
+    SCRAPE_REJECTIONS = Counter(
+        "scrape_rejections_total",
+        "Competitor pages abandoned by the scraper, by reason.",
+        ["reason"],
+    )
+    LLM_ROUTE_EVENTS = Counter(
+        "llm_route_events_total",
+        "LLM router events: primary, hedged, failover, won, error, deadline, skipped_open_breaker.",
+        ["stage", "model", "event"],
+    )
+    LLM_BREAKER_OPENS = Counter(
+        "llm_circuit_breaker_opens_total",
+        "Times a model's circuit breaker tripped open.",
+        ["model"],
+    )
+    PROJECT_COALESCING = Counter(
+        "project_coalescing_total",
+        "Single-flight project events: leader, attached, delivered, redispatched.",
+        ["event"],
+    )
+    CACHE_REQUESTS = Counter(
+        "cache_requests_total",
+        "Cache lookups by cache name and result (hit/miss).",
+        ["cache", "result"],
+    )
+
+
+def prompt_cache_terms(model: str) -> Optional[Tuple[int, float, float]]:
+    """
+    The model's prompt-cache terms: (minimum cacheable prefix in tokens, cache
+    read factor, cache write factor), or None if the model doesn't cache prompts.
+    """
+    return next((terms for prefix, terms in PROMPT_CACHE_MODELS.items() if model.startswith(prefix)), None)
+
+
+def estimate_cost(
+    model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0, cache_write_tokens: int = 0
+) -> float:
+    """
+    Estimates the dollar cost of a call from the pricing table in config.
+    Provider model names often carry a date suffix, so we match on prefix.
+    `input_tokens` includes cached tokens, which are billed at the provider's
+    cache read/write rates instead of the base input price.
+    """
+    _, read_factor, write_factor = prompt_cache_terms(model) or (0, 1.0, 1.0)
+    for known_model, (input_price, output_price) in MODEL_PRICING_PER_MILLION_TOKENS.items():
+        if model.startswith(known_model):
+            uncached_tokens = max(input_tokens - cache_read_tokens - cache_write_tokens, 0)
+            input_cost = input_price * (
+                uncached_tokens + cache_read_tokens * read_factor + cache_write_tokens * write_factor
+            )
+            return (input_cost + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+
+# In-process observers of LLM usage, e.g. the offline benchmark harness.
+_usage_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+
+def add_usage_listener(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+    """Registers a callback invoked as `listener(stage_name, usage)` after every LLM call."""
+    _usage_listeners.append(listener)
+
+
+def record_llm_usage(
+    stage: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """
+    Records token counts and the estimated cost of one LLM call. Returns the cost.
+    The prompt-cache hit rate is cache_read / input tokens (`llm_tokens_total` by kind).
+    """
+    cost = estimate_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+    if prometheus_client:
+        LLM_TOKENS.labels(stage, model, "input").inc(input_tokens)
+        LLM_TOKENS.labels(stage, model, "output").inc(output_tokens)
+        LLM_TOKENS.labels(stage, model, "cache_read").inc(cache_read_tokens)
+        LLM_TOKENS.labels(stage, model, "cache_write").inc(cache_write_tokens)
+        LLM_COST.labels(stage, model).inc(cost)
+    usage = {
+        "model": model,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "cache_write_tokens": cache_write_tokens,
+        "cache_hit_rate": round(cache_read_tokens / input_tokens, 3) if input_tokens else 0.0,
+        "cost_usd": round(cost, 6),
+    }
+    logger.info("llm usage", extra={"stage": stage, **usage})
+    for listener in _usage_listeners:
+        listener(stage, usage)
+    return cost
+
+
+def record_llm_retry(provider: str) -> None:
+    """Counts one retry of an LLM request by the provider SDK."""
+    if prometheus_client:
+        LLM_RETRIES.labels(provider).inc()
+
+
+def record_scrape_rejection(reason: str) -> None:
+    """Counts a page the scraper gave up on (non-HTML, too large, stalled, ...)."""
+    if prometheus_client:
+        SCRAPE_REJECTIONS.labels(reason).inc()
+
+
+def record_llm_route_event(stage: str, model: str, event: str) -> None:
+    """Counts a routing decision for an LLM call (hedge, failover, winner, ...)."""
+    if prometheus_client:
+        LLM_ROUTE_EVENTS.labels(stage, model, event).inc()
+
+
+def record_circuit_breaker_open(model: str) -> None:
+    """Counts a circuit breaker tripping for a model."""
+    if prometheus_client:
+        LLM_BREAKER_OPENS.labels(model).inc()
+
+
+def record_project_coalescing(event: str, count: int = 1) -> None:
+    """Counts projects leading, attaching to or being served by an identical in-flight pipeline."""
+    if prometheus_client:
+        PROJECT_COALESCING.labels(event).inc(count)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Counts a cache hit or miss."""
+    if prometheus_client:
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+# --- 3. Stage Tracing ---
+
+# In-process observers of finished stages, e.g. the offline benchmark harness.
+_stage_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+
+def add_stage_listener(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+    """Registers a callback invoked as `listener(stage_name, attributes)` after every stage."""
+    _stage_listeners.append(listener)
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Times a pipeline stage, wrapping it in an OpenTelemetry span when available.
+
+    The yielded dict can be filled with extra attributes while the stage runs
+    (e.g. `payload_bytes`); they end up on the span and in the log line.
+
+    Example:
+        with telemetry.stage("scrape", url=url) as span:
+            html = fetch(url)
+            span["payload_bytes"] = len(html)
+    """
+    attrs: Dict[str, Any] = dict(attributes)
+    outcome = "ok"
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        span = None
+        if trace:
+            span = stack.enter_context(trace.get_tracer("seo-ai-agent").start_as_current_span(name))
+
+        try:
+            yield attrs
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            attrs["duration_ms"] = round(duration * 1000, 2)
+            attrs["outcome"] = outcome
+
+            if prometheus_client:
+                STAGE_DURATION.labels(name, outcome).observe(duration)
+                if "payload_bytes" in attrs:
+                    STAGE_PAYLOAD_BYTES.labels(name).observe(attrs["payload_bytes"])
+
+            if span is not None:
+                for key, value in attrs.items():
+                    if isinstance(value, (str, bool, int, float)):
+                        span.set_attribute(key, value)
+
+            logger.info("stage finished", extra={"stage": name, **attrs})
+            for listener in _stage_listeners:
+                listener(name, attrs)
+
+
+# --- 4. Exposition ---
+
+def _metrics_registry():
+    """
+    Picks the registry to expose: this process's own, or an aggregate of every
+    process sharing PROMETHEUS_MULTIPROC_DIR (API workers and Celery children alike).
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def metrics_payload() -> Optional[Tuple[bytes, str]]:
+    """
+    Renders the Prometheus exposition format.
+
+    Returns:
+        A (body, content_type) tuple, or None when prometheus_client isn't installed.
+    """
+    if not prometheus_client:
+        return None
+    return prometheus_client.generate_latest(_metrics_registry()), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Serves /metrics on a side port; used by Celery workers, which have no HTTP app."""
+    if not prometheus_client:
+        logger.warning("prometheus_client is not installed; worker metrics are disabled.")
+        return
+
+    prometheus_client.start_http_server(port, registry=_metrics_registry())
+    logger.info("worker metrics server started", extra={"port": port})
@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_entities.py
+"""
+Micro-benchmark of entity extraction on the fixture pages: statistical NER over
+every page versus the gazetteer fast path ("gazetteer" and "hybrid" modes).
+
+The gazetteer is seeded with the entities NER finds on the same pages (as a
+previous project in the genre would have), plus `--extra-entities` synthetic
+names to simulate a large niche vocabulary. Pages can be inflated as in
+bench_extraction.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.bench_entities --inflate-to-kb 300 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from app.services import entity_gazetteer_service, nlp_service
+from app.services.extraction_service import extract_page
+
+from .bench_extraction import inflate
+from .stub_servers import FIXTURES_DIR
+
+
+def best_ms(fn: Callable[[], List[str]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inflate-to-kb", type=int, default=0, help="Inflate each page to about this size.")
+    parser.add_argument("--extra-entities", type=int, default=2000, help="Synthetic names added to the gazetteer.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best time is reported.")
+    args = parser.parse_args(argv)
+
+    texts = [
+        extract_page(inflate(path.read_bytes(), args.inflate_to_kb)).text
+        for path in sorted(Path(FIXTURES_DIR / "html").glob("*.html"))
+    ]
+    ner_entities = nlp_service.extract_entities_from_text("\n".join(texts), top_n=200)
+    known = ner_entities + [f"Vendor {i} Inc." for i in range(args.extra_entities)]
+
+    started = time.perf_counter()
+    gazetteer = entity_gazetteer_service.Gazetteer(known)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    ner_ms = best_ms(lambda: nlp_service.extract_entities_from_text("\n".join(texts)), args.repeat)
+    print(f"pages={len(texts)}  words={sum(len(text.split()) for text in texts)}  "
+          f"gazetteer={len(gazetteer)} entities (built in {build_ms:.1f} ms)")
+    print(f"{'mode':<12}{'ms':>10}{'speedup':>10}{'top-20 overlap':>16}")
+    print(f"{'ner':<12}{ner_ms:>10.1f}{'1.0x':>10}{'':>16}")
+    reference = set(nlp_service.extract_entities_from_text("\n".join(texts)))
+    for mode in ("gazetteer", "hybrid"):
+        def run() -> List[str]:
+            return entity_gazetteer_service.extract_entities(texts, gazetteer, mode=mode)
+
+        elapsed = best_ms(run, args.repeat)
+        overlap = len(reference & set(run())) / len(reference) if reference else 1.0
+        print(f"{mode:<12}{elapsed:>10.1f}{ner_ms / elapsed:>9.1f}x{overlap:>16.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
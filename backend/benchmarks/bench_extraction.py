@@ -0,0 +1,113 @@
+# backend/benchmarks/bench_extraction.py
+"""
+Micro-benchmark of HTML extraction on the fixture pages: the lxml engine in
+`extraction_service` versus the previous BeautifulSoup approach (full-page
+get_text plus find_all for headings).
+
+Pages can be inflated to a realistic size by repeating their body, since
+production competitor pages are often 1-3MB.
+
+Layouts that once lost their content are checked first; the run exits with
+code 1 when one of them drops text it must keep.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.bench_extraction --inflate-to-kb 1500 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from app.services.extraction_service import extract_page
+
+from .stub_servers import FIXTURES_DIR
+
+# Layouts the extractor once got wrong: fixture -> (text that must be extracted, minimum headings).
+REGRESSION_CASES: Dict[str, Tuple[str, int]] = {
+    # ASP.NET WebForms wraps the whole body in <form id="aspnetForm">.
+    "webforms-page.html": ("a regional outage no longer blocks deployments", 4),
+    # The body is split across <section><div class="para"><p> blocks of one <article>.
+    "sectioned-article.html": ("switching a fleet of build agents to rootless mode", 5),
+}
+
+
+def inflate(html: bytes, target_kb: int) -> bytes:
+    """Repeats the contents of <body> until the page reaches roughly target_kb."""
+    if target_kb <= 0 or len(html) >= target_kb * 1024:
+        return html
+    head, _, rest = html.partition(b"<body")
+    body_open, _, rest = rest.partition(b">")
+    body, _, tail = rest.rpartition(b"</body>")
+    copies = max(1, (target_kb * 1024) // max(len(body), 1))
+    return head + b"<body" + body_open + b">" + body * copies + b"</body>" + tail
+
+
+def bs4_extract(html: bytes) -> Tuple[List[str], str]:
+    """The extraction the scraper used before the lxml engine."""
+    soup = BeautifulSoup(html, "lxml")
+    headings = [h.get_text(strip=True) for h in soup.find_all(["h2", "h3"])]
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return headings, soup.get_text(separator=" ", strip=True)
+
+
+def lxml_extract(html: bytes) -> Tuple[List[str], str]:
+    page = extract_page(html)
+    return page.headings, page.text
+
+
+def check_regressions() -> bool:
+    """Extracts every regression fixture and prints what it lost. Returns whether all passed."""
+    passed = True
+    for name, (required_text, min_headings) in REGRESSION_CASES.items():
+        page = extract_page((FIXTURES_DIR / "extraction" / name).read_bytes())
+        problems = []
+        if required_text not in page.text:
+            problems.append(f"text lacks {required_text!r} ({len(page.text)} chars extracted)")
+        if len(page.headings) < min_headings:
+            problems.append(f"{len(page.headings)} headings, expected at least {min_headings}")
+        if problems:
+            passed = False
+            print(f"FAIL: {name}: " + "; ".join(problems))
+    return passed
+
+
+def time_it(fn: Callable[[bytes], Tuple[List[str], str]], html: bytes, repeat: int) -> Tuple[float, Tuple]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(html)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inflate-to-kb", type=int, default=0, help="Inflate each page to about this size.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per page; the best time is reported.")
+    args = parser.parse_args(argv)
+
+    passed = check_regressions()
+
+    print(f"{'page':<22}{'size KB':>9}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>9}"
+          f"{'bs4 chars':>11}{'lxml chars':>12}{'bs4 hds':>9}{'lxml hds':>10}")
+    totals = [0.0, 0.0]
+    for path in sorted(Path(FIXTURES_DIR / "html").glob("*.html")):
+        html = inflate(path.read_bytes(), args.inflate_to_kb)
+        bs4_ms, (bs4_headings, bs4_text) = time_it(bs4_extract, html, args.repeat)
+        lxml_ms, (lxml_headings, lxml_text) = time_it(lxml_extract, html, args.repeat)
+        totals[0] += bs4_ms
+        totals[1] += lxml_ms
+        print(f"{path.stem:<22}{len(html) / 1024:>9.0f}{bs4_ms:>10.2f}{lxml_ms:>10.2f}{bs4_ms / lxml_ms:>8.1f}x"
+              f"{len(bs4_text):>11}{len(lxml_text):>12}{len(bs4_headings):>9}{len(lxml_headings):>10}")
+    print(f"{'total':<22}{'':>9}{totals[0]:>10.2f}{totals[1]:>10.2f}{totals[0] / totals[1]:>8.1f}x")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
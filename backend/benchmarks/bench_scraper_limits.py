@@ -0,0 +1,60 @@
+# backend/benchmarks/bench_scraper_limits.py
+"""
+Checks the scraper's download limits against misbehaving stub hosts: one that
+trickles a byte every `--interval-ms` (slowloris), which never trips the
+per-read stall timeout and must be cut off by the total deadline, and one
+that goes silent after its headers, which the stall timeout must catch.
+
+Exits with status 1 if a download is not rejected with the expected reason
+within its limit (plus a small margin).
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.bench_scraper_limits --total-timeout 2 --stall-timeout 1
+"""
+
+import argparse
+import sys
+import time
+from typing import List
+
+from app.services import scraper_service
+
+from .stub_servers import FixtureServer, STALL_PATH, TRICKLE_PATH
+
+# Allowance for the timer thread and connection teardown.
+MARGIN_SECONDS = 1.0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--total-timeout", type=float, default=2.0, help="SCRAPER_TOTAL_TIMEOUT_SECONDS to test.")
+    parser.add_argument("--stall-timeout", type=float, default=1.0, help="SCRAPER_STALL_TIMEOUT_SECONDS to test.")
+    parser.add_argument("--interval-ms", type=float, default=500.0, help="Delay between trickled bytes.")
+    args = parser.parse_args(argv)
+
+    scraper_service.SCRAPER_TOTAL_TIMEOUT_SECONDS = args.total_timeout
+    scraper_service.SCRAPER_STALL_TIMEOUT_SECONDS = args.stall_timeout
+    cases = [
+        # (name, path, interval_ms, expected reason, limit in seconds)
+        ("trickle", TRICKLE_PATH, args.interval_ms, "timeout", args.total_timeout),
+        ("stall", STALL_PATH, (args.stall_timeout + args.total_timeout) * 1000, "stalled", args.stall_timeout),
+    ]
+
+    server = FixtureServer().start()
+    failed = False
+    try:
+        print(f"{'case':<10}{'reason':>10}{'seconds':>10}{'limit':>8}  result")
+        for name, path, interval_ms, expected, limit in cases:
+            started = time.perf_counter()
+            result = scraper_service.fetch_url(f"{server.base_url}{path}?interval_ms={interval_ms:g}")
+            elapsed = time.perf_counter() - started
+            ok = result.rejected_reason == expected and elapsed <= limit + MARGIN_SECONDS
+            failed = failed or not ok
+            print(f"{name:<10}{result.rejected_reason or '-':>10}{elapsed:>10.2f}{limit:>8.1f}  {'OK' if ok else 'FAIL'}")
+    finally:
+        server.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# backend/benchmarks/fake_llms.py
+# Deterministic stand-ins for ChatOpenAI/ChatAnthropic so the pipeline can be benchmarked offline.
+
+import itertools
+import json
+import re
+import time
+from typing import Any, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+from app.telemetry import prompt_cache_terms
+
+# Each pipeline stage is recognised by a phrase from its system prompt.
+STAGE_MARKERS = [
+    ("namer", "already been grouped"),
+    ("grouper", "topic modeling"),
+    ("architect", "architect them"),
+    ("refiner", "Editor-in-Chief"),
+    ("writer", "content writer"),
+    ("editor", "world-class editor"),
+]
+
+FILLER_SENTENCES = [
+    "Teams adopting this practice report faster releases and fewer production incidents.",
+    "The key is to treat it as part of the delivery pipeline rather than an afterthought.",
+    "In B2B environments this directly affects compliance, cost and time to market.",
+    "Start small, measure the impact, and standardise what works across teams.",
+    "Vendors such as Docker, Red Hat and Google publish reference guidance on the subject.",
+]
+
+
+def _message_text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(block.get("text", "") for block in message.content if isinstance(block, dict))
+
+
+def _between(text: str, tag: str) -> str:
+    match = re.search(rf"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+
+def _detect_stage(messages: List[BaseMessage]) -> str:
+    system_text = _message_text(messages[0]) if messages else ""
+    for stage, marker in STAGE_MARKERS:
+        if marker in system_text:
+            return stage
+    raise ValueError("Fake LLM received a prompt it doesn't recognise.")
+
+
+def _grouper_response(prompt: str) -> str:
+    headings = [line.strip() for line in _between(prompt, "competitor_content").splitlines() if line.strip()]
+    unique = list(dict.fromkeys(headings))
+    clusters = [
+        {"cluster_name": chunk[0], "headings_and_keywords": chunk}
+        for chunk in (unique[i:i + 6] for i in range(0, len(unique), 6))
+    ]
+    return json.dumps({"clusters": clusters})
+
+
+def _namer_response(prompt: str) -> str:
+    clusters = json.loads(_between(prompt, "clusters"))
+    names = [
+        {"cluster_id": cluster["cluster_id"], "cluster_name": cluster["headings"][0].title()}
+        for cluster in clusters
+    ]
+    return json.dumps({"clusters": names})
+
+
+def _architect_response(prompt: str) -> str:
+    keyword = re.search(r'\*\*Primary Keyword:\*\* "(.*?)"', prompt).group(1)
+    clusters = json.loads(_between(prompt, "topic_clusters"))["clusters"]
+    sections = [
+        {"h2": cluster["cluster_name"], "h3s": [{"h3": item} for item in cluster["headings_and_keywords"][1:5]]}
+        for cluster in clusters[:8]
+    ]
+    return json.dumps({"h1": f"{keyword.title()}: The Complete Guide", "sections": sections})
+
+
+def _refiner_response(prompt: str) -> str:
+    return _between(prompt, "draft_outline")
+
+
+def _writer_response(prompt: str, words_per_topic: int, skip_last_topic: bool = False) -> str:
+    # Only the bullet list under "Key Topics" holds the section's H3s.
+    topic_block = prompt.split("(H3s):**", 1)[-1].split("**Editor Feedback", 1)[0]
+    topics = re.findall(r"^- (.+)$", topic_block, re.MULTILINE)
+    if skip_last_topic and topics:
+        topics = topics[:-1]
+    paragraphs = []
+    for topic in topics or ["this section"]:
+        sentences = [f"{topic} matters for every engineering organisation."]
+        for sentence in itertools.cycle(FILLER_SENTENCES):
+            if sum(len(s.split()) for s in sentences) >= words_per_topic:
+                break
+            sentences.append(sentence)
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Returns canned, schema-valid responses for each pipeline stage after a fixed delay.
+
+    Every `revise_every`-th editor review returns REVISE, so the revision loop is
+    exercised deterministically; 0 disables revisions. Likewise every
+    `thin_draft_every`-th writer draft leaves out its last H3 topic, which the
+    local pre-screen should catch before the editor sees it. Every
+    `tail_every`-th call takes `tail_latency_ms` instead, simulating a provider's
+    latency tail so the router's hedging can be measured.
+
+    Provider prompt caching is simulated: a system message this model has seen
+    before is reported as cache-read input tokens, as OpenAI and Anthropic do.
+    """
+
+    model_name: str = "fake-model"
+    latency_ms: float = 0.0
+    writer_words_per_topic: int = 160
+    revise_every: int = 0
+    thin_draft_every: int = 0
+    editor_calls: int = 0
+    writer_calls: int = 0
+    tail_every: int = 0
+    tail_latency_ms: float = 0.0
+    calls: int = 0
+    seen_prefixes: Set[str] = Field(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Runnable:
+        """Supports `with_structured_output`: answers come back as a call to the first tool."""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _editor_response(self) -> str:
+        self.editor_calls += 1
+        if self.revise_every and self.editor_calls % self.revise_every == 0:
+            return json.dumps({"decision": "REVISE", "feedback": "Add a concrete example for each sub-topic."})
+        return json.dumps({"decision": "APPROVED", "feedback": ""})
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        stage = _detect_stage(messages)
+        prompt = "\n".join(_message_text(m) for m in messages)
+        if stage == "namer":
+            return _namer_response(prompt)
+        if stage == "grouper":
+            return _grouper_response(prompt)
+        if stage == "architect":
+            return _architect_response(prompt)
+        if stage == "refiner":
+            return _refiner_response(prompt)
+        if stage == "writer":
+            self.writer_calls += 1
+            thin = bool(self.thin_draft_every) and self.writer_calls % self.thin_draft_every == 0
+            return _writer_response(_message_text(messages[-1]), self.writer_words_per_topic, skip_last_topic=thin)
+        return self._editor_response()
+
+    def _prompt_cache(self, prefix: str) -> Tuple[int, int]:
+        """
+        (cache_read, cache_write) tokens for a system-message prefix, as the
+        provider would bill them: only models that cache prompts, only prefixes
+        above their minimum length, and only Anthropic reports cache writes.
+        """
+        terms = prompt_cache_terms(self.model_name)
+        prefix_tokens = len(prefix) // 4
+        if terms is None or prefix_tokens < terms[0]:
+            return 0, 0
+        if prefix in self.seen_prefixes:
+            return prefix_tokens, 0
+        self.seen_prefixes.add(prefix)
+        return 0, prefix_tokens if self.model_name.startswith("claude") else 0
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        latency_ms = self.latency_ms
+        if self.tail_every and self.calls % self.tail_every == 0:
+            latency_ms = self.tail_latency_ms
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+        text = self._respond(messages)
+        # Rough token estimate (4 characters per token) so cost telemetry has something to count.
+        input_tokens = sum(len(_message_text(m)) for m in messages) // 4
+        output_tokens = len(text) // 4
+        cache_read_tokens, cache_write_tokens = self._prompt_cache(_message_text(messages[0]))
+        tools = kwargs.get("tools")
+        tool_calls = (
+            [{"name": tools[0]["function"]["name"], "args": json.loads(text), "id": "call_0"}] if tools else []
+        )
+        message = AIMessage(
+            content="" if tools else text,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "input_token_details": {"cache_read": cache_read_tokens, "cache_creation": cache_write_tokens},
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def install(
+    router_module: Any,
+    agent_module: Any,
+    latency_ms: float,
+    revise_every: int = 0,
+    thin_draft_every: int = 0,
+    tail_every: int = 0,
+    tail_latency_ms: float = 0.0,
+) -> None:
+    """
+    Swaps every LLM client built by the router for fakes, one shared fake per
+    model name (as the real clients share a provider). Chains the writer agent
+    has already built are dropped, so they are rebuilt with the fakes on first use.
+    """
+    fakes = {}
+
+    def factory(model: str = "fake-model", **kwargs: Any) -> FakeChatModel:
+        if model not in fakes:
+            fakes[model] = FakeChatModel(
+                model_name=model,
+                latency_ms=latency_ms,
+                revise_every=revise_every,
+                thin_draft_every=thin_draft_every,
+                tail_every=tail_every,
+                tail_latency_ms=tail_latency_ms,
+            )
+        return fakes[model]
+
+    router_module.ChatOpenAI = factory
+    router_module.ChatAnthropic = factory
+
+    agent_module.writer_chain = None
+    agent_module.editor_chain = None
@@ -0,0 +1,115 @@
+# backend/benchmarks/import_budget.py
+"""
+Cold-start budget check for the API process.
+
+Imports `app.main` in a fresh interpreter with `python -X importtime` and fails
+(exit code 1) when the import takes longer than the budget, or when any module
+of the worker-only AI stack (LangChain, LangGraph, spaCy, provider SDKs, the
+task and agent modules) gets imported. The API must enqueue tasks by name and
+leave those imports to the Celery workers.
+
+Import time depends on the machine and the disk cache, so the best of several
+runs is compared with the budget.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.import_budget --budget-ms 1500
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Imported only by Celery workers; any of them in the API is a regression.
+FORBIDDEN_PREFIXES = (
+    "anthropic",
+    "app.agents",
+    "app.llm",
+    "app.tasks",
+    "langchain",
+    "langgraph",
+    "openai",
+    "spacy",
+    "thinc",
+    "torch",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def profile_import(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    Imports `module` in a subprocess and returns its cumulative import time in
+    milliseconds and {module_name: (self_us, cumulative_us)} for every import.
+    """
+    env = dict(os.environ)
+    # Importing the database module requires a URL; no connection is opened.
+    env.setdefault("DATABASE_URL", "sqlite://")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    modules: Dict[str, Tuple[int, int]] = {}
+    total_us = 0
+    root_package = module.split(".")[0]
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules[name] = (self_us, cumulative_us)
+        # Top-level entries of the application package add up to the import's total.
+        if not indent and (name == root_package or name.startswith(root_package + ".")):
+            total_us += cumulative_us
+    return total_us / 1000, modules
+
+
+def forbidden_imports(modules: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(
+        name for name in modules
+        if any(name == prefix or name.startswith(prefix + ".") or name.startswith(prefix + "_")
+               for prefix in FORBIDDEN_PREFIXES)
+    )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module whose import is measured.")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Maximum cumulative import time.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try; the best run counts.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules (self time) to list.")
+    args = parser.parse_args(argv)
+
+    runs = [profile_import(args.module) for _ in range(args.runs)]
+    best_ms, modules = min(runs, key=lambda run: run[0])
+
+    print(f"{args.module}: {best_ms:.0f} ms (best of {args.runs}), budget {args.budget_ms:.0f} ms, "
+          f"{len(modules)} modules")
+    print(f"{'module':<50}{'self ms':>10}{'cumulative ms':>15}")
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{name:<50}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
+
+    failed = False
+    forbidden = forbidden_imports(modules)
+    if forbidden:
+        failed = True
+        print(f"FAIL: {args.module} imports worker-only modules: {', '.join(forbidden[:20])}"
+              + (" ..." if len(forbidden) > 20 else ""))
+    if best_ms > args.budget_ms:
+        failed = True
+        print(f"FAIL: import took {best_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
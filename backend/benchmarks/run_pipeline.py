@@ -0,0 +1,210 @@
+# backend/benchmarks/run_pipeline.py
+"""
+Offline end-to-end benchmark of the outline task and the writer agent.
+
+Recorded Serper JSON and competitor HTML are replayed by a local stub server,
+LLMs are replaced with deterministic fakes, and the database is a throwaway
+SQLite file, so runs need no network access and no API keys.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.run_pipeline --runs 5 --llm-latency-ms 200
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from .stub_servers import FixtureServer, SCRAPINGANT_PATH, SERPER_PATH
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; good enough for benchmark reporting."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def configure_environment(server: FixtureServer, workdir: str, args: argparse.Namespace) -> None:
+    """Points every external dependency at local stand-ins. Must run before importing `app`."""
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+            "SERPER_API_URL": server.base_url + SERPER_PATH,
+            "SCRAPINGANT_API_URL": server.base_url + SCRAPINGANT_PATH,
+            "SERPER_API_KEY": "offline-benchmark",
+            "SCRAPINGANT_API_KEY": "offline-benchmark",
+            "OPENAI_API_KEY": "offline-benchmark",
+            "ANTHROPIC_API_KEY": "offline-benchmark",
+            "RESPONSE_CACHE_ENABLED": "false",
+        }
+    )
+    os.environ["LLM_HEDGE_DEFAULT_DELAY_SECONDS"] = str(args.hedge_delay_seconds)
+    if args.grouper_mode:
+        os.environ["GROUPER_MODE"] = args.grouper_mode
+
+
+def run(args: argparse.Namespace) -> Dict:
+    server = FixtureServer(latency_ms=args.http_latency_ms).start()
+    workdir = tempfile.mkdtemp(prefix="seo-agent-bench-")
+    configure_environment(server, workdir, args)
+
+    # Imported late on purpose: these modules read the environment at import time.
+    from app import crud, llm_router, models, tasks, telemetry
+    from app.agents import writer_editor_agent as agent
+    from app.database import SessionLocal
+    from app.migrate import migrate
+    from app.services.content_scoring_service import ContentScorer
+    from . import fake_llms
+
+    fake_llms.install(
+        llm_router,
+        agent,
+        latency_ms=args.llm_latency_ms,
+        revise_every=args.revise_every,
+        thin_draft_every=args.thin_draft_every,
+        tail_every=args.llm_tail_every,
+        tail_latency_ms=args.llm_tail_latency_ms,
+    )
+    migrate()
+
+    stage_durations: Dict[str, List[float]] = defaultdict(list)
+    telemetry.add_stage_listener(lambda name, attrs: stage_durations[name].append(attrs["duration_ms"]))
+    # Per stage: [input tokens, cache-read input tokens].
+    prompt_tokens: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    def count_tokens(name: str, usage: Dict) -> None:
+        prompt_tokens[name][0] += usage["input_tokens"]
+        prompt_tokens[name][1] += usage["cache_read_tokens"]
+
+    telemetry.add_usage_listener(count_tokens)
+
+    sections_written = 0
+    content_scores: List[float] = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        for i in range(args.runs):
+            db = SessionLocal()
+            try:
+                project = crud.create_project(
+                    db,
+                    models.ProjectCreate(
+                        name=f"benchmark-{i}", keyword=args.keyword, base_url="https://client.example", location="India"
+                    ),
+                )
+                project_id = project.id
+            finally:
+                db.close()
+
+            started = time.perf_counter()
+            result = tasks.generate_outline_task.apply(
+                kwargs={"project_id": project_id, "keyword": args.keyword, "location": "India"}
+            )
+            if result.failed():
+                raise RuntimeError(f"Outline task failed: {result.result!r}")
+            stage_durations["outline_total"].append((time.perf_counter() - started) * 1000)
+
+            if args.skip_writer:
+                continue
+
+            db = SessionLocal()
+            try:
+                outline = json.loads(crud.get_article_by_project_id(db, project_id=project_id).content)
+                term_weights = models.TermWeights.model_validate(crud.get_project(db, project_id).term_weights)
+            finally:
+                db.close()
+
+            started = time.perf_counter()
+            final_state = agent.app.invoke(
+                {
+                    "original_outline": outline,
+                    "article_draft": agent.ArticleDraft(h1=outline["h1"]),
+                    "current_section_index": 0,
+                    "current_section_content": "",
+                    "editor_feedback": None,
+                    "revision_attempts": 0,
+                    "content_scorer": ContentScorer(term_weights),
+                },
+                config={"recursion_limit": 10 * len(outline["sections"]) + 10},
+            )
+            stage_durations["writer_agent_total"].append((time.perf_counter() - started) * 1000)
+            sections_written += len(outline["sections"])
+            content_scores.append(final_state["article_draft"].content_score)
+    finally:
+        server.stop()
+
+    wall_seconds = time.perf_counter() - wall_start
+    return {
+        "runs": args.runs,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_projects_per_min": round(args.runs / wall_seconds * 60, 2),
+        "cpu_seconds": round(time.process_time() - cpu_start, 3),
+        # ru_maxrss is reported in kilobytes on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "llm_calls_per_section": round(
+            (len(stage_durations["writer"]) + len(stage_durations["editor"])) / sections_written, 2
+        ) if sections_written else 0.0,
+        "prompt_cache_hit_rate": {
+            name: round(cached / total, 3) if total else 0.0 for name, (total, cached) in sorted(prompt_tokens.items())
+        },
+        "content_score_p50": round(percentile(content_scores, 50), 2),
+        "stages": {
+            name: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+            }
+            for name, values in sorted(stage_durations.items())
+        },
+    }
+
+
+def print_report(report: Dict) -> None:
+    print(f"runs={report['runs']}  wall={report['wall_seconds']}s  cpu={report['cpu_seconds']}s  "
+          f"peak_rss={report['peak_rss_mb']}MB  throughput={report['throughput_projects_per_min']}/min  "
+          f"llm_calls/section={report['llm_calls_per_section']}  content_score={report['content_score_p50']}")
+    print(f"{'stage':<22}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, stats in report["stages"].items():
+        print(f"{name:<22}{stats['count']:>8}{stats['p50_ms']:>12}{stats['p95_ms']:>12}")
+    print("prompt cache hit rate: " + "  ".join(
+        f"{name}={rate:.1%}" for name, rate in report["prompt_cache_hit_rate"].items()
+    ))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Number of projects to run end to end.")
+    parser.add_argument("--keyword", default="container image", help="Keyword with a recorded SERP fixture.")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency of every LLM call.")
+    parser.add_argument("--http-latency-ms", type=float, default=0.0, help="Simulated latency of every HTTP call.")
+    parser.add_argument("--revise-every", type=int, default=3, help="Every Nth editor review asks for a revision (0 = never).")
+    parser.add_argument("--grouper-mode", choices=["llm", "hybrid", "fast"], help="Override GROUPER_MODE.")
+    parser.add_argument("--thin-draft-every", type=int, default=4, help="Every Nth writer draft omits an H3 topic (0 = never).")
+    parser.add_argument("--llm-tail-every", type=int, default=0, help="Every Nth call to a fake model is slow (0 = never).")
+    parser.add_argument("--llm-tail-latency-ms", type=float, default=3000.0, help="Latency of those slow calls.")
+    parser.add_argument(
+        "--hedge-delay-seconds", type=float, default=1.0, help="Hedge delay until a model has enough samples for its p95."
+    )
+    parser.add_argument("--skip-writer", action="store_true", help="Only benchmark the outline task.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
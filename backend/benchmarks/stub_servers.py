@@ -0,0 +1,122 @@
+# backend/benchmarks/stub_servers.py
+# A local HTTP server that replays recorded Serper and ScrapingAnt responses from fixtures.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+SERPER_PATH = "/search"
+SCRAPINGANT_PATH = "/v2/general"
+# Misbehaving hosts for the scraper's download limits: `?interval_ms=` between
+# bytes (trickle) or one long pause after the headers (stall).
+TRICKLE_PATH = "/slow/trickle"
+STALL_PATH = "/slow/stall"
+
+# Pages are served with the content type of their recorded file, so non-HTML results exercise rejection.
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".pdf": "application/pdf",
+    ".json": "application/json",
+}
+
+
+def load_manifest() -> dict:
+    """Loads the fixture manifest that maps queries and URLs to recorded files."""
+    with open(FIXTURES_DIR / "manifest.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Serves `POST /search` like Serper and `GET /v2/general?url=...` like ScrapingAnt.
+    An optional fixed latency simulates the network round-trip of the real APIs.
+    `GET /slow/trickle` and `GET /slow/stall` imitate hostile or broken hosts.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _FixtureHandler)
+        self.latency_ms = latency_ms
+        self.manifest = load_manifest()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    server: FixtureServer
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean; the stub's access log is not interesting.
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != SERPER_PATH:
+            return self._send(404, b"{}", "application/json")
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        fixture = self.server.manifest["serp"].get(payload.get("q", "").strip().lower())
+        if not fixture:
+            return self._send(404, b'{"message": "No recorded SERP for query"}', "application/json")
+        self._send(200, (FIXTURES_DIR / fixture).read_bytes(), "application/json")
+
+    def _send_slowly(self, path: str, interval_ms: float) -> None:
+        body = b"<html><body><p>" + b"x" * 4096 + b"</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            if path == STALL_PATH:
+                time.sleep(interval_ms / 1000)
+                self.wfile.write(body)
+                return
+            for byte in body:
+                self.wfile.write(bytes([byte]))
+                self.wfile.flush()
+                time.sleep(interval_ms / 1000)
+        except OSError:
+            # The client gave up, which is what these endpoints test.
+            pass
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path in (TRICKLE_PATH, STALL_PATH):
+            interval_ms = float(parse_qs(parsed.query).get("interval_ms", ["500"])[0])
+            return self._send_slowly(parsed.path, interval_ms)
+        if parsed.path != SCRAPINGANT_PATH:
+            return self._send(404, b"", "text/plain")
+
+        target_url = parse_qs(parsed.query).get("url", [""])[0]
+        fixture = self.server.manifest["pages"].get(target_url)
+        if not fixture:
+            return self._send(404, b"", "text/plain")
+        content_type = CONTENT_TYPES.get(Path(fixture).suffix, "application/octet-stream")
+        self._send(200, (FIXTURES_DIR / fixture).read_bytes(), content_type)
@@ -0,0 +1,10 @@
+# backend/tests/conftest.py
+
+import fakeredis
+import pytest
+
+
+@pytest.fixture
+def fake_redis():
+    """An in-process Redis with Lua scripting, so the services' scripts run for real."""
+    return fakeredis.FakeRedis()
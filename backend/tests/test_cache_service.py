@@ -0,0 +1,82 @@
+# backend/tests/test_cache_service.py
+
+import pytest
+
+from app import http_cache
+from app.services import cache_service
+
+KEY = cache_service.article_cache_key(1)
+
+
+@pytest.fixture(autouse=True)
+def redis_cache(monkeypatch, fake_redis):
+    monkeypatch.setattr(cache_service, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(cache_service, "get_redis_client", lambda: fake_redis)
+    return fake_redis
+
+
+def test_miss_then_hit():
+    assert cache_service.get_cached_response(KEY) is None
+
+    generation = cache_service.current_generation(KEY)
+    assert generation == ""
+    cache_service.set_cached_response(KEY, b'{"a": 1}', 'W/"abc"', generation)
+
+    assert cache_service.get_cached_response(KEY) == (b'{"a": 1}', 'W/"abc"')
+
+
+def test_entry_expires_with_the_configured_ttl(redis_cache):
+    cache_service.set_cached_response(KEY, b"{}", 'W/"abc"', cache_service.current_generation(KEY))
+
+    assert 0 < redis_cache.ttl(KEY) <= cache_service.RESPONSE_CACHE_TTL_SECONDS
+
+
+def test_invalidate_drops_the_entry_and_bumps_the_generation(redis_cache):
+    cache_service.set_cached_response(KEY, b"{}", 'W/"abc"', cache_service.current_generation(KEY))
+
+    cache_service.invalidate(KEY)
+
+    assert cache_service.get_cached_response(KEY) is None
+    assert cache_service.current_generation(KEY) == "1"
+    assert 0 < redis_cache.ttl(f"{KEY}:generation") <= cache_service.GENERATION_TTL_SECONDS
+
+
+def test_read_that_straddles_a_write_is_not_cached():
+    # The read loads the old body, a write invalidates, then the read tries to cache.
+    generation = cache_service.current_generation(KEY)
+    cache_service.invalidate(KEY)
+    cache_service.set_cached_response(KEY, b"stale", 'W/"old"', generation)
+
+    assert cache_service.get_cached_response(KEY) is None
+
+    # A read that starts after the write caches normally.
+    cache_service.set_cached_response(KEY, b"fresh", 'W/"new"', cache_service.current_generation(KEY))
+    assert cache_service.get_cached_response(KEY) == (b"fresh", 'W/"new"')
+
+
+def test_nothing_is_cached_without_a_generation():
+    cache_service.set_cached_response(KEY, b"{}", 'W/"abc"', None)
+
+    assert cache_service.get_cached_response(KEY) is None
+
+
+def test_disabled_cache_never_touches_redis(monkeypatch):
+    monkeypatch.setattr(cache_service, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(cache_service, "get_redis_client", pytest.fail)
+
+    assert cache_service.current_generation(KEY) is None
+    assert cache_service.get_cached_response(KEY) is None
+    cache_service.set_cached_response(KEY, b"{}", 'W/"abc"', "")
+    cache_service.invalidate(KEY)
+
+
+def test_etag_is_weak_and_matches_either_form():
+    etag = http_cache.make_etag(b'{"a": 1}')
+
+    assert etag.startswith('W/"')
+    assert http_cache.etag_matches(etag, etag)
+    assert http_cache.etag_matches(etag[2:], etag)
+    assert http_cache.etag_matches(f'W/"other", {etag}', etag)
+    assert http_cache.etag_matches("*", etag)
+    assert not http_cache.etag_matches('W/"other"', etag)
+    assert not http_cache.etag_matches(None, etag)
@@ -0,0 +1,97 @@
+# backend/tests/test_coalescing_service.py
+
+import time
+
+import pytest
+
+from app.services import coalescing_service
+from app.services.coalescing_service import Leader, Waiter
+
+FINGERPRINT = coalescing_service.project_fingerprint("best running shoes", "US", ["trail shoes"])
+LEASE_KEY, WAITERS_KEY = coalescing_service._keys(FINGERPRINT)
+
+
+@pytest.fixture(autouse=True)
+def redis_coalescing(monkeypatch, fake_redis):
+    monkeypatch.setattr(coalescing_service, "PROJECT_COALESCING_ENABLED", True)
+    monkeypatch.setattr(coalescing_service, "get_redis_client", lambda: fake_redis)
+    return fake_redis
+
+
+def test_fingerprint_ignores_case_spacing_and_keyword_order():
+    same = coalescing_service.project_fingerprint("Best  Running Shoes", "us", ["Trail shoes", "trail shoes"])
+
+    assert same == FINGERPRINT
+    assert coalescing_service.project_fingerprint("best running shoes", "US", ["trail shoes"], "ecommerce") != FINGERPRINT
+
+
+def test_first_project_leads_and_later_ones_attach():
+    assert coalescing_service.attach(FINGERPRINT, 1, "task-1") is None
+
+    assert coalescing_service.attach(FINGERPRINT, 2, "task-2") == Leader(project_id=1, task_id="task-1")
+    assert coalescing_service.attach(FINGERPRINT, 3, "task-3") == Leader(project_id=1, task_id="task-1")
+
+
+def test_lease_and_waiters_expire_with_the_lease(redis_coalescing):
+    coalescing_service.attach(FINGERPRINT, 1, "task-1")
+    coalescing_service.attach(FINGERPRINT, 2, "task-2")
+
+    lease_ms = coalescing_service.PROJECT_COALESCING_LEASE_SECONDS * 1000
+    assert 0 < redis_coalescing.pttl(LEASE_KEY) <= lease_ms
+    assert 0 < redis_coalescing.pttl(WAITERS_KEY) <= lease_ms
+
+
+def test_finish_returns_waiters_with_their_own_task_ids_and_releases_the_lease(redis_coalescing):
+    coalescing_service.attach(FINGERPRINT, 1, "task-1")
+    coalescing_service.attach(FINGERPRINT, 2, "task-2")
+    coalescing_service.attach(FINGERPRINT, 3, "task-3")
+
+    waiters = coalescing_service.finish(FINGERPRINT, 1, "task-1")
+
+    assert waiters == [Waiter(2, "task-2"), Waiter(3, "task-3")]
+    assert not redis_coalescing.exists(LEASE_KEY, WAITERS_KEY)
+    # The next identical submission leads its own pipeline.
+    assert coalescing_service.attach(FINGERPRINT, 4, "task-4") is None
+
+
+def test_leader_whose_lease_lapsed_leaves_the_waiters_to_the_new_leader(monkeypatch, redis_coalescing):
+    monkeypatch.setattr(coalescing_service, "PROJECT_COALESCING_LEASE_SECONDS", 1)
+    coalescing_service.attach(FINGERPRINT, 1, "task-1")
+    # The lease lapses while project 1 is still running, and project 3 takes it over.
+    time.sleep(0.6)
+    coalescing_service.attach(FINGERPRINT, 2, "task-2")
+    time.sleep(0.6)
+    assert not redis_coalescing.exists(LEASE_KEY)
+    assert coalescing_service.attach(FINGERPRINT, 3, "task-3") is None
+    coalescing_service.attach(FINGERPRINT, 4, "task-4")
+
+    assert coalescing_service.finish(FINGERPRINT, 1, "task-1") == []
+    assert redis_coalescing.get(LEASE_KEY) == b"3:task-3"
+
+    assert coalescing_service.finish(FINGERPRINT, 3, "task-3") == [Waiter(2, "task-2"), Waiter(4, "task-4")]
+
+
+def test_leader_finishing_after_its_lease_lapsed_still_serves_the_waiters(redis_coalescing):
+    coalescing_service.attach(FINGERPRINT, 1, "task-1")
+    coalescing_service.attach(FINGERPRINT, 2, "task-2")
+    redis_coalescing.delete(LEASE_KEY)
+
+    assert coalescing_service.finish(FINGERPRINT, 1, "task-1") == [Waiter(2, "task-2")]
+    assert not redis_coalescing.exists(WAITERS_KEY)
+
+
+def test_finish_dedupes_waiters_skips_the_leader_and_reads_legacy_entries(redis_coalescing):
+    coalescing_service.attach(FINGERPRINT, 1, "task-1")
+    # Project 2 attached twice (re-dispatched), and project 1 is queued behind an
+    # earlier leader; project 5 was queued before waiters carried a task id.
+    redis_coalescing.rpush(WAITERS_KEY, "2:task-2", "1:task-1", "2:task-2", "5")
+
+    assert coalescing_service.finish(FINGERPRINT, 1, "task-1") == [Waiter(2, "task-2"), Waiter(5, None)]
+
+
+def test_disabled_coalescing_never_touches_redis(monkeypatch):
+    monkeypatch.setattr(coalescing_service, "PROJECT_COALESCING_ENABLED", False)
+    monkeypatch.setattr(coalescing_service, "get_redis_client", pytest.fail)
+
+    assert coalescing_service.attach(FINGERPRINT, 1, "task-1") is None
+    assert coalescing_service.finish(FINGERPRINT, 1, "task-1") == []
@@ -0,0 +1,203 @@
+# backend/tests/test_llm_router.py
+
+import time
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app import llm_router
+from app.llm_router import LLMDeadlineExceeded, RoutedRunnable
+
+HEDGE_DELAY = 0.1
+OPEN_SECONDS = 0.2
+
+
+class FakeModel:
+    """A chain that answers after a fixed latency, or raises, and counts its calls."""
+
+    def __init__(self, answer=None, latency=0.0, error=None):
+        self.answer = answer
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+    def runnable(self):
+        return RunnableLambda(self)
+
+
+@pytest.fixture(autouse=True)
+def router(monkeypatch):
+    monkeypatch.setattr(llm_router, "_breakers", {})
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", HEDGE_DELAY)
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_MIN_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_OPEN_SECONDS", OPEN_SECONDS)
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_SLOW_CALL_SECONDS", 1.0)
+
+
+def _route(primary, secondary, deadline_seconds=5.0):
+    return RoutedRunnable("test", [("primary", primary.runnable()), ("secondary", secondary.runnable())], deadline_seconds)
+
+
+def _wait_for(predicate, timeout=2.0):
+    # Outcomes are recorded in a done callback, which may run just after invoke returns.
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def _open_breaker(model):
+    breaker = llm_router.get_breaker(model)
+    for _ in range(llm_router.LLM_BREAKER_MIN_CALLS):
+        breaker.record(False, 0.01)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_fast_primary_answers_without_a_hedge():
+    primary, secondary = FakeModel("a"), FakeModel("b")
+
+    assert _route(primary, secondary).invoke({}) == "a"
+    assert secondary.calls == 0
+
+
+def test_slow_primary_is_hedged_and_the_first_answer_wins():
+    primary, secondary = FakeModel("a", latency=1.0), FakeModel("b", latency=0.05)
+
+    started = time.monotonic()
+    assert _route(primary, secondary).invoke({}) == "b"
+    elapsed = time.monotonic() - started
+
+    assert primary.calls == secondary.calls == 1
+    assert HEDGE_DELAY <= elapsed < 0.5
+
+
+def test_hedge_delay_follows_the_primarys_observed_p95():
+    primary, secondary = FakeModel("a", latency=0.3), FakeModel("b")
+    breaker = llm_router.get_breaker("primary")
+    for _ in range(llm_router.LLM_HEDGE_MIN_SAMPLES):
+        breaker.record(True, 0.5)
+
+    # Below its p95 the primary is not hedged, although it is past the default delay.
+    assert _route(primary, secondary).invoke({}) == "a"
+    assert secondary.calls == 0
+
+
+def test_hedge_delay_has_a_floor():
+    breaker = llm_router.get_breaker("primary")
+    assert breaker.hedge_delay() == HEDGE_DELAY
+
+    for _ in range(llm_router.LLM_HEDGE_MIN_SAMPLES):
+        breaker.record(True, 0.001)
+
+    assert breaker.hedge_delay() == llm_router.LLM_HEDGE_MIN_DELAY_SECONDS
+
+
+def test_error_fails_over_immediately():
+    primary, secondary = FakeModel(error=RuntimeError("overloaded")), FakeModel("b")
+
+    started = time.monotonic()
+    assert _route(primary, secondary).invoke({}) == "b"
+
+    assert time.monotonic() - started < HEDGE_DELAY
+    _wait_for(lambda: len(llm_router.get_breaker("primary")._outcomes) == 1)
+    assert llm_router.get_breaker("primary")._outcomes[0][0] is False
+
+
+def test_last_error_is_raised_when_every_model_fails():
+    primary, secondary = FakeModel(error=RuntimeError("primary down")), FakeModel(error=ValueError("secondary down"))
+
+    with pytest.raises(ValueError, match="secondary down"):
+        _route(primary, secondary).invoke({})
+
+
+def test_deadline_bounds_the_whole_call():
+    primary, secondary = FakeModel("a", latency=1.0), FakeModel("b", latency=1.0)
+
+    started = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        _route(primary, secondary, deadline_seconds=0.3).invoke({})
+
+    assert 0.3 <= time.monotonic() - started < 0.6
+    assert primary.calls == secondary.calls == 1
+
+
+def test_model_with_an_open_breaker_is_skipped():
+    _open_breaker("primary")
+    primary, secondary = FakeModel("a"), FakeModel("b")
+
+    assert _route(primary, secondary).invoke({}) == "b"
+    assert primary.calls == 0
+
+
+def test_primary_is_still_tried_when_every_breaker_is_open():
+    _open_breaker("primary")
+    _open_breaker("secondary")
+    primary, secondary = FakeModel("a"), FakeModel("b")
+
+    assert _route(primary, secondary).invoke({}) == "a"
+    assert secondary.calls == 0
+
+
+def test_breaker_opens_on_the_error_rate():
+    breaker = llm_router.get_breaker("primary")
+    breaker.record(True, 0.01)
+    breaker.record(True, 0.01)
+    breaker.record(False, 0.01)
+    assert breaker.state == "closed"
+
+    breaker.record(False, 0.01)
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_opens_on_the_slow_call_rate():
+    breaker = llm_router.get_breaker("primary")
+    for latency in (0.01, 0.01, 2.0, 2.0):
+        breaker.record(True, latency)
+
+    assert breaker.state == "open"
+
+
+def test_half_open_breaker_lets_one_trial_through_and_closes_on_success():
+    breaker = _open_breaker("primary")
+    time.sleep(OPEN_SECONDS)
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record(True, 0.01)
+
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_half_open_breaker_reopens_when_the_trial_fails():
+    breaker = _open_breaker("primary")
+    time.sleep(OPEN_SECONDS)
+    assert breaker.allow()
+
+    breaker.record(False, 0.01)
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_routed_trial_call_closes_the_breaker():
+    _open_breaker("primary")
+    time.sleep(OPEN_SECONDS)
+    primary, secondary = FakeModel("a"), FakeModel("b")
+
+    assert _route(primary, secondary).invoke({}) == "a"
+    _wait_for(lambda: llm_router.get_breaker("primary").state == "closed")